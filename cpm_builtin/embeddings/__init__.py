@@ -7,6 +7,7 @@ from .config import EmbeddingProviderConfig, EmbeddingsConfigService
 from .discovery import DiscoveryResult, load_cache, refresh_provider_discovery, save_cache
 from .openai import (
     OpenAIEmbeddingsHttpClient,
+    get_session,
     normalize_embeddings,
     parse_openai_response,
     serialize_openai_request,
@@ -31,5 +32,6 @@ __all__ = [
     "serialize_openai_request",
     "parse_openai_response",
     "normalize_embeddings",
+    "get_session",
     "l2_normalize",
 ]
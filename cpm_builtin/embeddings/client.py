@@ -4,9 +4,8 @@ from dataclasses import dataclass
 from typing import Sequence
 
 import numpy as np
-import requests
 
-from .openai import OpenAIEmbeddingsHttpClient
+from .openai import OpenAIEmbeddingsHttpClient, get_session
 
 VALID_EMBEDDING_MODES = ("http",)
 
@@ -44,7 +43,7 @@ class EmbeddingClient:
 
     def health(self) -> bool:
         try:
-            response = requests.options(self._http_endpoint, timeout=2.0)
+            response = get_session().options(self._http_endpoint, timeout=2.0)
             return response.status_code < 500
         except Exception:
             return False
@@ -11,6 +11,9 @@ if TYPE_CHECKING:
     import numpy as np
 
 CONFIG_FILENAME = "embeddings.yml"
+# libyaml-backed loader/dumper when PyYAML was built with it; same safe subset.
+_YAML_LOADER = getattr(yaml, "CSafeLoader", yaml.SafeLoader)
+_YAML_DUMPER = getattr(yaml, "CSafeDumper", yaml.SafeDumper)
 DEFAULT_DISCOVERY_TTL_SECONDS = 900
 
 
@@ -296,7 +299,9 @@ class EmbeddingsConfigService:
     def _load(self) -> EmbeddingsConfig:
         if not self.config_path.exists():
             return EmbeddingsConfig()
-        raw = yaml.safe_load(self.config_path.read_text(encoding="utf-8")) or {}
+        # A binary stream lets libyaml read the UTF-8 bytes directly.
+        with self.config_path.open("rb") as handle:
+            raw = yaml.load(handle, Loader=_YAML_LOADER) or {}
         default = raw.get("default")
         providers_raw = raw.get("providers") or {}
         providers: dict[str, EmbeddingProviderConfig] = {}
@@ -319,9 +324,8 @@ class EmbeddingsConfigService:
                 for name, provider in self._config.providers.items()
             },
         }
-        self.config_path.write_text(
-            yaml.safe_dump(payload, sort_keys=False), encoding="utf-8"
-        )
+        with self.config_path.open("w", encoding="utf-8") as handle:
+            yaml.dump(payload, handle, Dumper=_YAML_DUMPER, sort_keys=False)
 
     @property
     def discovery_cache_path(self) -> Path:
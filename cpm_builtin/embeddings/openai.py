@@ -1,6 +1,7 @@
 from __future__ import annotations
 
 import logging
+import threading
 import time
 from collections.abc import Mapping, Sequence
 from typing import Any
@@ -14,6 +15,19 @@ from .types import EmbedRequestIR, EmbedResponseIR
 
 logger = logging.getLogger(__name__)
 
+# One session per thread, shared by every client on that thread, so repeated
+# requests to the same embedding server reuse pooled keep-alive connections
+# without sharing a requests.Session across threads.
+_SESSIONS = threading.local()
+
+
+def get_session() -> requests.Session:
+    """Return the calling thread's shared :class:`requests.Session`."""
+    session = getattr(_SESSIONS, "session", None)
+    if session is None:
+        session = _SESSIONS.session = requests.Session()
+    return session
+
 
 def _coerce_inputs(texts: str | Sequence[str]) -> list[str]:
     if isinstance(texts, str):
@@ -144,8 +158,10 @@ class OpenAIEmbeddingsHttpClient:
         max_retries: int = 2,
         backoff_seconds: float = 0.1,
         static_headers: Mapping[str, str] | None = None,
+        session: requests.Session | None = None,
     ) -> None:
         self.endpoint = endpoint.rstrip("/")
+        self._session = session
         self.timeout = float(timeout)
         self.max_retries = max(1, int(max_retries))
         self.backoff_seconds = max(0.0, float(backoff_seconds))
@@ -155,6 +171,11 @@ class OpenAIEmbeddingsHttpClient:
         if api_key:
             self.headers.setdefault("authorization", f"Bearer {api_key}")
 
+    @property
+    def session(self) -> requests.Session:
+        """The session passed in, else the calling thread's shared one."""
+        return self._session if self._session is not None else get_session()
+
     def embed_texts(
         self,
         texts: str | Sequence[str],
@@ -186,7 +207,7 @@ class OpenAIEmbeddingsHttpClient:
                     self.endpoint,
                     len(request.texts),
                 )
-                response = requests.post(
+                response = self.session.post(
                     self.endpoint,
                     json=payload,
                     headers=headers,
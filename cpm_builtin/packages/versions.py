@@ -3,6 +3,7 @@
 from __future__ import annotations
 
 import re
+from functools import lru_cache
 from typing import Any, List, Optional, Tuple
 
 __all__ = [
@@ -36,17 +37,25 @@ _STAGE_ORDER: dict[str, int] = {
     "final": 100,
 }
 
+_UNSAFE_SEGMENT_RE = re.compile(r"[^a-zA-Z0-9._\-+@]+")
+_TOKEN_RE = re.compile(r"(\d+)|(\D+)")
+
 
 def _safe_segment(seg: str) -> str:
     s = (seg or "").strip()
     if not s:
         return ""
     s = s.replace("\\", "/").replace("/", "-")
-    s = re.sub(r"[^a-zA-Z0-9._\-+@]+", "-", s).strip("-")
+    s = _UNSAFE_SEGMENT_RE.sub("-", s).strip("-")
     return s
 
 
 def split_version_parts(version: str) -> List[str]:
+    return list(_split_version_parts(version))
+
+
+@lru_cache(maxsize=512)
+def _split_version_parts(version: str) -> Tuple[str, ...]:
     v = (version or "").strip()
     if not v:
         raise ValueError("empty version")
@@ -55,7 +64,7 @@ def split_version_parts(version: str) -> List[str]:
     parts = [p for p in parts if p]
     if not parts:
         raise ValueError(f"invalid version after sanitization: {version!r}")
-    return parts
+    return tuple(parts)
 
 
 def normalize_latest(version: Optional[str]) -> Optional[str]:
@@ -79,67 +88,53 @@ def _split_segment_tokens(seg: str) -> Tuple[str, List[str]]:
     return parts[0], parts[1:]
 
 
-def _tokenize_text_and_int(s: str) -> List[Any]:
+@lru_cache(maxsize=2048)
+def _tokenize_text_and_int(s: str) -> Tuple[Any, ...]:
     s = (s or "").strip()
     if not s:
-        return []
-    out: List[Any] = []
-    i = 0
-    while i < len(s):
-        if s[i].isdigit():
-            j = i
-            while j < len(s) and s[j].isdigit():
-                j += 1
-            out.append((0, int(s[i:j])))
-            i = j
-        else:
-            j = i
-            while j < len(s) and not s[j].isdigit():
-                j += 1
-            out.append((1, s[i:j].lower()))
-            i = j
-    return out
+        return ()
+    return tuple((0, int(digits)) if digits else (1, text.lower()) for digits, text in _TOKEN_RE.findall(s))
 
 
 def _qualifier_stage_and_num(tokens: List[str]) -> Tuple[int, int, Tuple[Any, ...]]:
     if not tokens:
         return (1000, 0, ())
 
-    flat: List[Any] = []
-    for token in tokens:
-        flat.extend(_tokenize_text_and_int(token))
+    flat = [item for token in tokens for item in _tokenize_text_and_int(token)]
 
+    # One pass over the tokens. ``extra`` keeps everything before the first run
+    # of stage words plus the first token after that run; ``stage_num`` is the
+    # first number anywhere after the first stage word.
     stage_rank = None
     stage_num = 0
     extra: List[Any] = []
-
-    for typ, val in flat:
-        if typ == 1:
-            if val in _STAGE_ORDER:
-                stage_rank = _STAGE_ORDER[val]
-                continue
-            extra.append((typ, val))
-        else:
-            extra.append((typ, val))
-        if stage_rank is not None:
+    collecting = True
+    seen_stage = False
+    need_num = False
+
+    for typ, value in flat:
+        is_stage = typ == 1 and value in _STAGE_ORDER
+        if collecting:
+            if is_stage:
+                stage_rank = _STAGE_ORDER[value]
+            else:
+                extra.append((typ, value))
+                collecting = stage_rank is None
+        if need_num and typ == 0:
+            stage_num = value
+            need_num = False
+        elif is_stage and not seen_stage:
+            seen_stage = need_num = True
+        if seen_stage and not (collecting or need_num):
             break
 
     if stage_rank is None:
         stage_rank = 50
 
-    seen_stage = False
-    for typ, val in flat:
-        if typ == 1 and val in _STAGE_ORDER and not seen_stage:
-            seen_stage = True
-            continue
-        if seen_stage and typ == 0:
-            stage_num = val
-            break
-
     return (stage_rank, stage_num, tuple(extra))
 
 
-def _cmp_tokens(a: List[Any], b: List[Any]) -> int:
+def _cmp_tokens(a: Tuple[Any, ...], b: Tuple[Any, ...]) -> int:
     la, lb = len(a), len(b)
     n = max(la, lb)
     for i in range(n):
@@ -194,9 +189,10 @@ def compare_versions(a: str, b: str) -> int:
     return 0
 
 
-def version_key(v: str) -> Tuple[Tuple[List[Any], int, int, Tuple[Any, ...]], ...]:
+@lru_cache(maxsize=1024)
+def version_key(v: str) -> Tuple[Tuple[Tuple[Any, ...], int, int, Tuple[Any, ...]], ...]:
     segs = [s for s in (v or "").split(".") if s != ""]
-    out: List[Tuple[List[Any], int, int, Tuple[Any, ...]]] = []
+    out: List[Tuple[Tuple[Any, ...], int, int, Tuple[Any, ...]]] = []
     for seg in segs:
         base, qual = _split_segment_tokens(seg)
         base_tokens = _tokenize_text_and_int(base)
@@ -37,9 +37,9 @@ def main(
     app = CPMApp(start_dir=start_dir)
     app.bootstrap()
     registry = app.feature_registry
-    entries = _ordered_entries(registry.entries())
-    ambiguous = _ambiguous_names(entries)
-    qualified_names = {entry.qualified_name for entry in entries}
+    # Only names are needed to dispatch; entries() would import every lazy plugin.
+    qualified_names = set(registry.qualified_names())
+    ambiguous = _ambiguous_names(qualified.split(":", 1)[1] for qualified in qualified_names)
 
     try:
         spec, command_args = _extract_command_spec(tokens, qualified_names)
@@ -71,13 +71,17 @@ def main(
     if entry.group == "cpm" and entry.name == "help":
         return _print_overview(
             start_dir=start_dir,
-            entries=entries,
+            entries=_ordered_entries(registry.entries()),
             ambiguous=ambiguous,
             include_long=getattr(command, "long_format", False),
         )
 
     if entry.group == "cpm" and entry.name == "listing":
-        return _print_listing(entries, ambiguous, getattr(command, "output_format", "text"))
+        return _print_listing(
+            _ordered_entries(registry.entries()),
+            ambiguous,
+            getattr(command, "output_format", "text"),
+        )
 
     if entry.group == "plugin" and entry.name == "list":
         return _print_plugin_list(
@@ -101,7 +105,7 @@ def _print_overview(
         app.bootstrap()
         entries = _ordered_entries(app.feature_registry.entries())
     if ambiguous is None:
-        ambiguous = _ambiguous_names(entries)
+        ambiguous = _ambiguous_names(entry.name for entry in entries)
 
     print("Usage: cpm <command> [args...]\n")
     cores, plugins = _split_entries(entries)
@@ -182,10 +186,10 @@ def _split_entries(
     return cores, plugins
 
 
-def _ambiguous_names(entries: Iterable[CPMRegistryEntry]) -> set[str]:
+def _ambiguous_names(names: Iterable[str]) -> set[str]:
     counts: dict[str, int] = {}
-    for entry in entries:
-        counts[entry.name] = counts.get(entry.name, 0) + 1
+    for name in names:
+        counts[name] = counts.get(name, 0) + 1
     return {name for name, total in counts.items() if total > 1}
 
 
@@ -2,7 +2,6 @@
 
 from __future__ import annotations
 
-import hashlib
 import json
 import tarfile
 import zipfile
@@ -11,15 +10,18 @@ from datetime import datetime, timezone
 from pathlib import Path
 from typing import Any, Dict, Iterable, Mapping, Optional, Protocol, Sequence, Tuple
 
+import faiss
 import numpy as np
 from cpm_builtin.embeddings import EmbeddingClient
 
 from cpm_core.api import CPMAbstractBuilder, cpmbuilder
-from cpm_core.packet.faiss_db import FaissFlatIP
+from cpm_core.packet.faiss_db import DEFAULT_INDEX_RECIPE, FaissFlatIP, build_faiss_index, save_faiss_index
 from cpm_core.packet.io import (
+    chunk_hash,
     compute_checksums,
     load_manifest,
     read_docs_jsonl,
+    read_vectors_f16,
     write_docs_jsonl,
     write_manifest,
     write_vectors_f16,
@@ -64,10 +66,6 @@ class Embedder(Protocol):
         ...
 
 
-def _chunk_hash(text: str) -> str:
-    return hashlib.sha256(text.encode("utf-8")).hexdigest()
-
-
 def _read_text_file(path: Path) -> str:
     try:
         return path.read_text(encoding="utf-8")
@@ -256,18 +254,17 @@ def _load_existing_cache(
     if not hashes:
         return None
     try:
-        raw = np.fromfile(str(vectors_path), dtype=np.float16)
+        # Keep the cache in fp16; rows are upcast when copied into the float32 output.
+        mat_f16 = read_vectors_f16(vectors_path, dim, upcast=False)
     except Exception:
         return None
-    expected = len(hashes) * dim
-    if raw.size != expected:
+    if mat_f16.shape[0] != len(hashes):
         return None
-    mat_f32 = raw.reshape((len(hashes), dim)).astype(np.float32)
     cache: Dict[str, np.ndarray] = {}
     for idx, h in enumerate(hashes):
         if h is None or h in cache:
             continue
-        cache[h] = mat_f32[idx].copy()
+        cache[h] = np.array(mat_f16[idx])
     return cache, dim
 
 
@@ -289,6 +286,7 @@ class PacketMaterializationInput:
     incremental_enabled: bool = True
     extra_files: Sequence[str] = ()
     extra_manifest: Mapping[str, Any] | None = None
+    index_recipe: str = DEFAULT_INDEX_RECIPE
 
 
 @dataclass(frozen=True)
@@ -305,6 +303,7 @@ class DefaultBuilderConfig:
     embed_url: str = DEFAULT_EMBED_URL
     embeddings_mode: str = "http"
     timeout: float | None = None
+    index_recipe: str = DEFAULT_INDEX_RECIPE
 
 
 def materialize_packet(input_data: PacketMaterializationInput) -> PacketManifest | None:
@@ -332,7 +331,7 @@ def materialize_packet(input_data: PacketMaterializationInput) -> PacketManifest
     else:
         print("[cache] disabled (no compatible previous build found)")
 
-    new_hashes = [_chunk_hash(chunk.text) for chunk in chunks]
+    new_hashes = [chunk_hash(chunk.text) for chunk in chunks]
     new_set = set(new_hashes)
     prev_set = set(cache_vecs.keys())
     removed = len(prev_set - new_set) if cache_vecs else 0
@@ -408,13 +407,23 @@ def materialize_packet(input_data: PacketMaterializationInput) -> PacketManifest
             final_vecs[chunk_idx] = vec_missing[missing_idx]
 
     docs_path = out_root / "docs.jsonl"
-    write_docs_jsonl(chunks, docs_path)
+    write_docs_jsonl(chunks, docs_path, hashes=new_hashes)
     print(f"[write] docs.jsonl -> {docs_path} ({len(chunks)} lines)")
 
-    db = FaissFlatIP(dim=dim)
-    db.add(final_vecs)
     db_path = out_root / "faiss" / "index.faiss"
-    db.save(str(db_path))
+    if input_data.index_recipe == DEFAULT_INDEX_RECIPE:
+        db = FaissFlatIP(dim=dim)
+        db.add(final_vecs)
+        index = db.index
+        index_type = "faiss.IndexFlatIP"
+    else:
+        index = build_faiss_index(final_vecs, input_data.index_recipe)
+        if isinstance(index, faiss.IndexFlatIP):
+            print(f"[warn] {len(chunks)} vectors are too few to train '{input_data.index_recipe}'; using Flat")
+            index_type = "faiss.IndexFlatIP"
+        else:
+            index_type = f"faiss:{input_data.index_recipe}"
+    save_faiss_index(index, db_path)
     print(f"[write] faiss/index.faiss -> {db_path}")
 
     vectors_path = out_root / "vectors.f16.bin"
@@ -447,7 +456,7 @@ def materialize_packet(input_data: PacketMaterializationInput) -> PacketManifest
         ),
         similarity={
             "space": "cosine",
-            "index_type": "faiss.IndexFlatIP",
+            "index_type": index_type,
             "notes": "cosine via inner product on normalized vectors",
         },
         files={
@@ -456,7 +465,7 @@ def materialize_packet(input_data: PacketMaterializationInput) -> PacketManifest
             "index": {"path": "faiss/index.faiss", "format": "faiss"},
             "calibration": None,
         },
-        counts={"docs": len(chunks), "vectors": int(db.index.ntotal)},
+        counts={"docs": len(chunks), "vectors": int(index.ntotal)},
         source={
             "input_dir": input_data.source_path.as_posix(),
             "file_ext_counts": dict(input_data.ext_counts),
@@ -666,5 +675,6 @@ class DefaultBuilder(CPMAbstractBuilder):
                 builder_name="cpm:default-builder",
                 embedder=self.embedder,
                 incremental_enabled=True,
+                index_recipe=self.config.index_recipe,
             )
         )
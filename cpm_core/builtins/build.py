@@ -153,6 +153,7 @@ def _merge_invocation(argv: Any, workspace_root: Path) -> _BuildInvocation:
     embedding_data = config_data.get("embedding") or {}
     embeddings_data = config_data.get("embeddings") or {}
     chunking_data = config_data.get("chunking") or {}
+    index_data = config_data.get("index") or {}
 
     packet_name = _as_str(getattr(argv, "name", None), _as_str(output_data.get("name"), "")).strip()
     packet_version = _as_str(
@@ -247,6 +248,11 @@ def _merge_invocation(argv: Any, workspace_root: Path) -> _BuildInvocation:
         ),
     )
 
+    index_recipe = _as_str(
+        getattr(argv, "index_recipe", None),
+        _as_str(index_data.get("recipe"), DefaultBuilderConfig().index_recipe),
+    ).strip() or DefaultBuilderConfig().index_recipe
+
     builder_config = DefaultBuilderConfig(
         model_name=model_name,
         max_seq_length=max_seq_length,
@@ -260,6 +266,7 @@ def _merge_invocation(argv: Any, workspace_root: Path) -> _BuildInvocation:
         embed_url=embed_url,
         embeddings_mode=embeddings_mode,
         timeout=timeout_value,
+        index_recipe=index_recipe,
     )
 
     return _BuildInvocation(
@@ -321,6 +328,7 @@ def _build_lock_plan(
     *,
     builder_entry: CPMRegistryEntry,
     builder_plugin_version: str,
+    hash_cache_dir: Path | None = None,
 ) -> Any:
     merged_config = {
         "build_config": invocation.config_payload,
@@ -342,6 +350,7 @@ def _build_lock_plan(
         model_dtype="float16",
         normalize=True,
         max_seq_length=invocation.config.max_seq_length,
+        hash_cache_dir=hash_cache_dir,
     )
 
 
@@ -436,6 +445,10 @@ class BuildCommand(_WorkspaceAwareCommand):
         parser.add_argument("--embed-url", help="Embedding server URL")
         parser.add_argument("--embeddings-mode", choices=VALID_EMBEDDING_MODES, help="Embedding transport mode")
         parser.add_argument("--timeout", type=float, help="Embedding request timeout (seconds)")
+        parser.add_argument(
+            "--index-recipe",
+            help="FAISS factory recipe for the index, e.g. 'IVF1024,PQ32x8' (default: Flat)",
+        )
         parser.add_argument("--lockfile", default=DEFAULT_LOCKFILE_NAME, help="Lockfile name inside packet directory")
         parser.add_argument("--frozen-lockfile", action="store_true", help="Require an up-to-date deterministic lockfile")
         parser.add_argument("--update-lock", action="store_true", help="Regenerate lockfile from current inputs/config")
@@ -598,6 +611,7 @@ class BuildCommand(_WorkspaceAwareCommand):
             invocation,
             builder_entry=builder_entry,
             builder_plugin_version=builder_plugin_version,
+            hash_cache_dir=workspace_root / "cache",
         )
 
         lockfile_name = str(getattr(argv, "lockfile", DEFAULT_LOCKFILE_NAME) or DEFAULT_LOCKFILE_NAME).strip()
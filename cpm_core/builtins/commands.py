@@ -18,8 +18,8 @@ class _WorkspaceAwareCommand(CPMAbstractCommand):
         self.resolver = WorkspaceResolver()
         self.workspace_root: Path | None = None
 
-    def _resolve(self, start_dir: str | Path | None) -> Path:
-        return self.resolver.ensure_workspace(Path(start_dir) if start_dir else None)
+    def _resolve(self, start_dir: str | Path | None, *, force: bool = False) -> Path:
+        return self.resolver.ensure_workspace(Path(start_dir) if start_dir else None, force=force)
 
 
 @cpmcommand(name="init", group="cpm")
@@ -37,7 +37,7 @@ class InitCommand(_WorkspaceAwareCommand):
 
     def run(self, argv: Sequence[str]) -> int:
         requested_dir = getattr(argv, "workspace_dir", None)
-        self.workspace_root = self._resolve(requested_dir)
+        self.workspace_root = self._resolve(requested_dir, force=bool(getattr(argv, "force", False)))
         return 0
 
 
@@ -156,6 +156,8 @@ class PluginDoctorCommand(_WorkspaceAwareCommand):
             info = f"{record.id} [{state}] (source={record.source})"
             if record.error:
                 info += f" error={record.error}"
+            if record.warning:
+                info += f" warning={record.warning}"
             print(f"  - {info}")
 
     def _print_registry(self, registry, status: str) -> None:
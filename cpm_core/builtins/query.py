@@ -40,6 +40,17 @@ class FaissFlatIPIndexer:
         return index.search(vector, max(int(k), 1))
 
 
+class FaissIVFIndexer:
+    def __init__(self, nprobe: int = 16) -> None:
+        self.nprobe = nprobe
+
+    def search(self, *, index: Any, vector: Any, k: int) -> tuple[Any, Any]:
+        from cpm_core.packet.faiss_db import set_nprobe
+
+        set_nprobe(index, self.nprobe)
+        return index.search(vector, max(int(k), 1))
+
+
 class NoopReranker:
     def rerank(self, *, query: str, hits: list[dict[str, Any]], k: int) -> list[dict[str, Any]]:
         del query
@@ -75,7 +86,10 @@ class TokenDiversityReranker:
         return chosen
 
 
-_INDEXERS: dict[str, RetrievalIndexer] = {DEFAULT_INDEXER: FaissFlatIPIndexer()}
+_INDEXERS: dict[str, RetrievalIndexer] = {
+    DEFAULT_INDEXER: FaissFlatIPIndexer(),
+    "faiss-ivf": FaissIVFIndexer(),
+}
 _RERANKERS: dict[str, RetrievalReranker] = {
     DEFAULT_RERANKER: NoopReranker(),
     "token-diversity": TokenDiversityReranker(),
@@ -170,6 +184,8 @@ class NativeFaissRetriever(CPMAbstractRetriever):
         try:
             import faiss
 
+            from cpm_core.packet.faiss_db import tune_index_for_manifest
+
             index = faiss.read_index(str(index_path))
         except Exception as exc:  # pragma: no cover - defensive
             return {
@@ -179,6 +195,10 @@ class NativeFaissRetriever(CPMAbstractRetriever):
                 "packet": packet,
             }
 
+        # IVF packets must not be searched at FAISS's default nprobe=1, whichever
+        # indexer was picked; an explicit faiss-ivf indexer still overrides it.
+        tune_index_for_manifest(index, (manifest.get("similarity") or {}).get("index_type"))
+
         embedder = EmbeddingClient(embed_url, mode=embed_mode)
         if not embedder.health():
             return {
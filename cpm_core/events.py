@@ -51,15 +51,17 @@ class EventBus:
         """Register a handler for `event_name` with optional priority."""
         order = self._sequence[event_name]
         self._sequence[event_name] = order + 1
-        self._handlers[event_name].append(
+        subscriptions = self._handlers[event_name]
+        subscriptions.append(
             _EventSubscription(priority=priority, order=order, handler=handler)
         )
+        # Keep delivery order precomputed; subscriptions are rare, emits are not.
+        subscriptions.sort(key=lambda item: (-item.priority, item.order))
 
     def emit(self, event_name: str, payload: dict[str, Any]) -> None:
+        subscriptions = self._handlers.get(event_name)
+        if not subscriptions:
+            return
         event = Event(event_name, payload)
-        subscriptions = sorted(
-            self._handlers[event_name],
-            key=lambda item: (-item.priority, item.order),
-        )
-        for subscription in subscriptions:
+        for subscription in tuple(subscriptions):
             subscription.handler(event)
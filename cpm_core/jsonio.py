@@ -0,0 +1,65 @@
+"""JSON encode/decode helpers that use orjson when installed and stdlib json otherwise.
+
+Both backends produce the same bytes for everything these helpers emit, so files
+that end up hashed (docs.jsonl, manifest.json, locks, caches) do not depend on
+whether the ``speedups`` extra is installed.
+"""
+
+from __future__ import annotations
+
+import json
+from typing import Any
+
+try:
+    import orjson
+except ImportError:  # pragma: no cover - optional speedup
+    orjson = None  # type: ignore[assignment]
+
+__all__ = ["dumps_line", "dumps_pretty", "has_float", "loads"]
+
+
+def has_float(value: object) -> bool:
+    """Return True if ``value`` holds a float anywhere, keys included.
+
+    orjson and json spell some floats differently (``1e-05`` vs ``0.00001``,
+    ``1e+16`` vs ``1e16``, ``NaN`` vs ``null``), so payloads with floats go through
+    json to keep the output stable whichever backend is installed.
+    """
+    if isinstance(value, float):
+        return True
+    if isinstance(value, dict):
+        return any(has_float(key) or has_float(item) for key, item in value.items())
+    if isinstance(value, (list, tuple)):
+        return any(has_float(item) for item in value)
+    return False
+
+
+def loads(data: bytes | str) -> Any:
+    if orjson is not None:
+        try:
+            return orjson.loads(data)
+        except orjson.JSONDecodeError:
+            pass  # let stdlib json accept what orjson rejects (NaN, Infinity) or raise
+    return json.loads(data)
+
+
+def dumps_line(payload: Any) -> bytes:
+    """Encode ``payload`` compactly as one newline-terminated UTF-8 line."""
+    if orjson is not None and not has_float(payload):
+        try:
+            return orjson.dumps(payload, option=orjson.OPT_APPEND_NEWLINE | orjson.OPT_NON_STR_KEYS)
+        except TypeError:
+            pass
+    return (json.dumps(payload, ensure_ascii=False, separators=(",", ":")) + "\n").encode("utf-8")
+
+
+def dumps_pretty(payload: Any) -> bytes:
+    """Encode ``payload`` like ``json.dumps(indent=2, ensure_ascii=False)``."""
+    # orjson's OPT_INDENT_2 layout matches json for strings, ints and containers,
+    # but not for every float (see has_float).
+    if orjson is not None and not has_float(payload):
+        try:
+            return orjson.dumps(payload, option=orjson.OPT_INDENT_2 | orjson.OPT_NON_STR_KEYS)
+        except TypeError:
+            pass
+    return json.dumps(payload, ensure_ascii=False, indent=2).encode("utf-8")
@@ -7,8 +7,9 @@ import logging
 import re
 import subprocess
 import time
+from concurrent.futures import ThreadPoolExecutor
 from pathlib import Path
-from typing import Mapping
+from typing import Mapping, Sequence
 
 from .errors import OciCommandError, OciNotSupportedError
 from .security import assert_allowlisted, redact_command_for_log
@@ -65,6 +66,17 @@ class OciClient:
         digest = _extract_digest(result.stdout) or _extract_digest(result.stderr)
         return OciPullResult(ref=ref_or_digest, digest=digest, files=files)
 
+    def pull_many(self, targets: Sequence[tuple[str, Path]], *, max_workers: int = 4) -> list[OciPullResult]:
+        """Pull independent artifacts concurrently, returning results in input order."""
+
+        for ref_or_digest, _ in targets:
+            assert_allowlisted(ref_or_digest, self.config.allowlist_domains)
+        if len(targets) <= 1 or max_workers <= 1:
+            return [self.pull(ref_or_digest, output_dir) for ref_or_digest, output_dir in targets]
+        with ThreadPoolExecutor(max_workers=min(max_workers, len(targets))) as executor:
+            futures = [executor.submit(self.pull, ref_or_digest, output_dir) for ref_or_digest, output_dir in targets]
+            return [future.result() for future in futures]
+
     def push(self, ref: str, artifact: OciArtifactSpec) -> OciPushResult:
         assert_allowlisted(ref, self.config.allowlist_domains)
         command = ["oras", "push", ref]
@@ -95,8 +107,9 @@ class OciClient:
         last_error: Exception | None = None
         for attempt in range(1, retries + 1):
             try:
-                redacted = " ".join(redact_command_for_log(command))
-                logger.debug("oci command attempt=%s/%s cmd=%s", attempt, retries, redacted)
+                if logger.isEnabledFor(logging.DEBUG):
+                    redacted = " ".join(redact_command_for_log(command))
+                    logger.debug("oci command attempt=%s/%s cmd=%s", attempt, retries, redacted)
                 result = subprocess.run(
                     command,
                     check=False,
@@ -3,9 +3,12 @@
 from __future__ import annotations
 
 import json
+import os
 from pathlib import Path
 from typing import Any
 
+from cpm_core.jsonio import dumps_pretty
+
 
 def install_lock_path(workspace_root: Path, packet_name: str) -> Path:
     return workspace_root / "state" / "install" / f"{packet_name}.lock.json"
@@ -13,11 +16,9 @@ def install_lock_path(workspace_root: Path, packet_name: str) -> Path:
 
 def read_install_lock(workspace_root: Path, packet_name: str) -> dict[str, Any] | None:
     path = install_lock_path(workspace_root, packet_name)
-    if not path.exists():
-        return None
     try:
         payload = json.loads(path.read_text(encoding="utf-8"))
-    except Exception:
+    except (OSError, ValueError):
         return None
     if not isinstance(payload, dict):
         return None
@@ -27,5 +28,8 @@ def read_install_lock(workspace_root: Path, packet_name: str) -> dict[str, Any]
 def write_install_lock(workspace_root: Path, packet_name: str, payload: dict[str, Any]) -> Path:
     path = install_lock_path(workspace_root, packet_name)
     path.parent.mkdir(parents=True, exist_ok=True)
-    path.write_text(json.dumps(payload, ensure_ascii=False, indent=2), encoding="utf-8")
+    tmp_path = path.with_name(f"{path.name}.tmp")
+    tmp_path.write_bytes(dumps_pretty(payload))
+    os.replace(tmp_path, path)
     return path
+
@@ -83,7 +83,7 @@ def build_oci_layout(packet_dir: Path, staging_dir: Path, *, include_embeddings:
     manifest_payload = {
         "schema": "cpm-oci/v1",
         "packet": {"name": packet_name, "version": packet_version},
-        "source_manifest": raw_manifest.to_dict(),
+        "source_manifest": raw_manifest.to_dict(copy=False),
         "payload_root": "payload",
         "options": {"include_embeddings": include_embeddings},
     }
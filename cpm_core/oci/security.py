@@ -2,6 +2,8 @@
 
 from __future__ import annotations
 
+import re
+from functools import lru_cache
 from pathlib import Path
 from urllib.parse import urlsplit
 
@@ -10,6 +12,7 @@ from .errors import OciSecurityError
 _SENSITIVE_KEYS = ("password", "token", "authorization", "bearer")
 
 
+@lru_cache(maxsize=1024)
 def host_from_ref(ref: str) -> str:
     value = ref.strip()
     if not value:
@@ -24,15 +27,22 @@ def assert_allowlisted(ref: str, allowlist_domains: tuple[str, ...]) -> None:
     if not allowlist_domains:
         return
     host = host_from_ref(ref)
-    for allowed in allowlist_domains:
-        key = allowed.strip().lower()
-        if not key:
-            continue
-        if host == key or host.endswith(f".{key}"):
-            return
+    matcher = _allowlist_matcher(allowlist_domains)
+    if matcher is not None and matcher.search(host):
+        return
     raise OciSecurityError(f"registry host '{host}' is not in OCI allowlist")
 
 
+@lru_cache(maxsize=64)
+def _allowlist_matcher(allowlist_domains: tuple[str, ...]) -> re.Pattern[str] | None:
+    domains = [domain.strip().lower() for domain in allowlist_domains]
+    domains = [domain for domain in domains if domain]
+    if not domains:
+        return None
+    alternation = "|".join(re.escape(domain) for domain in domains)
+    return re.compile(rf"(?:^|\.)(?:{alternation})$")
+
+
 def safe_output_path(base_dir: Path, relative_path: str) -> Path:
     target = (base_dir / relative_path).resolve()
     root = base_dir.resolve()
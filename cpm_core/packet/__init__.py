@@ -1,4 +1,13 @@
-from .faiss_db import FaissFlatIP, load_faiss_index, save_faiss_index
+from .faiss_db import (
+    DEFAULT_INDEX_RECIPE,
+    DEFAULT_NPROBE,
+    FaissFlatIP,
+    build_faiss_index,
+    load_faiss_index,
+    save_faiss_index,
+    set_nprobe,
+    tune_index_for_manifest,
+)
 from .io import (
     compute_checksums,
     load_manifest,
@@ -43,7 +52,12 @@ __all__ = [
     "verify_artifacts",
     "verify_lock_against_plan",
     "write_lock",
+    "DEFAULT_INDEX_RECIPE",
+    "DEFAULT_NPROBE",
     "FaissFlatIP",
+    "build_faiss_index",
     "load_faiss_index",
     "save_faiss_index",
+    "set_nprobe",
+    "tune_index_for_manifest",
 ]
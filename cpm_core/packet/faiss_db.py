@@ -6,6 +6,25 @@ from typing import Tuple
 import faiss
 import numpy as np
 
+DEFAULT_INDEX_RECIPE = "Flat"
+ADD_BLOCK_ROWS = 65536
+# FAISS k-means warns below 39 training points per centroid and fails below one.
+IVF_MIN_POINTS_PER_LIST = 39
+# Inverted lists probed per query on IVF indexes; FAISS's own default of 1 trades
+# far too much recall for speed at packet sizes.
+DEFAULT_NPROBE = 16
+
+
+def _add_blocked(index: faiss.Index, vectors: np.ndarray) -> None:
+    if vectors.dtype == np.float32:
+        index.add(np.ascontiguousarray(vectors))
+        return
+    # Convert other dtypes (e.g. fp16 from vectors.f16.bin) block by block so the
+    # float32 working set stays bounded instead of doubling the whole matrix.
+    for start in range(0, vectors.shape[0], ADD_BLOCK_ROWS):
+        block = np.ascontiguousarray(vectors[start : start + ADD_BLOCK_ROWS], dtype=np.float32)
+        index.add(block)
+
 
 class FaissFlatIP:
     """Cosine similarity via Inner Product on L2-normalized vectors."""
@@ -13,27 +32,113 @@ class FaissFlatIP:
     def __init__(self, dim: int):
         self.dim = dim
         self.index = faiss.IndexFlatIP(dim)
+        self._query_scratch = np.empty((0, dim), dtype=np.float32)
 
     def add(self, vectors: np.ndarray) -> None:
-        if vectors.dtype != np.float32:
-            vectors = vectors.astype("float32")
         if vectors.ndim != 2 or vectors.shape[1] != self.dim:
             raise ValueError(f"Expected vectors shape (n, {self.dim}), got {vectors.shape}")
-        self.index.add(vectors)
+        _add_blocked(self.index, vectors)
 
-    def search(self, query_vec: np.ndarray, k: int) -> Tuple[np.ndarray, np.ndarray]:
-        if query_vec.dtype != np.float32:
-            query_vec = query_vec.astype("float32")
+    def search(self, query_vec: np.ndarray, k: int, *, nprobe: int | None = None) -> Tuple[np.ndarray, np.ndarray]:
         if query_vec.ndim == 1:
             query_vec = query_vec.reshape(1, -1)
-        scores, ids = self.index.search(query_vec, k)
+        scores, ids = self.search_batch(query_vec[:1], k, nprobe=nprobe)
         return scores[0], ids[0]
 
+    def search_batch(
+        self, queries: np.ndarray, k: int, *, nprobe: int | None = None
+    ) -> Tuple[np.ndarray, np.ndarray]:
+        """Search a ``(B, dim)`` block of queries in one FAISS call.
+
+        FAISS turns a batch into a single matrix product, so callers with several
+        queries should prefer this over looping ``search``. Queries that are not
+        already C-contiguous float32 are converted into a scratch buffer reused
+        across calls, so a single instance should not be searched from several
+        threads at once. ``nprobe`` is applied first when the wrapped index is IVF.
+        """
+
+        if nprobe is not None:
+            set_nprobe(self.index, nprobe)
+        if queries.ndim != 2 or queries.shape[1] != self.dim:
+            raise ValueError(f"Expected queries shape (n, {self.dim}), got {queries.shape}")
+        if queries.dtype != np.float32 or not queries.flags.c_contiguous:
+            if self._query_scratch.shape[0] < queries.shape[0]:
+                self._query_scratch = np.empty((queries.shape[0], self.dim), dtype=np.float32)
+            scratch = self._query_scratch[: queries.shape[0]]
+            np.copyto(scratch, queries, casting="unsafe")
+            queries = scratch
+        return self.index.search(queries, k)
+
     def save(self, path: Path | str) -> None:
         faiss.write_index(self.index, str(path))
 
 
-def load_faiss_index(path: Path | str) -> faiss.Index:
+def build_faiss_index(
+    vectors: np.ndarray,
+    recipe: str = DEFAULT_INDEX_RECIPE,
+    *,
+    train_size: int | None = None,
+    seed: int = 0,
+) -> faiss.Index:
+    """Build an inner-product index from a FAISS factory recipe.
+
+    ``"Flat"`` keeps exact search; recipes such as ``"IVF1024,PQ32x8"`` or
+    ``"IVF1024,PQ32x4fs"`` trade recall for sub-linear search on large corpora.
+    Trainable indexes are trained on at most ``train_size`` sampled rows, but never
+    fewer than ``IVF_MIN_POINTS_PER_LIST`` per inverted list. A corpus too small to
+    train its IVF quantizer gets an exact ``IndexFlatIP`` instead.
+    """
+
+    if vectors.ndim != 2:
+        raise ValueError(f"Expected vectors shape (n, dim), got {vectors.shape}")
+    dim = int(vectors.shape[1])
+    index = faiss.index_factory(dim, recipe, faiss.METRIC_INNER_PRODUCT)
+    if not index.is_trained:
+        ivf = faiss.try_extract_index_ivf(index)
+        min_rows = IVF_MIN_POINTS_PER_LIST * ivf.nlist if ivf is not None else 0
+        if vectors.shape[0] < min_rows:
+            flat = FaissFlatIP(dim)
+            flat.add(vectors)
+            return flat.index
+        if train_size is not None:
+            train_size = max(train_size, min_rows)
+        sample = vectors
+        if train_size is not None and 0 < train_size < vectors.shape[0]:
+            rows = np.random.default_rng(seed).choice(vectors.shape[0], size=train_size, replace=False)
+            sample = vectors[np.sort(rows)]
+        index.train(np.ascontiguousarray(sample, dtype=np.float32))
+    _add_blocked(index, vectors)
+    return index
+
+
+def set_nprobe(index: faiss.Index, nprobe: int) -> bool:
+    """Set ``nprobe`` on IVF indexes; returns False for indexes without inverted lists."""
+
+    ivf = faiss.try_extract_index_ivf(index)
+    if ivf is None:
+        return False
+    ivf.nprobe = max(int(nprobe), 1)
+    return True
+
+
+def tune_index_for_manifest(index: faiss.Index, index_type: str | None, *, nprobe: int = DEFAULT_NPROBE) -> bool:
+    """Apply ``nprobe`` when a manifest's ``similarity.index_type`` names an IVF recipe.
+
+    Builds record ``faiss:<recipe>`` for factory indexes; returns True when the
+    index was tuned.
+    """
+
+    kind = str(index_type or "")
+    if not (kind.startswith("faiss:") and "IVF" in kind):
+        return False
+    return set_nprobe(index, nprobe)
+
+
+def load_faiss_index(path: Path | str, *, mmap: bool = False) -> faiss.Index:
+    """Read an index; ``mmap`` maps it read-only instead of copying it into memory."""
+
+    if mmap:
+        return faiss.read_index(str(path), faiss.IO_FLAG_MMAP | faiss.IO_FLAG_READ_ONLY)
     return faiss.read_index(str(path))
 
 
@@ -1,86 +1,124 @@
 from __future__ import annotations
 
 import hashlib
-import json
+import os
+from concurrent.futures import ThreadPoolExecutor
 from pathlib import Path
-from typing import Iterable
+from sys import intern
+from typing import Iterable, Sequence
 
 import numpy as np
 
+from cpm_core.jsonio import dumps_line, dumps_pretty, loads as json_loads
+
 from .models import DocChunk, PacketManifest
 
+_HASH_WORKERS = min(32, (os.cpu_count() or 1) * 4)
+_WRITE_BUFFER_BYTES = 1 << 20
+_WRITE_BATCH_LINES = 1024
 
-def _chunk_hash(text: str) -> str:
-    return hashlib.sha256(text.encode("utf-8")).hexdigest()
 
+def chunk_hash(text: str) -> str:
+    return hashlib.sha256(text.encode("utf-8"), usedforsecurity=False).hexdigest()
+
+
+def sha256_file(path: Path | str) -> str:
+    # Unbuffered: file_digest reads into its own 256 KiB buffer, so a BufferedReader
+    # in between only adds a copy. The sequential hint lets Linux read ahead harder.
+    with open(path, "rb", buffering=0) as f:
+        if hasattr(os, "posix_fadvise"):
+            try:
+                os.posix_fadvise(f.fileno(), 0, 0, os.POSIX_FADV_SEQUENTIAL)
+            except OSError:
+                pass
+        return hashlib.file_digest(f, "sha256").hexdigest()
 
-def _sha256_file(path: Path, chunk_size: int = 1024 * 1024) -> str:
-    digest = hashlib.sha256()
-    with path.open("rb") as f:
-        for chunk in iter(lambda: f.read(chunk_size), b""):
-            digest.update(chunk)
-    return digest.hexdigest()
 
+def write_docs_jsonl(
+    chunks: Iterable[DocChunk],
+    path: Path,
+    *,
+    hashes: Sequence[str] | None = None,
+) -> None:
+    """Write chunks as JSONL; ``hashes`` reuses chunk hashes the caller already computed."""
 
-def write_docs_jsonl(chunks: Iterable[DocChunk], path: Path) -> None:
-    with path.open("w", encoding="utf-8") as f:
-        for chunk in chunks:
-            entry: dict[str, object | str] = {
+    batch: list[bytes] = []
+    with path.open("wb", buffering=_WRITE_BUFFER_BYTES) as f:
+        for idx, chunk in enumerate(chunks):
+            entry: dict[str, object] = {
                 "id": chunk.id,
                 "text": chunk.text,
-                "hash": _chunk_hash(chunk.text),
+                "hash": hashes[idx] if hashes is not None else chunk_hash(chunk.text),
                 "metadata": chunk.metadata,
             }
-            json.dump(entry, f, ensure_ascii=False)
-            f.write("\n")
+            batch.append(dumps_line(entry))
+            if len(batch) >= _WRITE_BATCH_LINES:
+                f.writelines(batch)
+                batch.clear()
+        f.writelines(batch)
 
 
 def read_docs_jsonl(path: Path) -> list[DocChunk]:
     chunks: list[DocChunk] = []
-    with path.open("r", encoding="utf-8") as f:
+    with path.open("rb") as f:
         for line in f:
-            line = line.strip()
-            if not line:
+            if not line.strip():
                 continue
-            entry = json.loads(line)
-            metadata = dict(entry.get("metadata") or {})
-            chunk = DocChunk(id=str(entry["id"]), text=str(entry["text"]), metadata=metadata)
-            chunks.append(chunk)
+            entry = json_loads(line)
+            # Metadata schemas repeat the same handful of keys across every chunk;
+            # interning lets all chunks share one str object per key.
+            metadata = {intern(str(key)): value for key, value in (entry.get("metadata") or {}).items()}
+            chunks.append(DocChunk(id=str(entry["id"]), text=str(entry["text"]), metadata=metadata))
     return chunks
 
 
 def write_vectors_f16(vectors: np.ndarray, path: Path) -> None:
-    np.asarray(vectors, dtype=np.float16).tofile(str(path))
+    array = np.asarray(vectors)
+    if array.dtype == np.float16 or array.size == 0:
+        np.ascontiguousarray(array, dtype=np.float16).tofile(str(path))
+        return
+    # Cast straight into the mapped file instead of materializing an fp16 copy first.
+    mapped = np.memmap(str(path), dtype=np.float16, mode="w+", shape=array.shape)
+    np.copyto(mapped, array, casting="unsafe")
+    mapped.flush()
+    del mapped
+
+
+def read_vectors_f16(path: Path, dim: int, *, upcast: bool = True) -> np.ndarray:
+    """Load ``vectors.f16.bin`` as an ``(n, dim)`` matrix.
 
+    The file is memory-mapped, so with ``upcast=False`` the returned float16 view is
+    paged in lazily; with the default ``upcast=True`` a single float32 copy is made.
+    """
 
-def read_vectors_f16(path: Path, dim: int) -> np.ndarray:
     if dim <= 0:
         raise ValueError("dim must be positive")
-    raw = np.fromfile(str(path), dtype=np.float16)
-    if raw.size % dim != 0:
-        raise ValueError(f"vectors file length {raw.size} is not divisible by dim={dim}")
-    reshaped = raw.reshape(-1, dim)
-    return reshaped.astype(np.float32)
+    size = path.stat().st_size // np.dtype(np.float16).itemsize
+    if size % dim != 0:
+        raise ValueError(f"vectors file length {size} is not divisible by dim={dim}")
+    if size == 0:
+        raw = np.empty((0, dim), dtype=np.float16)
+    else:
+        raw = np.memmap(str(path), dtype=np.float16, mode="r", shape=(size // dim, dim))
+    if not upcast:
+        return raw
+    return raw.astype(np.float32)
 
 
 def compute_checksums(root: Path, relative_paths: Iterable[str]) -> dict[str, dict[str, str]]:
-    checksums: dict[str, dict[str, str]] = {}
-    for rel in relative_paths:
-        target = root / rel
-        if not target.exists():
-            continue
-        rel_str = rel.replace("\\", "/")
-        checksums[rel_str] = {"algo": "sha256", "value": _sha256_file(target)}
-    return checksums
+    present = [(rel.replace("\\", "/"), root / rel) for rel in relative_paths if (root / rel).exists()]
+    if len(present) > 1:
+        with ThreadPoolExecutor(max_workers=min(_HASH_WORKERS, len(present))) as executor:
+            digests = list(executor.map(sha256_file, [target for _, target in present]))
+    else:
+        digests = [sha256_file(target) for _, target in present]
+    return {rel: {"algo": "sha256", "value": digest} for (rel, _), digest in zip(present, digests)}
 
 
 def load_manifest(path: Path) -> PacketManifest:
-    return PacketManifest.from_dict(json.loads(path.read_text(encoding="utf-8")))
+    return PacketManifest.from_dict(json_loads(path.read_bytes()))
 
 
 def write_manifest(manifest: PacketManifest, path: Path) -> None:
     path.parent.mkdir(parents=True, exist_ok=True)
-    path.write_text(
-        json.dumps(manifest.to_dict(), ensure_ascii=False, indent=2),
-        encoding="utf-8",
-    )
+    path.write_bytes(dumps_pretty(manifest.to_dict(copy=False)))
@@ -2,15 +2,26 @@ from __future__ import annotations
 
 import hashlib
 import json
+import os
+import time
+from concurrent.futures import ThreadPoolExecutor
 from dataclasses import dataclass
 from datetime import datetime, timezone
+from functools import lru_cache
 from importlib import metadata as importlib_metadata
 from pathlib import Path
 from typing import Any, Mapping, Sequence
 
+from cpm_core.jsonio import loads as json_loads
+
+from .io import sha256_file as _sha256_path
+
 
 LOCKFILE_VERSION = 1
 DEFAULT_LOCKFILE_NAME = "packet.lock.json"
+_HASH_WORKERS = min(32, (os.cpu_count() or 1) * 4)
+_TREE_CACHE_VERSION = 1
+RACY_MTIME_NS = 2_000_000_000
 
 
 @dataclass(frozen=True)
@@ -28,41 +39,140 @@ class VerifyResult:
     errors: tuple[str, ...]
 
 
-def _canonical_json(data: Mapping[str, Any]) -> str:
-    return json.dumps(data, ensure_ascii=False, sort_keys=True, separators=(",", ":"))
+def _canonical_json(data: Mapping[str, Any]) -> bytes:
+    if not isinstance(data, dict):
+        data = dict(data)
+    return json.dumps(data, ensure_ascii=False, sort_keys=True, separators=(",", ":")).encode("utf-8")
+
+
+def _sha256_bytes(data: bytes) -> str:
+    return hashlib.sha256(data).hexdigest()
 
 
 def _sha256_text(text: str) -> str:
-    return hashlib.sha256(text.encode("utf-8")).hexdigest()
+    return _sha256_bytes(text.encode("utf-8"))
+
+
+def _sha256_file(path: Path | str) -> str:
+    stat = os.stat(path)
+    if stat.st_mtime_ns >= time.time_ns() - RACY_MTIME_NS:
+        # Same rule as the tree hash cache: a same-size rewrite within one mtime
+        # tick keeps the stat key, so recently modified files are always re-read.
+        return _sha256_path(path)
+    return _sha256_file_cached(os.fspath(path), stat.st_size, stat.st_mtime_ns, stat.st_ino)
+
+
+@lru_cache(maxsize=4096)
+def _sha256_file_cached(path: str, size: int, mtime_ns: int, inode: int) -> str:
+    # The stat fields only key the cache: an unchanged file is not re-read
+    # across plan/verify/artifact passes within one process.
+    del size, mtime_ns, inode
+    return _sha256_path(path)
 
 
-def _sha256_file(path: Path, chunk_size: int = 1024 * 1024) -> str:
-    digest = hashlib.sha256()
-    with path.open("rb") as handle:
-        while True:
-            chunk = handle.read(chunk_size)
-            if not chunk:
-                break
-            digest.update(chunk)
-    return digest.hexdigest()
+def _sha256_files(paths: Sequence[Path | str]) -> list[str]:
+    if len(paths) <= 1:
+        return [_sha256_file(path) for path in paths]
+    # file_digest releases the GIL, so threads overlap both I/O and hashing.
+    with ThreadPoolExecutor(max_workers=min(_HASH_WORKERS, len(paths))) as executor:
+        return list(executor.map(_sha256_file, paths))
 
 
 def _normalize_path(path: Path) -> str:
     return path.as_posix().replace("\\", "/")
 
 
-def _directory_tree_hash(root: Path) -> str:
-    entries: list[tuple[str, str]] = []
-    for item in sorted(root.rglob("*")):
-        if not item.is_file():
+def _tree_files(root: Path) -> list[tuple[str, str]]:
+    """Return ``(relative_posix_path, absolute_path)`` for every file under ``root``.
+
+    Ordering matches ``sorted(root.rglob("*"))``: paths compare component by
+    component (case-folded where the platform does), not as flat strings.
+    """
+
+    files: list[tuple[str, str]] = []
+    pending = [("", os.fspath(root))]
+    while pending:
+        prefix, directory = pending.pop()
+        try:
+            with os.scandir(directory) as entries:
+                for entry in entries:
+                    rel = f"{prefix}{entry.name}"
+                    if entry.is_dir(follow_symlinks=False):
+                        pending.append((f"{rel}/", entry.path))
+                    elif entry.is_file():
+                        files.append((rel, entry.path))
+        except PermissionError:
             continue
-        rel = _normalize_path(item.relative_to(root))
-        entries.append((rel, _sha256_file(item)))
-    payload = "\n".join(f"{rel}:{digest}" for rel, digest in entries)
+    files.sort(key=lambda item: [os.path.normcase(part) for part in item[0].split("/")])
+    return files
+
+
+def _tree_hash_cache_path(cache_dir: Path, root: Path) -> Path:
+    key = _sha256_text(_normalize_path(root))[:16]
+    return cache_dir / "input-hashes" / f"{key}.json"
+
+
+def _load_tree_hash_cache(path: Path) -> dict[str, list[Any]]:
+    try:
+        payload = json_loads(path.read_bytes())
+    except (OSError, ValueError):
+        return {}
+    if not isinstance(payload, dict) or payload.get("version") != _TREE_CACHE_VERSION:
+        return {}
+    files = payload.get("files")
+    return files if isinstance(files, dict) else {}
+
+
+def _store_tree_hash_cache(path: Path, files: dict[str, list[Any]]) -> None:
+    try:
+        path.parent.mkdir(parents=True, exist_ok=True)
+        tmp_path = path.with_name(f"{path.name}.tmp")
+        tmp_path.write_text(json.dumps({"version": _TREE_CACHE_VERSION, "files": files}), encoding="utf-8")
+        os.replace(tmp_path, path)
+    except OSError:
+        pass
+
+
+def _directory_tree_hash(root: Path, *, cache_dir: Path | None = None) -> str:
+    """Hash every file under ``root`` into one digest.
+
+    With ``cache_dir``, per-file digests are persisted keyed by size and mtime so
+    later runs only re-read files that changed. Files modified within the last
+    couple of seconds are never cached, since a same-size rewrite inside one
+    mtime tick would otherwise go unnoticed.
+    """
+
+    files = _tree_files(root)
+    if cache_dir is None:
+        digests = _sha256_files([path for _, path in files])
+    else:
+        cache_path = _tree_hash_cache_path(cache_dir, root)
+        cached = _load_tree_hash_cache(cache_path)
+        racy_after = time.time_ns() - RACY_MTIME_NS
+        fresh: dict[str, list[Any]] = {}
+        digests = [""] * len(files)
+        missing: list[int] = []
+        for idx, (rel, path) in enumerate(files):
+            stat = os.stat(path)
+            previous = cached.get(rel)
+            if previous and previous[:2] == [stat.st_size, stat.st_mtime_ns]:
+                digests[idx] = previous[2]
+            else:
+                missing.append(idx)
+            if stat.st_mtime_ns < racy_after:
+                fresh[rel] = [stat.st_size, stat.st_mtime_ns, None]
+        for idx, digest in zip(missing, _sha256_files([files[idx][1] for idx in missing])):
+            digests[idx] = digest
+        for idx, (rel, _) in enumerate(files):
+            if rel in fresh:
+                fresh[rel][2] = digests[idx]
+        if fresh != cached:
+            _store_tree_hash_cache(cache_path, fresh)
+    payload = "\n".join(f"{rel}:{digest}" for (rel, _), digest in zip(files, digests))
     return _sha256_text(payload)
 
 
-def _hash_inputs(source_path: Path) -> list[dict[str, Any]]:
+def _hash_inputs(source_path: Path, *, hash_cache_dir: Path | None = None) -> list[dict[str, Any]]:
     resolved = source_path.resolve()
     if resolved.is_file():
         return [
@@ -77,7 +187,7 @@ def _hash_inputs(source_path: Path) -> list[dict[str, Any]]:
             {
                 "kind": "dir",
                 "ref": _normalize_path(resolved),
-                "hash": _directory_tree_hash(resolved),
+                "hash": _directory_tree_hash(resolved, cache_dir=hash_cache_dir),
             }
         ]
     return []
@@ -105,8 +215,9 @@ def build_resolved_plan(
     model_dtype: str,
     normalize: bool,
     max_seq_length: int | None,
+    hash_cache_dir: Path | None = None,
 ) -> ResolvedPacketPlan:
-    config_hash = _sha256_text(_canonical_json(dict(config_payload)))
+    config_hash = _sha256_bytes(_canonical_json(config_payload))
     warnings: list[str] = []
     pipeline = [
         {
@@ -149,7 +260,7 @@ def build_resolved_plan(
             "max_seq_length": max_seq_length,
         }
     ]
-    resolved_packet_id = _sha256_text(
+    resolved_packet_id = _sha256_bytes(
         _canonical_json(
             {
                 "packet_name": packet_name,
@@ -169,7 +280,7 @@ def build_resolved_plan(
     }
     return ResolvedPacketPlan(
         packet=packet,
-        inputs=_hash_inputs(source_path),
+        inputs=_hash_inputs(source_path, hash_cache_dir=hash_cache_dir),
         pipeline=pipeline,
         models=models,
         warnings=warnings,
@@ -202,7 +313,7 @@ def write_lock(path: Path, payload: Mapping[str, Any]) -> None:
 
 
 def load_lock(path: Path) -> dict[str, Any]:
-    data = json.loads(path.read_text(encoding="utf-8"))
+    data = json_loads(path.read_bytes())
     if not isinstance(data, dict):
         raise ValueError("lockfile payload must be an object")
     return data
@@ -215,11 +326,9 @@ def artifact_hashes(packet_dir: Path) -> dict[str, str]:
         "index_hash": packet_dir / "faiss" / "index.faiss",
         "packet_manifest_hash": packet_dir / "manifest.json",
     }
-    result: dict[str, str] = {}
-    for key, target in targets.items():
-        if target.exists():
-            result[key] = _sha256_file(target)
-    return result
+    present = [(key, target) for key, target in targets.items() if target.exists()]
+    digests = _sha256_files([target for _, target in present])
+    return {key: digest for (key, _), digest in zip(present, digests)}
 
 
 def verify_lock_against_plan(lock_payload: Mapping[str, Any], plan: ResolvedPacketPlan) -> VerifyResult:
@@ -4,7 +4,7 @@ from dataclasses import dataclass, field
 from typing import Any, Dict, Mapping
 
 
-@dataclass
+@dataclass(slots=True)
 class DocChunk:
     id: str
     text: str
@@ -19,7 +19,7 @@ class DocChunk:
         return cls(id=str(data["id"]), text=str(data["text"]), metadata=metadata)
 
 
-@dataclass(frozen=True)
+@dataclass(frozen=True, slots=True)
 class EmbeddingSpec:
     provider: str | None
     model: str
@@ -65,7 +65,7 @@ class EmbeddingSpec:
         )
 
 
-@dataclass
+@dataclass(slots=True)
 class PacketManifest:
     schema_version: str
     packet_id: str
@@ -126,18 +126,27 @@ class PacketManifest:
             extras=extras,
         )
 
-    def to_dict(self) -> Dict[str, Any]:
+    def to_dict(self, *, copy: bool = True) -> Dict[str, Any]:
+        """Return the manifest as a JSON-ready dict.
+
+        With ``copy=False`` the section mappings are shared rather than copied; use it
+        only when the result is serialized straight away and never mutated.
+        """
+
+        def section(value: Dict[str, Any]) -> Dict[str, Any]:
+            return dict(value) if copy else value
+
         payload = {
             "schema_version": self.schema_version,
             "packet_id": self.packet_id,
             "embedding": self.embedding.to_dict(),
-            "similarity": dict(self.similarity),
-            "files": dict(self.files),
-            "counts": dict(self.counts),
-            "source": dict(self.source),
-            "cpm": dict(self.cpm),
-            "incremental": dict(self.incremental),
-            "checksums": dict(self.checksums),
+            "similarity": section(self.similarity),
+            "files": section(self.files),
+            "counts": section(self.counts),
+            "source": section(self.source),
+            "cpm": section(self.cpm),
+            "incremental": section(self.incremental),
+            "checksums": section(self.checksums),
         }
         payload.update(self.extras)
         return payload
@@ -2,11 +2,15 @@
 
 from __future__ import annotations
 
+import json
 import logging
+import os
+import stat
+from concurrent.futures import ThreadPoolExecutor
 from dataclasses import dataclass, field
 from enum import Enum
 from pathlib import Path
-from typing import Sequence
+from typing import Any, Sequence
 
 from cpm_core.events import EventBus
 from cpm_core.paths import UserDirs
@@ -32,6 +36,8 @@ PRE_DISCOVERY_EVENT = "plugin.pre_discovery"
 POST_DISCOVERY_EVENT = "plugin.post_discovery"
 PRE_PLUGIN_INIT_EVENT = "plugin.pre_plugin_init"
 POST_PLUGIN_INIT_EVENT = "plugin.post_plugin_init"
+PLUGIN_INDEX_FILE_NAME = "plugins.index.json"
+PLUGIN_INDEX_VERSION = 1
 
 
 class PluginState(Enum):
@@ -42,7 +48,7 @@ class PluginState(Enum):
     FAILED = "failed"
 
 
-@dataclass
+@dataclass(slots=True)
 class PluginRecord:
     """Snapshot of a plugin that has been discovered."""
 
@@ -53,9 +59,10 @@ class PluginRecord:
     source: str = "unknown"
     features: tuple[CPMRegistryEntry, ...] = field(default_factory=tuple)
     error: str | None = None
+    warning: str | None = None
 
 
-@dataclass(frozen=True)
+@dataclass(frozen=True, slots=True)
 class _PluginCandidate:
     id: str
     manifest: PluginManifest
@@ -85,10 +92,19 @@ class PluginManager:
             EMBEDDINGS_FILE_NAME,
         )
         self._workspace_plugins_dir = layout.plugins_dir
-        self._workspace_plugins_dir.mkdir(parents=True, exist_ok=True)
+        self._plugin_index_path = layout.cache_dir / PLUGIN_INDEX_FILE_NAME
+        if not layout.is_initialized():
+            self._workspace_plugins_dir.mkdir(parents=True, exist_ok=True)
         self._user_plugins_dir = self.user_dirs.data_dir() / "plugins"
+        self._discovery_payload = {
+            "workspace_plugins": str(self._workspace_plugins_dir),
+            "user_plugins": str(self._user_plugins_dir),
+        }
+        self._plugin_loggers: dict[str, logging.Logger] = {}
         self._registered: list[str] = []
         self._records: dict[str, PluginRecord] = {}
+        self._list_cache: tuple[str, ...] | None = None
+        self._records_cache: tuple[PluginRecord, ...] | None = None
         self._loaded = False
 
     def register(self, name: str, *, state: PluginState | None = PluginState.READY) -> None:
@@ -96,8 +112,11 @@ class PluginManager:
 
         if name not in self._registered:
             self._registered.append(name)
+            self._list_cache = None
+            self._records_cache = None
         record = self._records.get(name)
         if record is None:
+            self._records_cache = None
             self._records[name] = PluginRecord(
                 id=name,
                 state=state or PluginState.READY,
@@ -108,14 +127,20 @@ class PluginManager:
             record.state = state
 
     def list_plugins(self) -> tuple[str, ...]:
-        return tuple(self._registered)
+        if self._list_cache is None:
+            self._list_cache = tuple(self._registered)
+        return self._list_cache
 
     def plugin_records(self) -> tuple[PluginRecord, ...]:
-        return tuple(
-            self._records[name]
-            for name in self._registered
-            if name in self._records
-        )
+        # Records are mutated in place as plugins load, so only membership changes
+        # (register/_prepare_candidate) invalidate this tuple.
+        if self._records_cache is None:
+            self._records_cache = tuple(
+                self._records[name]
+                for name in self._registered
+                if name in self._records
+            )
+        return self._records_cache
 
     def load_plugins(self) -> None:
         """Discover and load plugins from workspace/user paths."""
@@ -123,12 +148,7 @@ class PluginManager:
         if self._loaded:
             return
 
-        workspace_path = str(self._workspace_plugins_dir)
-        user_path = str(self._user_plugins_dir)
-        self.events.emit(
-            PRE_DISCOVERY_EVENT,
-            {"workspace_plugins": workspace_path, "user_plugins": user_path},
-        )
+        self.events.emit(PRE_DISCOVERY_EVENT, dict(self._discovery_payload))
 
         candidates = self._discover_candidates()
 
@@ -139,86 +159,179 @@ class PluginManager:
 
         for candidate in candidates:
             context = self._prepare_candidate(candidate)
-            record = self._records[candidate.id]
-            self.events.emit(
-                PRE_PLUGIN_INIT_EVENT,
-                {"plugin_id": candidate.id, "source": candidate.source},
-            )
-
-            registered_entries: list[CPMRegistryEntry] = []
+            if not candidate.manifest.features:
+                self._initialize_candidate(candidate, context)
+                continue
+            # Manifests that declare their features are imported on first resolution.
             try:
-                loader = PluginLoader(candidate.manifest, context)
-                entries = loader.load()
-                for entry in entries:
-                    self.registry.register(entry)
-                    registered_entries.append(entry)
-            except PluginLoadError as exc:
-                record.state = PluginState.FAILED
-                record.error = str(exc)
-                self._logger.exception("plugin %s failed to load", candidate.id)
+                self.registry.register_deferred(
+                    candidate.manifest.group,
+                    candidate.manifest.features,
+                    lambda candidate=candidate, context=context: self._initialize_candidate(candidate, context),
+                )
             except FeatureCollisionError as exc:
+                record = self._records[candidate.id]
                 record.state = PluginState.FAILED
                 record.error = str(exc)
                 self._logger.error("feature collision while loading %s: %s", candidate.id, exc)
-            else:
-                record.state = PluginState.READY
-                record.error = None
-            finally:
-                record.features = tuple(registered_entries)
-                self.events.emit(
-                    POST_PLUGIN_INIT_EVENT,
-                    {
-                        "plugin_id": candidate.id,
-                        "state": record.state.value,
-                        "error": record.error,
-                    },
-                )
 
         self._loaded = True
 
+    def _initialize_candidate(self, candidate: _PluginCandidate, context: PluginContext) -> None:
+        record = self._records[candidate.id]
+        self.events.emit(
+            PRE_PLUGIN_INIT_EVENT,
+            {"plugin_id": candidate.id, "source": candidate.source},
+        )
+
+        registered_entries: list[CPMRegistryEntry] = []
+        try:
+            loader = PluginLoader(candidate.manifest, context)
+            entries = loader.load()
+            for entry in entries:
+                self.registry.register(entry)
+                registered_entries.append(entry)
+        except PluginLoadError as exc:
+            record.state = PluginState.FAILED
+            record.error = str(exc)
+            self._logger.exception("plugin %s failed to load", candidate.id)
+        except FeatureCollisionError as exc:
+            record.state = PluginState.FAILED
+            record.error = str(exc)
+            self._logger.error("feature collision while loading %s: %s", candidate.id, exc)
+        else:
+            record.state = PluginState.READY
+            record.error = None
+            if candidate.manifest.features:
+                self._check_declared_features(candidate, record, registered_entries)
+        finally:
+            record.features = tuple(registered_entries)
+            self.events.emit(
+                POST_PLUGIN_INIT_EVENT,
+                {
+                    "plugin_id": candidate.id,
+                    "state": record.state.value,
+                    "error": record.error,
+                },
+            )
+
+    def _check_declared_features(
+        self,
+        candidate: _PluginCandidate,
+        record: PluginRecord,
+        entries: Sequence[CPMRegistryEntry],
+    ) -> None:
+        # A stale [features] list reserves names the plugin never registers (they
+        # vanish after loading) and hides undeclared ones until entries() runs.
+        group = candidate.manifest.group
+        declared = {f"{group}:{name}" for name in candidate.manifest.features}
+        registered = {entry.qualified_name for entry in entries}
+        if declared == registered:
+            record.warning = None
+            return
+        missing = ", ".join(sorted(declared - registered)) or "none"
+        undeclared = ", ".join(sorted(registered - declared)) or "none"
+        record.warning = f"declared features mismatch (missing: {missing}; undeclared: {undeclared})"
+        self._logger.warning("plugin %s %s", candidate.id, record.warning)
+
     def _discover_candidates(self) -> list[_PluginCandidate]:
         discovered: list[_PluginCandidate] = []
         seen: set[str] = set()
+        previous_index = self._read_plugin_index()
+        PluginManifest.prime_cache(previous_index)
+        index: list[dict[str, Any]] = []
 
         directories: Sequence[tuple[str, Path]] = [
             ("workspace", self._workspace_plugins_dir),
             ("user", self._user_plugins_dir),
         ]
 
-        for source, directory in directories:
-            if not directory.exists():
-                continue
-            for child in sorted(directory.iterdir(), key=lambda path: path.name):
-                if not child.is_dir():
-                    continue
-                manifest_path = child / "plugin.toml"
-                if not manifest_path.is_file():
-                    continue
-                try:
-                    manifest = PluginManifest.load(manifest_path)
-                except PluginManifestError as exc:
-                    self._logger.warning("skipping %s: %s", child, exc)
-                    continue
-                if manifest.id != child.name:
-                    self._logger.warning(
-                        "plugin folder %s id mismatch %s", child, manifest.id
-                    )
-                    continue
-                if manifest.id in seen:
+        # The two roots are often on different mounts (project vs. home), so scan
+        # them concurrently; precedence is applied afterwards in directory order.
+        with ThreadPoolExecutor(max_workers=len(directories)) as executor:
+            scans = list(executor.map(lambda item: self._scan_directory(*item), directories))
+
+        for candidates, records in scans:
+            index.extend(records)
+            for candidate in candidates:
+                if candidate.id in seen:
                     continue
-                seen.add(manifest.id)
-                discovered.append(
-                    _PluginCandidate(
-                        id=manifest.id,
-                        manifest=manifest,
-                        path=child,
-                        source=source,
-                    )
-                )
+                seen.add(candidate.id)
+                discovered.append(candidate)
 
+        if index != previous_index:
+            self._write_plugin_index(index)
         return discovered
 
+    def _scan_directory(
+        self, source: str, directory: Path
+    ) -> tuple[list[_PluginCandidate], list[dict[str, Any]]]:
+        candidates: list[_PluginCandidate] = []
+        records: list[dict[str, Any]] = []
+        try:
+            with os.scandir(directory) as iterator:
+                # DirEntry.is_dir() answers from d_type, so only symlinks cost a stat.
+                children = sorted(entry.name for entry in iterator if entry.is_dir())
+        except (FileNotFoundError, NotADirectoryError):
+            return candidates, records
+        for name in children:
+            child = directory / name
+            manifest_path = child / "plugin.toml"
+            try:
+                manifest_stat = os.stat(manifest_path)
+            except OSError:
+                continue
+            if not stat.S_ISREG(manifest_stat.st_mode):
+                continue
+            try:
+                manifest = PluginManifest.load(manifest_path, stat_result=manifest_stat)
+            except PluginManifestError as exc:
+                self._logger.warning("skipping %s: %s", child, exc)
+                continue
+            records.append(manifest.cache_record(manifest_path, manifest_stat))
+            if manifest.id != child.name:
+                self._logger.warning(
+                    "plugin folder %s id mismatch %s", child, manifest.id
+                )
+                continue
+            candidates.append(
+                _PluginCandidate(
+                    id=manifest.id,
+                    manifest=manifest,
+                    path=child,
+                    source=source,
+                )
+            )
+        return candidates, records
+
+    def _plugin_logger(self, plugin_id: str) -> logging.Logger:
+        logger = self._plugin_loggers.get(plugin_id)
+        if logger is None:
+            logger = self._plugin_loggers[plugin_id] = logging.getLogger(f"{__name__}.{plugin_id}")
+        return logger
+
+    def _read_plugin_index(self) -> list[dict[str, Any]]:
+        try:
+            payload = json.loads(self._plugin_index_path.read_bytes())
+        except (OSError, ValueError):
+            return []
+        if not isinstance(payload, dict) or payload.get("version") != PLUGIN_INDEX_VERSION:
+            return []
+        records = payload.get("manifests")
+        return records if isinstance(records, list) else []
+
+    def _write_plugin_index(self, records: list[dict[str, Any]]) -> None:
+        payload = {"version": PLUGIN_INDEX_VERSION, "manifests": records}
+        tmp_path = self._plugin_index_path.with_name(f"{self._plugin_index_path.name}.tmp")
+        try:
+            self._plugin_index_path.parent.mkdir(parents=True, exist_ok=True)
+            tmp_path.write_text(json.dumps(payload, indent=2), encoding="utf-8")
+            os.replace(tmp_path, self._plugin_index_path)
+        except OSError as exc:
+            self._logger.debug("unable to write plugin index %s: %s", self._plugin_index_path, exc)
+
     def _prepare_candidate(self, candidate: _PluginCandidate) -> PluginContext:
+        self._records_cache = None
         self._records[candidate.id] = PluginRecord(
             id=candidate.id,
             manifest=candidate.manifest,
@@ -232,5 +345,5 @@ class PluginManager:
             workspace_root=self.workspace.root,
             registry=self.registry,
             events=self.events,
-            logger=logging.getLogger(f"{__name__}.{candidate.id}"),
+            logger=self._plugin_logger(candidate.id),
         )
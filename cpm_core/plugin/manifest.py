@@ -2,14 +2,19 @@
 
 from __future__ import annotations
 
-from dataclasses import dataclass
+from dataclasses import asdict, dataclass
+import os
 from pathlib import Path
+from typing import Any, Iterable, Mapping
 import tomllib
 
 from .errors import PluginManifestError
 
+_REQUIRED_KEYS = ("id", "name", "version", "group", "entrypoint", "requires_cpm")
+_MANIFEST_CACHE: dict[tuple[str, int, int], "PluginManifest"] = {}
 
-@dataclass(frozen=True)
+
+@dataclass(frozen=True, slots=True)
 class PluginManifest:
     """Immutable representation of a plugin manifest document."""
 
@@ -19,42 +24,100 @@ class PluginManifest:
     group: str
     entrypoint: str
     requires_cpm: str
+    features: tuple[str, ...] = ()
 
     @staticmethod
-    def _normalize_field(label: str, value: str) -> str:
+    def _normalize_field(label: str, value: object) -> str:
+        if not isinstance(value, str):
+            raise PluginManifestError(f"'{label}' must be a string")
         normalized = value.strip()
         if not normalized:
             raise PluginManifestError(f"{label} cannot be empty.")
         return normalized
 
     @classmethod
-    def load(cls, path: Path) -> "PluginManifest":
-        """Load and validate plugin manifest data from ``plugin.toml``."""
+    def load(cls, path: Path, *, stat_result: os.stat_result | None = None) -> "PluginManifest":
+        """Load and validate plugin manifest data from ``plugin.toml``.
+
+        Parsed manifests are cached per process, keyed by path, mtime and size.
+        Callers that already stat'ed ``path`` can pass ``stat_result`` to skip a syscall.
+        """
+
+        stat = stat_result
+        if stat is None:
+            try:
+                stat = os.stat(path)
+            except OSError as exc:
+                raise PluginManifestError(f"unable to read manifest at {path}") from exc
+        key = (os.path.abspath(path), stat.st_mtime_ns, stat.st_size)
+        cached = _MANIFEST_CACHE.get(key)
+        if cached is not None:
+            return cached
+        manifest = cls._parse(path)
+        _MANIFEST_CACHE[key] = manifest
+        return manifest
+
+    @classmethod
+    def clear_cache(cls) -> None:
+        """Drop every cached manifest."""
+
+        _MANIFEST_CACHE.clear()
+
+    @classmethod
+    def prime_cache(cls, records: Iterable[Mapping[str, Any]]) -> None:
+        """Seed the cache from records produced by :meth:`cache_record`.
+
+        Malformed records are ignored; a stale record simply never matches a stat key.
+        """
 
+        for record in records:
+            try:
+                fields = dict(record["manifest"])
+                fields["features"] = tuple(fields.get("features") or ())
+                key = (str(record["path"]), int(record["mtime_ns"]), int(record["size"]))
+                _MANIFEST_CACHE.setdefault(key, cls(**fields))
+            except (KeyError, TypeError, ValueError):
+                continue
+
+    def cache_record(self, path: Path, stat_result: os.stat_result) -> dict[str, Any]:
+        """Return a JSON-ready record that :meth:`prime_cache` can restore."""
+
+        manifest = asdict(self)
+        manifest["features"] = list(self.features)
+        return {
+            "path": os.path.abspath(path),
+            "mtime_ns": stat_result.st_mtime_ns,
+            "size": stat_result.st_size,
+            "manifest": manifest,
+        }
+
+    @classmethod
+    def _parse(cls, path: Path) -> "PluginManifest":
         try:
-            with path.open("rb") as handle:
-                document = tomllib.load(handle)
-        except (OSError, tomllib.TOMLDecodeError) as exc:
+            document = tomllib.loads(path.read_bytes().decode("utf-8"))
+        except (OSError, UnicodeDecodeError, tomllib.TOMLDecodeError) as exc:
             raise PluginManifestError(f"unable to read manifest at {path}") from exc
 
         plugin_section = document.get("plugin")
         if not isinstance(plugin_section, dict):
             raise PluginManifestError("missing or malformed [plugin] section")
 
-        fields: dict[str, str] = {}
-        for key in (
-            "id",
-            "name",
-            "version",
-            "group",
-            "entrypoint",
-            "requires_cpm",
-        ):
-            raw_value = plugin_section.get(key)
-            if raw_value is None:
-                raise PluginManifestError(f"missing '{key}' in manifest")
-            if not isinstance(raw_value, str):
-                raise PluginManifestError(f"'{key}' must be a string")
-            fields[key] = cls._normalize_field(key, raw_value)
-
-        return cls(**fields)
+        try:
+            fields = {key: cls._normalize_field(key, plugin_section[key]) for key in _REQUIRED_KEYS}
+        except KeyError as exc:
+            raise PluginManifestError(f"missing '{exc.args[0]}' in manifest") from None
+
+        return cls(**fields, features=cls._parse_features(document.get("features")))
+
+    @classmethod
+    def _parse_features(cls, section: object) -> tuple[str, ...]:
+        """Read the optional ``[features]`` section that enables lazy loading."""
+
+        if section is None:
+            return ()
+        if not isinstance(section, dict):
+            raise PluginManifestError("malformed [features] section")
+        names = section.get("names", [])
+        if not isinstance(names, list):
+            raise PluginManifestError("'features.names' must be a list of strings")
+        return tuple(cls._normalize_field("features.names", name) for name in names)
@@ -2,11 +2,12 @@
 
 from __future__ import annotations
 
-from dataclasses import dataclass
+import sys
+from dataclasses import dataclass, field
 from typing import Any, Type
 
 
-@dataclass(frozen=True)
+@dataclass(frozen=True, slots=True)
 class CPMRegistryEntry:
     """Immutable descriptor for a registered CPM feature."""
 
@@ -15,14 +16,17 @@ class CPMRegistryEntry:
     target: Type[Any]
     kind: str
     origin: str
+    # ``group:name`` identifier, computed once in __post_init__.
+    qualified_name: str = field(init=False, repr=False, compare=False)
 
     def __post_init__(self) -> None:
-        object.__setattr__(self, "group", self._validate_component("group", self.group))
-        object.__setattr__(self, "name", self._validate_component("name", self.name))
+        object.__setattr__(self, "group", sys.intern(self._validate_component("group", self.group)))
+        object.__setattr__(self, "name", sys.intern(self._validate_component("name", self.name)))
         object.__setattr__(self, "kind", self._validate_component("kind", self.kind))
         object.__setattr__(self, "origin", self._validate_component("origin", self.origin))
         if not isinstance(self.target, type):
             raise TypeError("target must be a class type.")
+        object.__setattr__(self, "qualified_name", sys.intern(f"{self.group}:{self.name}"))
 
     @staticmethod
     def _validate_component(label: str, value: str) -> str:
@@ -31,9 +35,3 @@ class CPMRegistryEntry:
         if ":" in value:
             raise ValueError(f"{label} may not contain ':'.")
         return value
-
-    @property
-    def qualified_name(self) -> str:
-        """Return the ``group:name`` identifier for this entry."""
-
-        return f"{self.group}:{self.name}"
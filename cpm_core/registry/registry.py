@@ -2,6 +2,11 @@
 
 from __future__ import annotations
 
+import sys
+import threading
+from operator import attrgetter
+from typing import Callable, Iterable
+
 from .entry import CPMRegistryEntry
 from .errors import (
     AmbiguousFeatureError,
@@ -15,24 +20,79 @@ class FeatureRegistry:
 
     def __init__(self) -> None:
         self._by_qualified: dict[str, CPMRegistryEntry] = {}
-        self._by_name: dict[str, list[CPMRegistryEntry]] = {}
+        self._by_name: dict[str, dict[str, CPMRegistryEntry]] = {}
+        self._deferred: dict[str, Callable[[], None]] = {}
+        self._deferred_lock = threading.RLock()
+        self._display_cache: tuple[str, ...] | None = None
 
     def register(self, entry: CPMRegistryEntry) -> None:
         """Register an entry, raising on qualified name collisions."""
 
         qualified = entry.qualified_name
-        if qualified in self._by_qualified:
+        if qualified in self._by_qualified or qualified in self._deferred:
             raise FeatureCollisionError(f"{qualified} is already registered.")
         self._by_qualified[qualified] = entry
-        self._by_name.setdefault(entry.name, []).append(entry)
+        self._by_name.setdefault(entry.name, {})[qualified] = entry
+        self._display_cache = None
+
+    def unregister(self, qualified: str) -> None:
+        """Remove a registered (or still deferred) ``group:name`` feature."""
+
+        entry = self._by_qualified.pop(qualified, None)
+        if entry is None:
+            if self._deferred.pop(qualified, None) is None:
+                raise FeatureNotFoundError(f"{qualified} is not registered.")
+        else:
+            candidates = self._by_name[entry.name]
+            del candidates[qualified]
+            if not candidates:
+                del self._by_name[entry.name]
+        self._display_cache = None
+
+    def register_deferred(self, group: str, names: Iterable[str], loader: Callable[[], None]) -> None:
+        """Reserve ``group:name`` features that ``loader`` registers on first use.
+
+        ``loader`` runs at most once, the first time any of the names is resolved
+        or the full entry list is requested.
+        """
+
+        qualified_names = [sys.intern(f"{group}:{name}") for name in names]
+        for qualified in qualified_names:
+            if qualified in self._by_qualified or qualified in self._deferred:
+                raise FeatureCollisionError(f"{qualified} is already registered.")
+        for qualified in qualified_names:
+            self._deferred[qualified] = loader
+        self._display_cache = None
 
     def resolve(self, name_or_qualified: str) -> CPMRegistryEntry:
         """Resolve either a simple name or a qualified ``group:name``."""
 
         if ":" in name_or_qualified:
+            self._load_deferred([name_or_qualified])
             return self._resolve_qualified(name_or_qualified)
+        self._load_deferred(
+            [qualified for qualified in self._deferred if qualified.split(":", 1)[1] == name_or_qualified]
+        )
         return self._resolve_name(name_or_qualified)
 
+    def qualified_names(self) -> tuple[str, ...]:
+        """List registered and deferred ``group:name`` identifiers without loading anything."""
+
+        return tuple(sorted({*self._by_qualified, *self._deferred}))
+
+    def _load_deferred(self, qualified_names: Iterable[str]) -> None:
+        for qualified in qualified_names:
+            if qualified not in self._deferred:
+                continue
+            with self._deferred_lock:
+                loader = self._deferred.get(qualified)
+                if loader is None:
+                    continue
+                for key in [key for key, value in self._deferred.items() if value is loader]:
+                    del self._deferred[key]
+                self._display_cache = None
+                loader()
+
     def _resolve_qualified(self, qualified: str) -> CPMRegistryEntry:
         entry = self._by_qualified.get(qualified)
         if entry is None:
@@ -44,24 +104,29 @@ class FeatureRegistry:
         if not candidates:
             raise FeatureNotFoundError(f"{name} is not registered.")
         if len(candidates) > 1:
-            sorted_candidates = sorted(entry.qualified_name for entry in candidates)
-            raise AmbiguousFeatureError(name, sorted_candidates)
-        return candidates[0]
+            raise AmbiguousFeatureError(name, sorted(candidates))
+        return next(iter(candidates.values()))
 
     def display_names(self) -> tuple[str, ...]:
         """List feature names, showing ``group:name`` when ambiguous."""
 
+        if self._display_cache is not None:
+            return self._display_cache
+        by_name: dict[str, list[str]] = {}
+        for qualified in self.qualified_names():
+            by_name.setdefault(qualified.split(":", 1)[1], []).append(qualified)
         formatted: list[str] = []
-        for name in sorted(self._by_name):
-            candidates = self._by_name[name]
+        for name in sorted(by_name):
+            candidates = by_name[name]
             if len(candidates) == 1:
                 formatted.append(name)
                 continue
-            qualified = sorted(entry.qualified_name for entry in candidates)
-            formatted.extend(qualified)
-        return tuple(formatted)
+            formatted.extend(candidates)
+        self._display_cache = tuple(formatted)
+        return self._display_cache
 
     def entries(self) -> tuple[CPMRegistryEntry, ...]:
-        """Return all registered entries in qualified order."""
+        """Return all registered entries in qualified order, loading deferred ones."""
 
-        return tuple(sorted(self._by_qualified.values(), key=lambda entry: entry.qualified_name))
+        self._load_deferred(list(self._deferred))
+        return tuple(sorted(self._by_qualified.values(), key=attrgetter("qualified_name")))
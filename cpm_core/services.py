@@ -8,9 +8,10 @@ from typing import Any, Callable, Dict, Set
 __all__ = ["ServiceContainer"]
 
 ServiceProvider = Callable[["ServiceContainer"], Any]
+_MISSING = object()
 
 
-@dataclass(frozen=True)
+@dataclass(frozen=True, slots=True)
 class _ServiceRegistration:
     provider: ServiceProvider
     singleton: bool
@@ -38,13 +39,15 @@ class ServiceContainer:
 
     def get(self, name: str) -> Any:
         """Resolve `name`, instantiating it only when first requested."""
+        # Only singletons are stored here, so a hit needs no registration lookup.
+        cached = self._singletons.get(name, _MISSING)
+        if cached is not _MISSING:
+            return cached
+
         registration = self._registrations.get(name)
         if registration is None:
             raise KeyError(f"service {name!r} is not registered")
 
-        if registration.singleton and name in self._singletons:
-            return self._singletons[name]
-
         if name in self._initializing:
             raise RuntimeError(f"re-entrant initialization detected for {name!r}")
 
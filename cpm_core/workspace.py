@@ -14,6 +14,10 @@ from .paths import UserDirs
 DEFAULT_WORKSPACE_NAME = ".cpm"
 CONFIG_FILE_NAME = "config.toml"
 EMBEDDINGS_FILE_NAME = "embeddings.yml"
+INITIALIZED_MARKER_NAME = ".initialized"
+# Bump whenever ensure() starts creating something new, so existing workspaces
+# re-run the layout pass once instead of trusting a marker from an older layout.
+LAYOUT_VERSION = 1
 
 _DEFAULTS: dict[str, str] = {
     "cpm_dir": DEFAULT_WORKSPACE_NAME,
@@ -28,17 +32,14 @@ _ENV_KEY_MAP: dict[str, str] = {
 
 
 def _load_config_from_file(path: Path) -> dict[str, str]:
-    if not path.exists():
-        return {}
     try:
-        with path.open("rb") as handle:
-            data = tomllib.load(handle)
-    except (OSError, tomllib.TOMLDecodeError):
+        data = tomllib.loads(path.read_bytes().decode("utf-8"))
+    except (OSError, UnicodeDecodeError, tomllib.TOMLDecodeError):
         return {}
     return {key: str(value) for key, value in data.items()}
 
 
-@dataclass(frozen=True)
+@dataclass(frozen=True, slots=True)
 class WorkspaceLayout:
     """Defines the directory structure that .cpm should contain."""
 
@@ -72,8 +73,27 @@ class WorkspaceLayout:
             embeddings_file=root / embeddings_filename,
         )
 
-    def ensure(self) -> None:
-        """Ensure every layout entry exists and embeddings/config files are present."""
+    @property
+    def initialized_marker(self) -> Path:
+        return self.root / INITIALIZED_MARKER_NAME
+
+    def is_initialized(self) -> bool:
+        """Return True once :meth:`ensure` has completed for the current layout version."""
+        try:
+            marker = self.initialized_marker.read_text(encoding="utf-8")
+        except (OSError, UnicodeDecodeError):
+            return False
+        return marker.strip() == str(LAYOUT_VERSION)
+
+    def ensure(self, *, force: bool = False) -> None:
+        """Ensure every layout entry exists and embeddings/config files are present.
+
+        A completed run leaves a marker file holding :data:`LAYOUT_VERSION` so warm
+        workspaces skip the mkdir/touch pass; a missing or outdated marker, or
+        ``force=True``, re-checks and repairs the layout.
+        """
+        if self.is_initialized() and not force:
+            return
         for directory in (
             self.root,
             self.packages_dir,
@@ -86,6 +106,7 @@ class WorkspaceLayout:
             directory.mkdir(parents=True, exist_ok=True)
         self.embeddings_file.touch(exist_ok=True)
         self.config_file.touch(exist_ok=True)
+        self.initialized_marker.write_text(f"{LAYOUT_VERSION}\n", encoding="utf-8")
 
 
 @dataclass
@@ -108,26 +129,35 @@ class WorkspaceResolver:
         if self.defaults:
             base_defaults.update(self.defaults)
         self.defaults = base_defaults
+        self._is_dir_cache: dict[Path, bool] = {}
 
     # ---------- Public API ----------
 
+    def invalidate(self) -> None:
+        """Forget cached directory lookups (call after creating or removing workspaces)."""
+        self._is_dir_cache.clear()
+
     def find_workspace(self, start_dir: Path | None = None) -> Path | None:
         """Look for an existing .cpm workspace by walking parent directories."""
         override = self._override_root_value()
         if override:
             candidate = self._resolve_override_root(override, start_dir)
-            if candidate.is_dir():
+            if self._is_dir(candidate):
                 return candidate
 
         start = (Path(start_dir) if start_dir else Path.cwd()).resolve()
         for current in (start, *start.parents):
             candidate = current / self.workspace_name
-            if candidate.is_dir():
+            if self._is_dir(candidate):
                 return candidate
         return None
 
-    def ensure_workspace(self, start_dir: Path | None = None) -> Path:
-        """Create the minimal .cpm hierarchy and return the workspace root."""
+    def ensure_workspace(self, start_dir: Path | None = None, *, force: bool = False) -> Path:
+        """Create the minimal .cpm hierarchy and return the workspace root.
+
+        ``force`` re-runs the layout pass on an initialized workspace, restoring any
+        directory or file that has gone missing since.
+        """
         override = self._override_root_value()
         if override:
             root = self._resolve_override_root(override, start_dir)
@@ -139,7 +169,8 @@ class WorkspaceResolver:
                 base = (Path(start_dir) if start_dir else Path.cwd()).resolve()
                 root = base / self.workspace_name
         layout = WorkspaceLayout.from_root(root, self.config_filename, self.embeddings_filename)
-        layout.ensure()
+        layout.ensure(force=force)
+        self.invalidate()
         return layout.root
 
     def resolve_setting(self, key: str, start_dir: Path | None = None) -> str | None:
@@ -158,6 +189,12 @@ class WorkspaceResolver:
 
     # ---------- Internal helpers ----------
 
+    def _is_dir(self, path: Path) -> bool:
+        cached = self._is_dir_cache.get(path)
+        if cached is None:
+            cached = self._is_dir_cache[path] = path.is_dir()
+        return cached
+
     def _env_value(self, key: str) -> str | None:
         value = self.env.get(key)
         if value:
@@ -192,7 +229,7 @@ class WorkspaceResolver:
         return _load_config_from_file(config_path)
 
 
-@dataclass(frozen=True)
+@dataclass(frozen=True, slots=True)
 class Workspace:
     """Thin descriptor for the root .cpm directory and configuration file."""
 
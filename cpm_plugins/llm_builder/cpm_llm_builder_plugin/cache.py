@@ -2,40 +2,93 @@
 
 from __future__ import annotations
 
-from dataclasses import dataclass, field
-import json
+from dataclasses import dataclass, field, replace
+import os
+import sys
+import threading
 from pathlib import Path
 from typing import Any, Mapping
 
+from cpm_core.jsonio import dumps_line, dumps_pretty, loads as json_loads
+
 from .schemas import Chunk, Segment
 
 
 CACHE_VERSION = 2
+# ``source_hash`` digests the raw file bytes. Entries written before the field
+# existed hashed the decoded text and stay valid until the file is rebuilt.
+HASH_ALGO = "sha256"
+LEGACY_HASH_ALGO = "sha256-text"
 
 
-@dataclass
+@dataclass(slots=True)
 class FileCacheEntry:
     source_hash: str
     classification: dict[str, Any] = field(default_factory=dict)
     segments: list[Segment] = field(default_factory=list)
+    hash_algo: str = HASH_ALGO
 
 
-@dataclass
+@dataclass(slots=True)
 class CacheV2:
     files: dict[str, FileCacheEntry] = field(default_factory=dict)
     segment_enrichment: dict[str, Chunk] = field(default_factory=dict)
 
 
+def journal_path(path: Path) -> Path:
+    """Append-only sidecar holding enrichments not yet folded into ``path``."""
+
+    return path.with_name(f"{path.stem}.jsonl")
+
+
 def load_cache(path: Path) -> CacheV2:
+    pool = _StringPool()
+    cache = _load_snapshot(path, pool)
+    _replay_journal(journal_path(path), cache, pool)
+    return cache
+
+
+class _StringPool:
+    """Shares the strings every cached chunk repeats (paths, languages, tags).
+
+    A large cache holds thousands of chunks that each decode their own copy of
+    the same file path and tag list; pooling them keeps one object per value.
+    """
+
+    def __init__(self) -> None:
+        self._tags: dict[tuple[str, ...], tuple[str, ...]] = {}
+
+    def value(self, value: Any) -> Any:
+        if isinstance(value, str):
+            return sys.intern(value)
+        if isinstance(value, list) and all(isinstance(item, str) for item in value):
+            return [sys.intern(item) for item in value]
+        return value
+
+    def mapping(self, payload: dict[str, Any]) -> dict[str, Any]:
+        return {sys.intern(key): self.value(item) for key, item in payload.items()}
+
+    def chunk(self, chunk: Chunk) -> Chunk:
+        tags = tuple(sys.intern(tag) for tag in chunk.tags)
+        return replace(
+            chunk,
+            tags=self._tags.setdefault(tags, tags),
+            anchors=self.mapping(chunk.anchors),
+            relations=self.mapping(chunk.relations),
+            metadata=self.mapping(chunk.metadata),
+        )
+
+
+def _load_snapshot(path: Path, pool: _StringPool) -> CacheV2:
     if not path.exists():
         return CacheV2()
     try:
-        payload = json.loads(path.read_text(encoding="utf-8"))
+        payload = json_loads(path.read_bytes())
     except Exception:
         return CacheV2()
 
     if isinstance(payload, Mapping) and payload.get("version") == CACHE_VERSION:
-        return _load_v2(payload)
+        return _load_v2(payload, pool)
 
     # v1 migration: {"files": {"path": {"source_hash": "...", "chunks":[...]}}}
     migrated = CacheV2()
@@ -68,13 +121,14 @@ def load_cache(path: Path) -> CacheV2:
                     )
             migrated.files[rel] = FileCacheEntry(
                 source_hash=source_hash,
+                hash_algo=LEGACY_HASH_ALGO,
                 classification={"pipeline": "legacy"},
                 segments=segments,
             )
     return migrated
 
 
-def _load_v2(payload: Mapping[str, Any]) -> CacheV2:
+def _load_v2(payload: Mapping[str, Any], pool: _StringPool) -> CacheV2:
     result = CacheV2()
     files_raw = payload.get("files")
     if isinstance(files_raw, Mapping):
@@ -84,7 +138,7 @@ def _load_v2(payload: Mapping[str, Any]) -> CacheV2:
             source_hash = value.get("source_hash")
             if not isinstance(source_hash, str):
                 continue
-            cls = dict(value.get("classification") or {})
+            cls = pool.mapping(dict(value.get("classification") or {}))
             seg_payload = value.get("segments") or []
             segments = []
             if isinstance(seg_payload, list):
@@ -94,8 +148,10 @@ def _load_v2(payload: Mapping[str, Any]) -> CacheV2:
                             segments.append(Segment.from_dict(item))
                         except Exception:
                             continue
+            hash_algo = value.get("hash_algo")
             result.files[rel] = FileCacheEntry(
                 source_hash=source_hash,
+                hash_algo=hash_algo if isinstance(hash_algo, str) else LEGACY_HASH_ALGO,
                 classification=cls,
                 segments=segments,
             )
@@ -106,7 +162,7 @@ def _load_v2(payload: Mapping[str, Any]) -> CacheV2:
             if not isinstance(key, str) or not isinstance(value, Mapping):
                 continue
             try:
-                result.segment_enrichment[key] = Chunk.from_dict(value)
+                result.segment_enrichment[key] = pool.chunk(Chunk.from_dict(value))
             except Exception:
                 continue
     return result
@@ -118,6 +174,7 @@ def save_cache(path: Path, cache: CacheV2) -> None:
         "files": {
             rel: {
                 "source_hash": entry.source_hash,
+                "hash_algo": entry.hash_algo,
                 "classification": dict(entry.classification),
                 "segments": [segment.to_dict() for segment in entry.segments],
             }
@@ -128,5 +185,90 @@ def save_cache(path: Path, cache: CacheV2) -> None:
             for key, value in sorted(cache.segment_enrichment.items())
         },
     }
-    path.write_text(json.dumps(payload, ensure_ascii=False, indent=2), encoding="utf-8")
+    tmp_path = path.with_name(f"{path.name}.tmp")
+    tmp_path.write_bytes(dumps_pretty(payload))
+    os.replace(tmp_path, path)
+    # Everything journaled is now part of the snapshot.
+    journal_path(path).unlink(missing_ok=True)
+
+
+class CacheJournal:
+    """Durably records segment enrichments as they arrive during a build.
+
+    A build that dies before ``save_cache`` leaves the journal behind, and the
+    next ``load_cache`` replays it, so finished LLM batches are not paid for twice.
+    """
 
+    def __init__(self, path: Path) -> None:
+        self.path = path
+        self._handle = path.open("ab")
+
+    def append(self, entries: Mapping[str, Chunk]) -> None:
+        if not entries:
+            return
+        self._handle.write(
+            b"".join(
+                dumps_line({"key": key, "chunk": chunk.to_dict()}) for key, chunk in entries.items()
+            )
+        )
+        self._handle.flush()
+        os.fsync(self._handle.fileno())
+
+    def close(self) -> None:
+        self._handle.close()
+
+    def __enter__(self) -> "CacheJournal":
+        return self
+
+    def __exit__(self, *exc_info: object) -> None:
+        self.close()
+
+
+class SharedSegmentCache:
+    """Content-addressed segment enrichments shared by every build that points here.
+
+    Keys are ``segment_cache_key`` digests, which already cover the segment (id,
+    path and text), model, prompt version and constraints, so an entry is valid for
+    any packet or destination. Each entry is one file under ``<key[:2]>/<key>.json``
+    and is published with an atomic rename, so concurrent builds never see a
+    partial entry.
+    """
+
+    def __init__(self, root: Path) -> None:
+        self.root = root
+
+    def _entry_path(self, key: str) -> Path:
+        return self.root / key[:2] / f"{key}.json"
+
+    def get(self, key: str) -> Chunk | None:
+        try:
+            payload = json_loads(self._entry_path(key).read_bytes())
+            return Chunk.from_dict(payload)
+        except Exception:
+            return None
+
+    def put(self, key: str, chunk: Chunk) -> None:
+        path = self._entry_path(key)
+        try:
+            path.parent.mkdir(parents=True, exist_ok=True)
+            tmp_path = path.with_name(f"{path.name}.{os.getpid()}.{threading.get_ident()}.tmp")
+            tmp_path.write_bytes(dumps_line(chunk.to_dict()))
+            os.replace(tmp_path, path)
+        except OSError:
+            pass  # the shared cache is an optimisation; the local cache still has it
+
+
+def _replay_journal(path: Path, cache: CacheV2, pool: _StringPool) -> None:
+    try:
+        data = path.read_bytes()
+    except OSError:
+        return
+    for line in data.splitlines():
+        try:
+            record = json_loads(line)
+            key = record["key"]
+            chunk = pool.chunk(Chunk.from_dict(record["chunk"]))
+        except Exception:
+            continue  # a torn final line from an interrupted write
+        if isinstance(key, str):
+            cache.segment_enrichment[key] = chunk
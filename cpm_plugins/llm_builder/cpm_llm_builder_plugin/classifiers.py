@@ -3,10 +3,11 @@
 from __future__ import annotations
 
 from dataclasses import dataclass
+import re
 from pathlib import Path
 
 
-@dataclass(frozen=True)
+@dataclass(frozen=True, slots=True)
 class FileClassification:
     pipeline: str
     language: str
@@ -39,26 +40,35 @@ PIPELINES_BY_EXT: dict[str, FileClassification] = {
 }
 
 
+_PYTHON_SCRIPT = FileClassification("code_generic", "python", "text/x-python")
+_SHELL_SCRIPT = FileClassification("text", "shell", "text/x-shellscript")
+_PLAIN_TEXT = FileClassification("text", "text", "text/plain")
+_BINARY = FileClassification(
+    pipeline="binary_unsupported",
+    language="binary",
+    mime="application/octet-stream",
+    is_supported_text=False,
+)
+_LEADING_WHITESPACE = re.compile(r"\s*")
+
+
 def classify_file(path: Path, content: str) -> FileClassification:
     ext = path.suffix.lower()
     known = PIPELINES_BY_EXT.get(ext)
     if known is not None:
         return known
 
-    head = content.lstrip()[:128]
+    # Slice the head after the leading whitespace instead of lstrip()-ing (and so
+    # copying) the whole file just to look at 128 characters.
+    start = _LEADING_WHITESPACE.match(content).end()  # type: ignore[union-attr]
+    head = content[start : start + 128]
     if head.startswith("#!"):
         if "python" in head:
-            return FileClassification("code_generic", "python", "text/x-python")
+            return _PYTHON_SCRIPT
         if "bash" in head or "sh" in head:
-            return FileClassification("text", "shell", "text/x-shellscript")
+            return _SHELL_SCRIPT
 
     if "\x00" in content:
-        return FileClassification(
-            pipeline="binary_unsupported",
-            language="binary",
-            mime="application/octet-stream",
-            is_supported_text=False,
-        )
-
-    return FileClassification("text", "text", "text/plain")
+        return _BINARY
 
+    return _PLAIN_TEXT
@@ -5,11 +5,14 @@ from __future__ import annotations
 import argparse
 import json
 import hashlib
-from dataclasses import dataclass
-from datetime import datetime, timezone
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from dataclasses import dataclass, field, replace
+import os
+from functools import lru_cache
 from pathlib import Path
-from typing import Any, Optional, Sequence
+from typing import Any, Iterator, Optional, Sequence
 
+import requests
 import yaml
 from cpm_builtin.embeddings import EmbeddingClient
 from cpm_core.api import CPMAbstractBuilder, cpmbuilder
@@ -22,19 +25,32 @@ from cpm_core.build.builder import (
     materialize_packet,
     _read_text_file,
 )
+from cpm_core.packet.io import sha256_file as _content_hash
 from cpm_core.packet.models import DocChunk, PacketManifest
-
-from .cache import CacheV2, FileCacheEntry, load_cache, save_cache
+from cpm_core.paths import UserDirs
+
+from .cache import (
+    LEGACY_HASH_ALGO,
+    CacheJournal,
+    CacheV2,
+    FileCacheEntry,
+    SharedSegmentCache,
+    journal_path,
+    load_cache,
+    save_cache,
+)
 from .classifiers import classify_file
 from .llm_client import LLMClient, LLMClientConfig
+from .log import log_line
 from .postprocess import apply_chunk_constraints
 from .prechunk import prechunk
-from .schemas import Chunk, ChunkConstraints, SourceDocument, segment_cache_key
+from .schemas import Chunk, ChunkConstraints, Segment, SegmentKeyContext, SourceDocument, stable_hash
 from .validators import validate_chunks
 
-SUPPORTED_EXTS = CODE_EXTS | TEXT_EXTS | {".md", ".markdown", ".html", ".htm", ".json", ".yaml", ".yml"}
+SUPPORTED_EXTS = frozenset(CODE_EXTS | TEXT_EXTS | {".md", ".markdown", ".html", ".htm", ".json", ".yaml", ".yml"})
 DEFAULT_CONFIG_NAME = "config.yml"
 CHUNK_CACHE_NAME = "chunk_cache.json"
+_YAML_LOADER = getattr(yaml, "CSafeLoader", yaml.SafeLoader)
 
 _PLUGIN_ROOT: Path | None = None
 
@@ -48,15 +64,79 @@ def _sha256_text(value: str) -> str:
     return hashlib.sha256(value.encode("utf-8")).hexdigest()
 
 
+def _cache_entry_matches(entry: FileCacheEntry | None, source_hash: str, text: str) -> bool:
+    if entry is None:
+        return False
+    if entry.hash_algo == LEGACY_HASH_ALGO:
+        return entry.source_hash == _sha256_text(text)
+    return entry.source_hash == source_hash
+
+
+@dataclass(frozen=True, slots=True)
+class _SourceFile:
+    path: Path
+    ext: str
+    is_symlink: bool = False
+
+
+def _iter_source_files(root: Path) -> Iterator[_SourceFile]:
+    """Yield supported files under ``root`` as the walk discovers them.
+
+    Entries are sorted per directory and directories are expanded in place, which
+    yields the same order as ``sorted(root.rglob("*"))`` without materialising
+    the whole tree first. Like rglob, symlinked directories are not descended.
+    Zero-byte files are skipped here, before anything opens them.
+    """
+
+    try:
+        with os.scandir(root) as it:
+            entries = sorted(it, key=lambda entry: entry.name)
+    except OSError:
+        return
+    for entry in entries:
+        try:
+            if entry.is_dir(follow_symlinks=False):
+                yield from _iter_source_files(Path(entry.path))
+                continue
+            ext = os.path.splitext(entry.name)[1].lower()
+            # Empty files would be read only to be dropped by the blank-text check.
+            if ext in SUPPORTED_EXTS and entry.is_file() and entry.stat().st_size > 0:
+                yield _SourceFile(Path(entry.path), ext, entry.is_symlink())
+        except OSError:
+            continue
+
+
+def _shared_cache_dir(value: Any) -> str | None:
+    """``true`` selects the platform user cache; a string is used as the directory."""
+
+    if value is True:
+        return str(UserDirs().cache_dir() / "llm_builder" / "segments")
+    if isinstance(value, str) and value.strip():
+        return str(Path(value.strip()).expanduser())
+    return None
+
+
 def _resolve_config_path(config_arg: str | None) -> Path:
+    # resolve() walks every path component; the cwd is part of the key because
+    # relative arguments resolve against it.
+    return _resolve_config_path_cached(config_arg, _PLUGIN_ROOT, os.getcwd())
+
+
+@lru_cache(maxsize=32)
+def _resolve_config_path_cached(config_arg: str | None, plugin_root: Path | None, cwd: str) -> Path:
+    del cwd
     if config_arg:
         return Path(config_arg).expanduser().resolve()
-    if _PLUGIN_ROOT is not None:
-        return (_PLUGIN_ROOT / DEFAULT_CONFIG_NAME).resolve()
+    if plugin_root is not None:
+        return (plugin_root / DEFAULT_CONFIG_NAME).resolve()
     return Path(DEFAULT_CONFIG_NAME).resolve()
 
 
-@dataclass(frozen=True)
+# Parsed config.yml files keyed by path, reused while (mtime_ns, size) is unchanged.
+_CONFIG_CACHE: dict[str, tuple[int, int, "LLMBuilderPluginConfig"]] = {}
+
+
+@dataclass(frozen=True, slots=True)
 class LLMBuilderPluginConfig:
     llm_endpoint: str
     request_timeout: float = 30.0
@@ -67,10 +147,26 @@ class LLMBuilderPluginConfig:
     max_chunk_tokens: int = 800
     min_chunk_tokens: int = 120
     max_segments_per_request: int = 8
+    max_workers: int = 4
+    llm_concurrency: int = 2
+    cross_file_batching: bool = False
+    shared_cache_dir: str | None = None
 
     @classmethod
     def from_path(cls, path: Path) -> "LLMBuilderPluginConfig":
-        payload = yaml.safe_load(path.read_text(encoding="utf-8")) or {}
+        stat = path.stat()
+        key = str(path)
+        cached = _CONFIG_CACHE.get(key)
+        if cached is not None and cached[0] == stat.st_mtime_ns and cached[1] == stat.st_size:
+            return cached[2]
+        config = cls._parse(path)
+        _CONFIG_CACHE[key] = (stat.st_mtime_ns, stat.st_size, config)
+        return config
+
+    @classmethod
+    def _parse(cls, path: Path) -> "LLMBuilderPluginConfig":
+        with path.open("rb") as handle:
+            payload = yaml.load(handle, Loader=_YAML_LOADER) or {}
         if not isinstance(payload, dict):
             raise ValueError("config.yml must contain a mapping")
 
@@ -92,10 +188,14 @@ class LLMBuilderPluginConfig:
             max_chunk_tokens=int(constraints.get("max_chunk_tokens", 800)),
             min_chunk_tokens=int(constraints.get("min_chunk_tokens", 120)),
             max_segments_per_request=int(constraints.get("max_segments_per_request", 8)),
+            max_workers=int(payload.get("max_workers", 4)),
+            llm_concurrency=int(llm_cfg.get("concurrency", 2)),
+            cross_file_batching=bool(llm_cfg.get("cross_file_batching", False)),
+            shared_cache_dir=_shared_cache_dir(llm_cfg.get("shared_cache")),
         )
 
 
-@dataclass(frozen=True)
+@dataclass(frozen=True, slots=True)
 class LLMBuilderRuntimeConfig:
     llm_endpoint: str
     request_timeout: float
@@ -114,13 +214,55 @@ class LLMBuilderRuntimeConfig:
     embed_url: str
     embeddings_mode: str
     timeout: float | None
+    max_workers: int = 4
+    llm_concurrency: int = 2
+    cross_file_batching: bool = False
+    shared_cache_dir: str | None = None
+
+
+def _is_content_error(exc: BaseException) -> bool:
+    # requests' JSONDecodeError is both a RequestException and a ValueError: a body
+    # that does not parse depends on the prompt, so it counts as content.
+    if isinstance(exc, requests.RequestException) and not isinstance(exc, ValueError):
+        return False
+    return isinstance(exc, (ValueError, TypeError, KeyError))
+
+
+@dataclass(slots=True)
+class _FileWork:
+    rel: str
+    ext: str
+    source: SourceDocument | None = None
+    cache_entry: FileCacheEntry | None = None
+    segments: list[Segment] = field(default_factory=list)
+    resolved: list[Chunk | None] = field(default_factory=list)
+    pending: list[tuple[int, str]] = field(default_factory=list)
+    file_cache_hit: bool = False
+    segment_cache_hits: int = 0
+    # Enrichments found only in the shared cache, to be copied into the local one.
+    shared_hits: dict[str, Chunk] = field(default_factory=dict)
+
+
+@dataclass(slots=True)
+class _BatchOutcome:
+    # One chunk per batch item, in ``_EnrichBatch.items`` order.
+    chunks: list[Chunk] = field(default_factory=list)
+    # False where the chunk is a local fallback rather than LLM output.
+    enriched: list[bool] = field(default_factory=list)
+    llm_calls: int = 0
+
+
+@dataclass(frozen=True, slots=True)
+class _EnrichBatch:
+    source: SourceDocument
+    # (work index, segment index, cache key) for every segment in the request.
+    items: tuple[tuple[int, int, str], ...]
 
 
 @cpmbuilder(name="cpm-llm-builder", group="llm")
 class CPMLLMBuilder(CPMAbstractBuilder):
     def _log(self, stage: str, message: str) -> None:
-        ts = datetime.now(timezone.utc).isoformat().replace("+00:00", "Z")
-        print(f"[llm-builder:{stage}:{ts}] {message}")
+        log_line(f"llm-builder:{stage}", message)
 
     @classmethod
     def configure(cls, parser: argparse.ArgumentParser) -> None:
@@ -149,6 +291,20 @@ class CPMLLMBuilder(CPMAbstractBuilder):
         parser.add_argument("--max-chunk-tokens", type=int, help="Chunk hard max size")
         parser.add_argument("--min-chunk-tokens", type=int, help="Chunk soft min size")
         parser.add_argument("--max-segments-per-request", type=int, help="LLM batch size")
+        parser.add_argument("--max-workers", type=int, help="Files processed concurrently")
+        parser.add_argument("--llm-concurrency", type=int, help="Maximum in-flight LLM requests")
+        parser.add_argument(
+            "--cross-file-batching",
+            dest="cross_file_batching",
+            action="store_true",
+            default=None,
+            help="Pack segments from several same-language files into one LLM request",
+        )
+        parser.add_argument(
+            "--shared-cache",
+            dest="shared_cache_dir",
+            help="Directory of a segment-enrichment cache shared across builds",
+        )
         parser.add_argument("--model-name", "--model", default=DEFAULT_MODEL, help="Embedding model name")
         parser.add_argument("--max-seq-length", type=int, default=1024, help="Embedding max sequence length")
         parser.add_argument("--embed-url", default=DEFAULT_EMBED_URL, help="Embedding endpoint URL")
@@ -201,6 +357,10 @@ class CPMLLMBuilder(CPMAbstractBuilder):
             embed_url=str(getattr(args, "embed_url", None) or DEFAULT_EMBED_URL),
             embeddings_mode=str(getattr(args, "embeddings_mode", None) or "http"),
             timeout=getattr(args, "timeout", None),
+            max_workers=int(getattr(args, "max_workers", None) or base.max_workers),
+            llm_concurrency=int(getattr(args, "llm_concurrency", None) or base.llm_concurrency),
+            cross_file_batching=bool(getattr(args, "cross_file_batching", None) or base.cross_file_batching),
+            shared_cache_dir=_shared_cache_dir(getattr(args, "shared_cache_dir", None)) or base.shared_cache_dir,
         )
         self.config = runtime
         self.embedder = self.embedder or EmbeddingClient(
@@ -223,6 +383,260 @@ class CPMLLMBuilder(CPMAbstractBuilder):
             metadata={"fallback": True},
         )
 
+    def _prepare_file(
+        self,
+        source_file: _SourceFile,
+        *,
+        rel_root: Path,
+        cache: CacheV2,
+        key_context: SegmentKeyContext,
+        shared_cache: SharedSegmentCache | None = None,
+    ) -> _FileWork | None:
+        assert self.config is not None
+        file_path = source_file.path
+        # The walk starts from the resolved root and skips symlinked directories, so
+        # only a symlinked file needs resolve() (and its per-component lstat calls).
+        target = file_path.resolve() if source_file.is_symlink else file_path
+        rel = str(target.relative_to(rel_root)).replace("\\", "/")
+        # Digest the raw bytes (streamed by file_digest) rather than re-encoding the text.
+        source_hash = _content_hash(file_path)
+        cached_file = cache.files.get(rel)
+        if (
+            cached_file is not None
+            and cached_file.hash_algo != LEGACY_HASH_ALGO
+            and cached_file.source_hash == source_hash
+        ):
+            # Unchanged file: the cached classification and segments are all we need,
+            # so neither decoding nor classification runs on the warm path.
+            work = _FileWork(rel=rel, ext=source_file.ext, cache_entry=cached_file)
+            work.file_cache_hit = True
+            segments = cached_file.segments
+            language = str(cached_file.classification.get("language", ""))
+            mime = str(cached_file.classification.get("mime", ""))
+            self._log("prechunk", f"path={rel} source_cache_hit segments={len(segments)}")
+        else:
+            text = _read_text_file(file_path)
+            if not text.strip():
+                return None
+            work = _FileWork(rel=rel, ext=source_file.ext)
+
+            classification = classify_file(file_path, text)
+            self._log(
+                "classify",
+                f"path={rel} pipeline={classification.pipeline} language={classification.language} mime={classification.mime}",
+            )
+            if not classification.is_supported_text:
+                self._log("skip", f"path={rel} reason=unsupported_text")
+                return work
+
+            if cached_file is not None and _cache_entry_matches(cached_file, source_hash, text):
+                segments = cached_file.segments
+                work.file_cache_hit = True
+                self._log("prechunk", f"path={rel} source_cache_hit segments={len(segments)}")
+            else:
+                segments = prechunk(rel, text, classification)
+                self._log("prechunk", f"path={rel} source_cache_miss segments={len(segments)}")
+
+            language = classification.language
+            mime = classification.mime
+            work.cache_entry = FileCacheEntry(
+                source_hash=source_hash,
+                classification={
+                    "pipeline": classification.pipeline,
+                    "language": language,
+                    "mime": mime,
+                },
+                segments=list(segments),
+            )
+        if not segments:
+            return work
+
+        work.source = SourceDocument(
+            path=rel,
+            language=language,
+            mime=mime,
+            source_hash=source_hash,
+        )
+        work.segments = list(segments)
+        # Keys first, then one lookup pass and one partition pass over plain lists.
+        keys = [key_context.key(segment) for segment in segments]
+        lookup = cache.segment_enrichment.get
+        work.resolved = [lookup(key) for key in keys]
+        work.pending = [(idx, key) for idx, (key, hit) in enumerate(zip(keys, work.resolved)) if hit is None]
+        if shared_cache is not None and work.pending:
+            still_pending: list[tuple[int, str]] = []
+            for idx, key in work.pending:
+                shared = shared_cache.get(key)
+                if shared is None:
+                    still_pending.append((idx, key))
+                else:
+                    work.resolved[idx] = shared
+                    work.shared_hits[key] = shared
+            work.pending = still_pending
+        work.segment_cache_hits = len(keys) - len(work.pending)
+        self._log(
+            "cache",
+            f"path={rel} segments_total={len(segments)} segment_cache_hits={work.segment_cache_hits} "
+            f"segment_cache_miss={len(work.pending)}",
+        )
+        return work
+
+    def _plan_batches(self, works: Sequence[_FileWork]) -> list[_EnrichBatch]:
+        """Group cache misses into LLM requests of at most ``max_segments_per_request``.
+
+        By default every request carries a single file. With ``cross_file_batching``
+        the misses of files sharing language and mime are packed together; segment
+        ids embed the file path, so the response can still be routed per file.
+        """
+
+        assert self.config is not None
+        max_batch = max(1, self.config.constraints.max_segments_per_request)
+        groups: dict[tuple[str, ...], list[tuple[int, int, str]]] = {}
+        for work_idx, work in enumerate(works):
+            if work.source is None or not work.pending:
+                continue
+            if self.config.cross_file_batching:
+                group_key: tuple[str, ...] = (work.source.language, work.source.mime)
+            else:
+                group_key = (work.rel,)
+            groups.setdefault(group_key, []).extend(
+                (work_idx, segment_idx, key) for segment_idx, key in work.pending
+            )
+
+        batches: list[_EnrichBatch] = []
+        for items in groups.values():
+            for start in range(0, len(items), max_batch):
+                batch_items = tuple(items[start : start + max_batch])
+                batches.append(
+                    _EnrichBatch(source=self._batch_source(works, batch_items), items=batch_items)
+                )
+        return batches
+
+    @staticmethod
+    def _batch_source(works: Sequence[_FileWork], items: Sequence[tuple[int, int, str]]) -> SourceDocument:
+        owners = list(dict.fromkeys(work_idx for work_idx, _, _ in items))
+        first = works[owners[0]].source
+        assert first is not None
+        if len(owners) == 1:
+            return first
+        rels = [works[idx].rel for idx in owners]
+        hashes = [works[idx].source.source_hash for idx in owners]  # type: ignore[union-attr]
+        return SourceDocument(
+            path=os.path.commonpath(rels) or ".",
+            language=first.language,
+            mime=first.mime,
+            source_hash=stable_hash("\n".join(hashes)),
+        )
+
+    def _enrich_batch(
+        self,
+        batch: _EnrichBatch,
+        works: Sequence[_FileWork],
+        *,
+        llm_client: LLMClient,
+    ) -> _BatchOutcome:
+        """Enrich one batch, bisecting it when the response is rejected so one bad
+        segment only costs its own enrichment.
+
+        Only content errors (unparseable or schema-invalid output, which
+        ``LLMClient`` already treats as deterministic) are split. Transport, HTTP
+        status and auth failures would hit every half too, each with the client's
+        full retry budget, so they fall back straight away.
+        """
+
+        assert self.config is not None
+        segments = [works[work_idx].segments[segment_idx] for work_idx, segment_idx, _ in batch.items]
+        label = batch.source.path
+        self._log("llm", f"path={label} batch_size={len(segments)} model={self.config.llm_model}")
+        try:
+            enriched = llm_client.enrich(
+                source=batch.source,
+                segments=segments,
+                constraints=self.config.constraints,
+            )
+            self._log("llm", f"path={label} enriched={len(enriched)}")
+            # Match results to segments by id, never by position: a model may reorder,
+            # drop or merge chunks, and in a cross-file batch a positional slip would
+            # file one file's enrichment under another.
+            by_id: dict[str, Chunk] = {}
+            for chunk in enriched:
+                by_id.setdefault(chunk.id, chunk)
+            outcome = _BatchOutcome(llm_calls=1)
+            for (work_idx, _, _), segment in zip(batch.items, segments):
+                matched = by_id.get(segment.id)
+                outcome.enriched.append(matched is not None)
+                if matched is None:
+                    matched = self._segment_fallback(works[work_idx], segment)
+                outcome.chunks.append(matched)
+            missing = outcome.enriched.count(False)
+            if missing:
+                print(f"[warn] llm response for {label} missed {missing} segment(s); fallback enabled")
+            return outcome
+        except Exception as exc:
+            if len(batch.items) > 1 and _is_content_error(exc):
+                print(f"[warn] llm enrichment failed for {label}: {exc}; retrying in halves")
+                middle = len(batch.items) // 2
+                outcome = _BatchOutcome()
+                for items in (batch.items[:middle], batch.items[middle:]):
+                    half = self._enrich_batch(
+                        _EnrichBatch(source=self._batch_source(works, items), items=items),
+                        works,
+                        llm_client=llm_client,
+                    )
+                    outcome.chunks.extend(half.chunks)
+                    outcome.enriched.extend(half.enriched)
+                    outcome.llm_calls += half.llm_calls
+                return outcome
+
+            print(f"[warn] llm enrichment failed for {label}: {exc}; fallback enabled")
+            fallback = [
+                self._segment_fallback(works[work_idx], segment)
+                for (work_idx, _, _), segment in zip(batch.items, segments)
+            ]
+            return _BatchOutcome(chunks=fallback, enriched=[False] * len(fallback))
+
+    def _segment_fallback(self, work: _FileWork, segment: Segment) -> Chunk:
+        assert work.source is not None
+        return self._fallback_chunk(
+            source=work.source,
+            segment_text=segment.text,
+            segment_id=segment.id,
+            start=segment.start_line,
+            end=segment.end_line,
+        )
+
+    def _finalize_file(self, work: _FileWork) -> list[DocChunk]:
+        assert self.config is not None
+        rel = work.rel
+        resolved_chunks = [chunk for chunk in work.resolved if chunk is not None]
+        post = apply_chunk_constraints(resolved_chunks, self.config.constraints)
+        self._log(
+            "postprocess",
+            f"path={rel} before={len(resolved_chunks)} after={len(post)} "
+            f"max_tokens={self.config.constraints.max_chunk_tokens} min_tokens={self.config.constraints.min_chunk_tokens}",
+        )
+        validation = validate_chunks(post)
+        for warning in validation.warnings:
+            print(f"[warn] {rel}: {warning}")
+
+        doc_chunks: list[DocChunk] = []
+        for chunk in validation.chunks:
+            meta = dict(chunk.metadata)
+            meta.update(
+                {
+                    "path": rel,
+                    "ext": work.ext,
+                    "title": chunk.title,
+                    "summary": chunk.summary,
+                    "tags": list(chunk.tags),
+                    "anchors": dict(chunk.anchors),
+                    "relations": dict(chunk.relations),
+                }
+            )
+            doc_chunks.append(DocChunk(id=chunk.id, text=chunk.text, metadata=meta))
+        self._log("chunks", f"path={rel} final_chunks={len(validation.chunks)}")
+        return doc_chunks
+
     def build(self, source: str, *, destination: str | None = None) -> PacketManifest | None:
         if self.config is None:
             raise ValueError("runtime config is not initialized")
@@ -266,150 +680,93 @@ class CPMLLMBuilder(CPMAbstractBuilder):
         ext_counts: dict[str, int] = {}
         files_indexed = 0
         llm_calls = 0
+        llm_fallbacks = 0
         file_cache_hits = 0
         segment_cache_hits = 0
 
         rel_root = source_path.resolve()
-        for file_path in sorted(source_path.rglob("*")):
-            if not file_path.is_file():
-                continue
-            if file_path.suffix.lower() not in SUPPORTED_EXTS:
-                continue
-
-            text = _read_text_file(file_path)
-            if not text.strip():
-                continue
-            files_indexed += 1
-
-            rel = str(file_path.resolve().relative_to(rel_root)).replace("\\", "/")
-            ext = file_path.suffix.lower()
-            ext_counts[ext] = ext_counts.get(ext, 0) + 1
-
-            classification = classify_file(file_path, text)
-            self._log(
-                "classify",
-                f"path={rel} pipeline={classification.pipeline} language={classification.language} mime={classification.mime}",
-            )
-            if not classification.is_supported_text:
-                self._log("skip", f"path={rel} reason=unsupported_text")
-                continue
-
-            source_hash = _sha256_text(text)
-            cached_file = cache.files.get(rel)
-            if cached_file and cached_file.source_hash == source_hash:
-                segments = cached_file.segments
-                file_cache_hits += 1
-                self._log("prechunk", f"path={rel} source_cache_hit segments={len(segments)}")
-            else:
-                segments = prechunk(rel, text, classification)
-                self._log("prechunk", f"path={rel} source_cache_miss segments={len(segments)}")
-
-            next_cache.files[rel] = FileCacheEntry(
-                source_hash=source_hash,
-                classification={
-                    "pipeline": classification.pipeline,
-                    "language": classification.language,
-                    "mime": classification.mime,
-                },
-                segments=list(segments),
-            )
-            if not segments:
-                continue
-
-            source_doc = SourceDocument(
-                path=rel,
-                language=classification.language,
-                mime=classification.mime,
-                source_hash=source_hash,
-            )
-
-            resolved_chunks: list[Chunk] = []
-            missing_segments = []
-            missing_keys = []
-            for segment in segments:
-                key = segment_cache_key(
-                    segment=segment,
-                    model=self.config.llm_model,
-                    prompt_version=self.config.prompt_version,
-                    constraints=self.config.constraints,
-                )
-                cached = cache.segment_enrichment.get(key)
-                if cached is not None:
-                    resolved_chunks.append(cached)
-                    segment_cache_hits += 1
-                else:
-                    missing_segments.append(segment)
-                    missing_keys.append(key)
-            self._log(
-                "cache",
-                f"path={rel} segments_total={len(segments)} segment_cache_hits={len(segments)-len(missing_segments)} "
-                f"segment_cache_miss={len(missing_segments)}",
-            )
-
-            max_batch = max(1, self.config.constraints.max_segments_per_request)
-            for start in range(0, len(missing_segments), max_batch):
-                segment_batch = missing_segments[start : start + max_batch]
-                key_batch = missing_keys[start : start + max_batch]
-                self._log(
-                    "llm",
-                    f"path={rel} batch_start={start} batch_size={len(segment_batch)} model={self.config.llm_model}",
+        files = _iter_source_files(source_path)
+        shared_cache = (
+            SharedSegmentCache(Path(self.config.shared_cache_dir)) if self.config.shared_cache_dir else None
+        )
+        key_context = SegmentKeyContext(
+            model=self.config.llm_model,
+            prompt_version=self.config.prompt_version,
+            constraints=self.config.constraints,
+        )
+        with ThreadPoolExecutor(max_workers=max(1, self.config.max_workers)) as executor:
+            # Pass 1: read, classify, prechunk and split cache hits from misses.
+            works = [
+                work
+                for work in executor.map(
+                    lambda source_file: self._prepare_file(
+                        source_file,
+                        rel_root=rel_root,
+                        cache=cache,
+                        key_context=key_context,
+                        shared_cache=shared_cache,
+                    ),
+                    files,
                 )
-                try:
-                    enriched = llm_client.enrich(
-                        source=source_doc,
-                        segments=segment_batch,
-                        constraints=self.config.constraints,
-                    )
-                    llm_calls += 1
-                    self._log("llm", f"path={rel} batch_start={start} enriched={len(enriched)}")
-                except Exception as exc:
-                    print(f"[warn] llm enrichment failed for {rel}: {exc}; fallback enabled")
-                    enriched = [
-                        self._fallback_chunk(
-                            source=source_doc,
-                            segment_text=segment.text,
-                            segment_id=segment.id,
-                            start=segment.start_line,
-                            end=segment.end_line,
-                        )
-                        for segment in segment_batch
-                    ]
-                for key, enriched_chunk in zip(key_batch, enriched):
+                if work is not None
+            ]
+
+        # Pass 2: enrich the misses. The pool size is the number of in-flight LLM
+        # requests; batches are merged as they complete, which is safe because each
+        # one fills its own result slots and cache keys.
+        batches = self._plan_batches(works)
+        with (
+            ThreadPoolExecutor(
+                max_workers=max(1, min(self.config.llm_concurrency, len(batches))),
+                thread_name_prefix="llm-enrich",
+            ) as llm_pool,
+            CacheJournal(journal_path(chunk_cache_path)) as journal,
+        ):
+            pending = {
+                llm_pool.submit(self._enrich_batch, batch, works, llm_client=llm_client): batch
+                for batch in batches
+            }
+            for future in as_completed(pending):
+                batch = pending[future]
+                outcome = future.result()
+                llm_calls += outcome.llm_calls
+                llm_fallbacks += outcome.enriched.count(False)
+                shared = len({work_idx for work_idx, _, _ in batch.items}) > 1
+                fresh: dict[str, Chunk] = {}
+                for (work_idx, segment_idx, key), enriched_chunk, ok in zip(
+                    batch.items, outcome.chunks, outcome.enriched
+                ):
+                    work = works[work_idx]
+                    if shared and enriched_chunk.anchors.get("path") != work.rel:
+                        enriched_chunk = replace(enriched_chunk, anchors={**enriched_chunk.anchors, "path": work.rel})
                     next_cache.segment_enrichment[key] = enriched_chunk
-                    resolved_chunks.append(enriched_chunk)
-
-            post = apply_chunk_constraints(resolved_chunks, self.config.constraints)
-            self._log(
-                "postprocess",
-                f"path={rel} before={len(resolved_chunks)} after={len(post)} "
-                f"max_tokens={self.config.constraints.max_chunk_tokens} min_tokens={self.config.constraints.min_chunk_tokens}",
-            )
-            validation = validate_chunks(post)
-            for warning in validation.warnings:
-                print(f"[warn] {rel}: {warning}")
-
-            for chunk in validation.chunks:
-                meta = dict(chunk.metadata)
-                meta.update(
-                    {
-                        "path": rel,
-                        "ext": ext,
-                        "title": chunk.title,
-                        "summary": chunk.summary,
-                        "tags": list(chunk.tags),
-                        "anchors": dict(chunk.anchors),
-                        "relations": dict(chunk.relations),
-                    }
-                )
-                chunks.append(DocChunk(id=chunk.id, text=chunk.text, metadata=meta))
-            self._log("chunks", f"path={rel} final_chunks={len(validation.chunks)}")
+                    work.resolved[segment_idx] = enriched_chunk
+                    if ok:
+                        fresh[key] = enriched_chunk
+                # Only real LLM output is journaled; fallbacks are cheap to recompute.
+                journal.append(fresh)
+                if shared_cache is not None:
+                    for key, enriched_chunk in fresh.items():
+                        shared_cache.put(key, enriched_chunk)
+
+        # Pass 3: post-process and assemble packet chunks in file order.
+        for work in works:
+            files_indexed += 1
+            ext_counts[work.ext] = ext_counts.get(work.ext, 0) + 1
+            if work.cache_entry is not None:
+                next_cache.files[work.rel] = work.cache_entry
+            file_cache_hits += int(work.file_cache_hit)
+            segment_cache_hits += work.segment_cache_hits
+            next_cache.segment_enrichment.update(work.shared_hits)
+            if work.source is not None:
+                chunks.extend(self._finalize_file(work))
 
         save_cache(chunk_cache_path, next_cache)
         self._log("scan", f"files_indexed={files_indexed}")
         self._log("scan", f"chunks_total={len(chunks)}")
         self._log(
             "scan",
-            f"llm_calls={llm_calls} file_cache_hits={file_cache_hits} segment_cache_hits={segment_cache_hits}",
+            f"llm_calls={llm_calls} llm_fallbacks={llm_fallbacks} file_cache_hits={file_cache_hits} segment_cache_hits={segment_cache_hits}",
         )
         description = (self.config.description or source_path.as_posix()).strip() or source_path.as_posix()
         packet_name = (self.config.packet_name or out_root.name).strip() or out_root.name
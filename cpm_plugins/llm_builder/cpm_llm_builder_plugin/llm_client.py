@@ -3,7 +3,6 @@
 from __future__ import annotations
 
 from dataclasses import dataclass
-from datetime import datetime, timezone
 import random
 import re
 import time
@@ -13,10 +12,11 @@ import uuid
 
 import requests
 
+from .log import log_line
 from .schemas import Chunk, ChunkConstraints, Segment, SourceDocument, normalize_chunk_list
 
 
-@dataclass(frozen=True)
+@dataclass(frozen=True, slots=True)
 class LLMClientConfig:
     endpoint: str
     model: str
@@ -196,8 +196,7 @@ class LLMClient:
     def _log(self, message: str) -> None:
         if not self.config.verbose:
             return
-        ts = datetime.now(timezone.utc).isoformat().replace("+00:00", "Z")
-        print(f"[llm:{ts}] {message}")
+        log_line("llm", message)
 
     def enrich(
         self,
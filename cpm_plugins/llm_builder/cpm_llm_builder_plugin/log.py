@@ -0,0 +1,33 @@
+"""Console progress lines for the llm-builder pipeline."""
+
+from __future__ import annotations
+
+import sys
+import time
+
+# (epoch second, "YYYY-MM-DDTHH:MM:SS") for the last second formatted.
+_second_cache: tuple[int, str] = (-1, "")
+
+
+def utc_timestamp() -> str:
+    """Same text as ``datetime.now(timezone.utc).isoformat()`` with a ``Z`` suffix.
+
+    Only the sub-second part changes between most log lines, so the date/time
+    prefix is formatted once per second instead of building a datetime each call.
+    """
+
+    global _second_cache
+    seconds, micros = divmod(time.time_ns() // 1_000, 1_000_000)
+    cached_second, prefix = _second_cache
+    if cached_second != seconds:
+        prefix = time.strftime("%Y-%m-%dT%H:%M:%S", time.gmtime(seconds))
+        _second_cache = (seconds, prefix)
+    if micros:
+        return f"{prefix}.{micros:06d}Z"
+    return f"{prefix}Z"
+
+
+def log_line(tag: str, message: str) -> None:
+    # One write per line: print() emits the text and the newline separately, which
+    # lets lines from worker threads interleave.
+    sys.stdout.write(f"[{tag}:{utc_timestamp()}] {message}\n")
@@ -13,10 +13,18 @@ def _split_chunk(chunk: Chunk, max_tokens: int) -> list[Chunk]:
         return [chunk]
     result: list[Chunk] = []
     buffer: list[str] = []
+    # len("\n".join(buffer)), kept incrementally. It bounds the stripped candidate
+    # from above, so the join is only built when the budget may really be exceeded
+    # instead of once per line (which made long chunks quadratic).
+    buffered_chars = -1
     part = 0
     for line in lines:
-        candidate = "\n".join(buffer + [line]).strip()
-        if buffer and estimate_tokens(candidate) > max_tokens:
+        candidate_chars = buffered_chars + 1 + len(line)
+        if (
+            buffer
+            and (candidate_chars // 4 > max_tokens or max_tokens < 1)
+            and estimate_tokens("\n".join(buffer + [line])) > max_tokens
+        ):
             text = "\n".join(buffer).strip()
             if text:
                 result.append(
@@ -33,8 +41,10 @@ def _split_chunk(chunk: Chunk, max_tokens: int) -> list[Chunk]:
                 )
                 part += 1
             buffer = [line]
+            buffered_chars = len(line)
         else:
             buffer.append(line)
+            buffered_chars = candidate_chars
     final_text = "\n".join(buffer).strip()
     if final_text:
         result.append(
@@ -18,6 +18,8 @@ JAVA_METHOD_RE = re.compile(
 )
 GENERIC_DEF_RE = re.compile(r"^\s*(def|class|function|fn|interface|type)\s+([A-Za-z_]\w*)")
 HEADING_RE = re.compile(r"^(#{1,6})\s+(.+)$")
+# libyaml parser when available; the pure-Python SafeLoader otherwise.
+_YAML_LOADER = getattr(yaml, "CSafeLoader", yaml.SafeLoader)
 
 
 def _make_id(path: str, kind: str, start_line: int, text: str) -> str:
@@ -130,7 +132,7 @@ def _markdown_segments(path: str, content: str) -> list[Segment]:
 
 def _json_yaml_segments(path: str, content: str, *, is_yaml: bool) -> list[Segment]:
     try:
-        parsed = yaml.safe_load(content) if is_yaml else json.loads(content)
+        parsed = yaml.load(content, Loader=_YAML_LOADER) if is_yaml else json.loads(content)
     except Exception:
         return [_segment(path, "structured_blob", content, 1, max(len(content.splitlines()), 1), None)]
     lines = content.splitlines()
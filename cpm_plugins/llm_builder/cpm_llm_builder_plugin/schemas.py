@@ -43,7 +43,7 @@ def _coerce_mapping(value: Any) -> dict[str, Any]:
     return {}
 
 
-@dataclass(frozen=True)
+@dataclass(frozen=True, slots=True)
 class SourceDocument:
     path: str
     language: str
@@ -51,7 +51,7 @@ class SourceDocument:
     source_hash: str
 
 
-@dataclass(frozen=True)
+@dataclass(frozen=True, slots=True)
 class Segment:
     id: str
     kind: str
@@ -85,7 +85,7 @@ class Segment:
         )
 
 
-@dataclass(frozen=True)
+@dataclass(frozen=True, slots=True)
 class Chunk:
     id: str
     text: str
@@ -124,7 +124,7 @@ class Chunk:
         )
 
 
-@dataclass(frozen=True)
+@dataclass(frozen=True, slots=True)
 class ChunkConstraints:
     max_chunk_tokens: int = 800
     min_chunk_tokens: int = 120
@@ -145,13 +145,39 @@ def segment_cache_key(
     prompt_version: str,
     constraints: ChunkConstraints,
 ) -> str:
-    payload = {
-        "segment": segment.to_dict(),
-        "model": model,
-        "prompt_version": prompt_version,
-        "constraints": constraints.to_dict(),
-    }
-    return stable_hash(json.dumps(payload, ensure_ascii=False, sort_keys=True))
+    return SegmentKeyContext(model=model, prompt_version=prompt_version, constraints=constraints).key(segment)
+
+
+class SegmentKeyContext:
+    """Hashes segment cache keys for one (model, prompt, constraints) setting.
+
+    The key is sha256 of the sorted-keys JSON of ``{constraints, model,
+    prompt_version, segment}``. Everything before ``segment`` is the same for a
+    whole build, so that prefix is hashed once and each key only copies the
+    digest state and feeds the segment's own JSON.
+    """
+
+    __slots__ = ("_prefix",)
+
+    def __init__(self, *, model: str, prompt_version: str, constraints: ChunkConstraints) -> None:
+        head = json.dumps(
+            {
+                "segment": None,
+                "model": model,
+                "prompt_version": prompt_version,
+                "constraints": constraints.to_dict(),
+            },
+            ensure_ascii=False,
+            sort_keys=True,
+        )
+        # "segment" sorts last, so the document ends with its placeholder.
+        self._prefix = hashlib.sha256(head[: -len("null}")].encode("utf-8"))
+
+    def key(self, segment: Segment) -> str:
+        digest = self._prefix.copy()
+        digest.update(json.dumps(segment.to_dict(), ensure_ascii=False, sort_keys=True).encode("utf-8"))
+        digest.update(b"}")
+        return digest.hexdigest()
 
 
 def normalize_chunk_list(payload: Any) -> list[Chunk]:
@@ -8,7 +8,7 @@ from typing import Sequence
 from .schemas import Chunk
 
 
-@dataclass(frozen=True)
+@dataclass(frozen=True, slots=True)
 class ValidationResult:
     chunks: tuple[Chunk, ...]
     warnings: tuple[str, ...]
@@ -30,8 +30,7 @@ def validate_chunks(chunks: Sequence[Chunk]) -> ValidationResult:
             warnings.append(f"chunk {chunk.id!r} dropped: duplicate id")
             continue
         seen.add(chunk.id)
-        anchors = dict(chunk.anchors)
-        if "path" not in anchors:
+        if "path" not in chunk.anchors:
             warnings.append(f"chunk {chunk.id!r} has no anchors.path")
         if not chunk.summary:
             warnings.append(f"chunk {chunk.id!r} has empty summary")
@@ -30,10 +30,16 @@ class MCPServeCommand(CPMAbstractCommand):
             choices=["http", "legacy"],
             help="Embedding transport mode for query operations.",
         )
+        parser.add_argument(
+            "--mmap-index",
+            action="store_true",
+            help="Memory-map packet FAISS indexes read-only instead of loading them into memory.",
+        )
 
     def run(self, argv: Sequence[str]) -> int:
         cpm_dir = getattr(argv, "cpm_dir", ".cpm")
         embed_url = getattr(argv, "embed_url", None)
         embed_mode = getattr(argv, "embeddings_mode", None)
-        run_server(cpm_dir=cpm_dir, embed_url=embed_url, embed_mode=embed_mode)
+        mmap_index = bool(getattr(argv, "mmap_index", False))
+        run_server(cpm_dir=cpm_dir, embed_url=embed_url, embed_mode=embed_mode, mmap_index=mmap_index)
         return 0
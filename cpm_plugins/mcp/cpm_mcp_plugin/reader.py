@@ -3,10 +3,12 @@
 from __future__ import annotations
 
 import json
+import os
 import re
+from concurrent.futures import ThreadPoolExecutor
 from functools import lru_cache
 from pathlib import Path
-from typing import Any, Dict, List, Optional, Tuple
+from typing import Any, Callable, Dict, Iterator, List, Optional, Set, Tuple
 
 _STAGE_ORDER = {
     "dev": 0,
@@ -26,6 +28,15 @@ _STAGE_ORDER = {
     "final": 100,
 }
 
+_INFO_WORKERS = min(32, (os.cpu_count() or 1) * 4)
+# Below this many packets the thread pool costs more than the I/O it overlaps.
+_PARALLEL_INFO_MIN = 8
+
+_UNSAFE_SEGMENT_RE = re.compile(r"[^a-zA-Z0-9._\-+@]+")
+_TOKEN_RE = re.compile(r"(\d+)|(\D+)")
+# "key: value" lines; blank lines, comments and lines without a colon never match.
+_SIMPLE_YML_RE = re.compile(r"^[^\S\n]*([^\s#:][^:\n]*):[^\S\n]*(.*?)[^\S\n]*$", re.M)
+
 
 def _read_json(path: Path) -> Optional[Dict[str, Any]]:
     try:
@@ -36,29 +47,31 @@ def _read_json(path: Path) -> Optional[Dict[str, Any]]:
         return None
 
 
-def _read_simple_yml(path: Path) -> Dict[str, str]:
-    out: Dict[str, str] = {}
+def _read_simple_yml(path: Path | str) -> Dict[str, str]:
     try:
-        lines = path.read_text(encoding="utf-8").splitlines()
+        with open(path, "rb") as handle:
+            data = handle.read()
     except FileNotFoundError:
-        return out
+        return {}
+    try:
+        text = data.decode("utf-8")
     except UnicodeDecodeError:
-        lines = path.read_text(encoding="latin-1").splitlines()
+        text = data.decode("latin-1")
 
-    for raw in lines:
-        line = raw.strip()
-        if not line or line.startswith("#"):
-            continue
-        if ":" not in line:
-            continue
-        k, v = line.split(":", 1)
-        k = k.strip()
-        v = v.strip().strip('"').strip("'")
-        if k:
-            out[k] = v
+    out: Dict[str, str] = {}
+    for key, value in _SIMPLE_YML_RE.findall(text):
+        out[key.rstrip()] = value.strip('"').strip("'")
     return out
 
 
+def _dir_entries(path: Path) -> Dict[str, os.DirEntry]:
+    try:
+        with os.scandir(path) as it:
+            return {entry.name: entry for entry in it}
+    except OSError:
+        return {}
+
+
 def _split_csv(value: Optional[str]) -> List[str]:
     if not value:
         return []
@@ -70,11 +83,16 @@ def _safe_segment(seg: str) -> str:
     if not value:
         return ""
     value = value.replace("\\", "/").replace("/", "-")
-    value = re.sub(r"[^a-zA-Z0-9._\\-+@]+", "-", value).strip("-")
+    value = _UNSAFE_SEGMENT_RE.sub("-", value).strip("-")
     return value
 
 
 def split_version_parts(version: str) -> List[str]:
+    return list(_split_version_parts(version))
+
+
+@lru_cache(maxsize=512)
+def _split_version_parts(version: str) -> Tuple[str, ...]:
     v = (version or "").strip()
     if not v:
         raise ValueError("empty version")
@@ -83,7 +101,7 @@ def split_version_parts(version: str) -> List[str]:
     parts = [part for part in parts if part]
     if not parts:
         raise ValueError(f"invalid version after sanitization: {version!r}")
-    return parts
+    return tuple(parts)
 
 
 def _split_segment_tokens(seg: str) -> Tuple[str, List[str]]:
@@ -94,70 +112,57 @@ def _split_segment_tokens(seg: str) -> Tuple[str, List[str]]:
     return (parts[0], parts[1:]) if parts else (value, [])
 
 
-def _tokenize_text_and_int(segment: str) -> List[Any]:
+@lru_cache(maxsize=2048)
+def _tokenize_text_and_int(segment: str) -> Tuple[Any, ...]:
     value = (segment or "").strip()
     if not value:
-        return []
-    out: List[Any] = []
-    i = 0
-    while i < len(value):
-        if value[i].isdigit():
-            j = i
-            while j < len(value) and value[j].isdigit():
-                j += 1
-            out.append((0, int(value[i:j])))
-            i = j
-        else:
-            j = i
-            while j < len(value) and not value[j].isdigit():
-                j += 1
-            out.append((1, value[i:j].lower()))
-            i = j
-    return out
+        return ()
+    return tuple((0, int(digits)) if digits else (1, text.lower()) for digits, text in _TOKEN_RE.findall(value))
 
 
 def _qualifier_stage_and_num(tokens: List[str]) -> Tuple[int, int, Tuple[Any, ...]]:
     if not tokens:
         return (1000, 0, ())
 
-    flat: List[Any] = []
-    for token in tokens:
-        flat.extend(_tokenize_text_and_int(token))
+    flat = [item for token in tokens for item in _tokenize_text_and_int(token)]
 
+    # One pass over the tokens. ``extra`` keeps everything before the first run
+    # of stage words plus the first token after that run; ``stage_num`` is the
+    # first number anywhere after the first stage word.
     stage_rank = None
     stage_num = 0
     extra: List[Any] = []
+    collecting = True
+    seen_stage = False
+    need_num = False
 
     for typ, value in flat:
-        if typ == 1:
-            if value in _STAGE_ORDER:
+        is_stage = typ == 1 and value in _STAGE_ORDER
+        if collecting:
+            if is_stage:
                 stage_rank = _STAGE_ORDER[value]
-                continue
-            extra.append((typ, value))
-        else:
-            extra.append((typ, value))
-        if stage_rank is not None:
+            else:
+                extra.append((typ, value))
+                collecting = stage_rank is None
+        if need_num and typ == 0:
+            stage_num = value
+            need_num = False
+        elif is_stage and not seen_stage:
+            seen_stage = need_num = True
+        if seen_stage and not (collecting or need_num):
             break
 
     if stage_rank is None:
         stage_rank = 50
 
-    seen_stage = False
-    for typ, value in flat:
-        if typ == 1 and value in _STAGE_ORDER and not seen_stage:
-            seen_stage = True
-            continue
-        if seen_stage and typ == 0:
-            stage_num = value
-            break
-
     return (stage_rank, stage_num, tuple(extra))
 
 
-def version_key(version: str) -> Tuple[Tuple[List[Any], int, int, Tuple[Any, ...]], ...]:
+@lru_cache(maxsize=1024)
+def version_key(version: str) -> Tuple[Tuple[Tuple[Any, ...], int, int, Tuple[Any, ...]], ...]:
     normalized = (version or "").strip()
     segments = [segment for segment in normalized.split(".") if segment != ""]
-    out: List[Tuple[List[Any], int, int, Tuple[Any, ...]]] = []
+    out: List[Tuple[Tuple[Any, ...], int, int, Tuple[Any, ...]]] = []
     for segment in segments:
         base, qualifiers = _split_segment_tokens(segment)
         base_tokens = _tokenize_text_and_int(base)
@@ -166,8 +171,53 @@ def version_key(version: str) -> Tuple[Tuple[List[Any], int, int, Tuple[Any, ...
     return tuple(out)
 
 
-def _looks_like_version_dir(path: Path) -> bool:
-    return (path / "manifest.json").exists() or (path / "faiss" / "index.faiss").exists()
+def _looks_like_version_dir(path: Path, names: Set[str]) -> bool:
+    # ``names`` is the directory listing the caller already holds; only a present
+    # faiss/ entry costs a stat.
+    return "manifest.json" in names or ("faiss" in names and (path / "faiss" / "index.faiss").exists())
+
+
+def _holds_version(path: Path, names: Set[str]) -> bool:
+    return "cpm.yml" in names and _looks_like_version_dir(path, names)
+
+
+def _holds_packet(path: Path, names: Set[str]) -> bool:
+    return "cpm.yml" in names or _looks_like_version_dir(path, names)
+
+
+def _walk_packet_dirs(
+    root: Path,
+    matches: Callable[[Path, Set[str]], bool],
+    *,
+    stop_at_root: bool = False,
+) -> Iterator[Path]:
+    """Yield directories under ``root`` (``root`` included) accepted by ``matches``.
+
+    Each directory is listed once with os.scandir; its entry names feed ``matches``
+    so marker files cost no extra stat calls. A matching directory below ``root``
+    is not descended into (its faiss/ and docs never hold further packets), nor
+    is a matching ``root`` when ``stop_at_root`` is set. ``.history`` trees are
+    skipped. Siblings are visited in name order.
+    """
+
+    stack = [root]
+    while stack:
+        current = stack.pop()
+        try:
+            with os.scandir(current) as it:
+                entries = sorted(it, key=lambda entry: entry.name, reverse=True)
+        except OSError:
+            continue
+        if matches(current, {entry.name for entry in entries}):
+            yield current
+            if stop_at_root or current != root:
+                continue
+        for entry in entries:
+            try:
+                if entry.name != ".history" and entry.is_dir(follow_symlinks=False):
+                    stack.append(Path(entry.path))
+            except OSError:
+                continue
 
 
 class PacketReader:
@@ -175,13 +225,26 @@ class PacketReader:
 
     def __init__(self, cpm_dir: Path):
         self.root = cpm_dir
+        # Per-reader memo of pin files and installed versions, keyed by packet name.
+        self._pinned_cache: Dict[str, Optional[str]] = {}
+        self._versions_cache: Dict[str, List[str]] = {}
+
+    def clear_cache(self) -> None:
+        """Forget memoized pins and versions, e.g. after packets were installed."""
+
+        self._pinned_cache.clear()
+        self._versions_cache.clear()
 
     def list_packets(self, *, include_all_versions: bool = False) -> List[Dict[str, Any]]:
         if include_all_versions:
             dirs = self._iter_packet_dirs()
         else:
             dirs = self._current_packet_dirs()
-        return [self._extract_packet_info(path) for path in dirs]
+        if len(dirs) < _PARALLEL_INFO_MIN:
+            return [self._extract_packet_info(path) for path in dirs]
+        # Each packet is read independently; map() keeps the directory order.
+        with ThreadPoolExecutor(max_workers=min(_INFO_WORKERS, len(dirs))) as executor:
+            return list(executor.map(self._extract_packet_info, dirs))
 
     def resolve_packet_dir(self, packet: str) -> Optional[Path]:
         candidate = Path(packet)
@@ -191,114 +254,117 @@ class PacketReader:
         pinned = self._get_pinned_version(packet)
         if pinned:
             target = self._version_dir(packet, pinned)
-            if target.exists():
+            if target is not None:
                 return target
 
         versions = self._installed_versions(packet)
         if not versions:
             return None
-        best = max(versions, key=version_key)
-        target = self._version_dir(packet, best)
-        return target if target.exists() else None
+        best = versions[-1]
+        return self._version_dir(packet, best)
+
+    def _packet_entries(self) -> List[os.DirEntry]:
+        # DirEntry.is_dir() answers from the listing's d_type on most platforms;
+        # it still follows symlinks so linked packet directories keep working.
+        entries = _dir_entries(self.root)
+        return [entries[name] for name in sorted(entries) if entries[name].is_dir()]
 
     def _current_packet_dirs(self) -> List[Path]:
         dirs: List[Path] = []
-        if not self.root.exists():
-            return dirs
-        for name_dir in sorted(self.root.iterdir()):
-            if not name_dir.is_dir():
-                continue
-            name = name_dir.name
+        for entry in self._packet_entries():
+            name = entry.name
             pinned = self._get_pinned_version(name)
             if pinned:
                 version_dir = self._version_dir(name, pinned)
-                if version_dir.exists():
+                if version_dir is not None:
                     dirs.append(version_dir)
                     continue
             versions = self._installed_versions(name)
             if not versions:
                 continue
-            best = max(versions, key=version_key)
+            best = versions[-1]
             version_dir = self._version_dir(name, best)
-            if version_dir.exists():
+            if version_dir is not None:
                 dirs.append(version_dir)
         return dirs
 
     def _iter_packet_dirs(self) -> List[Path]:
-        out: List[Path] = []
-        if not self.root.exists() or not self.root.is_dir():
-            return out
-
-        def is_packet_root(path: Path) -> bool:
-            return (
-                (path / "manifest.json").exists()
-                or (path / "cpm.yml").exists()
-                or (path / "faiss" / "index.faiss").exists()
-            )
-
-        for name_dir in sorted(self.root.iterdir()):
-            if not name_dir.is_dir():
-                continue
-            if is_packet_root(name_dir):
-                out.append(name_dir)
-                continue
-            for candidate in name_dir.rglob("*"):
-                if not candidate.is_dir():
-                    continue
-                if candidate.name == ".history":
-                    continue
-                if candidate == name_dir:
-                    continue
-                if is_packet_root(candidate):
-                    out.append(candidate)
-
         unique: List[Path] = []
         seen: set[str] = set()
-        for path in out:
-            key = str(path.resolve()).lower()
-            if key in seen:
-                continue
-            seen.add(key)
-            unique.append(path)
+        real_root = os.path.realpath(self.root)
+        for entry in self._packet_entries():
+            linked = entry.is_symlink()
+            # A packet stored directly under its name is taken as-is; otherwise
+            # its version directories are collected below it.
+            for path in _walk_packet_dirs(self.root / entry.name, _holds_packet, stop_at_root=True):
+                # The walk never follows links, so only a linked name directory can
+                # alias another packet; everything else maps onto the real root
+                # without a per-path resolve().
+                if linked:
+                    key = str(path.resolve())
+                else:
+                    key = os.path.join(real_root, os.path.relpath(path, self.root))
+                key = os.path.normcase(key)
+                if key in seen:
+                    continue
+                seen.add(key)
+                unique.append(path)
         return unique
 
     def _packet_root(self, name: str) -> Path:
         return self.root / name
 
-    def _version_dir(self, name: str, version: str) -> Path:
+    def _version_dir(self, name: str, version: str) -> Optional[Path]:
+        # String join + os.path.exists: only a directory that is actually there
+        # becomes a Path.
         normalized = (version or "").strip()
         if not normalized:
             raise ValueError("empty version")
-        return self._packet_root(name) / normalized
+        target = os.path.join(self.root, name, normalized)
+        return Path(target) if os.path.exists(target) else None
 
-    def _packet_pin_path(self, name: str) -> Path:
-        return self._packet_root(name) / "cpm.yml"
+    def _packet_pin_path(self, name: str) -> str:
+        # Only ever opened, so a plain string join is enough.
+        return os.path.join(self.root, name, "cpm.yml")
 
-    @lru_cache(maxsize=128)
     def _get_pinned_version(self, name: str) -> Optional[str]:
+        if name in self._pinned_cache:
+            return self._pinned_cache[name]
         data = _read_simple_yml(self._packet_pin_path(name))
-        version = (data.get("version") or "").strip()
-        return version or None
+        version = (data.get("version") or "").strip() or None
+        self._pinned_cache[name] = version
+        return version
 
-    @lru_cache(maxsize=32)
     def _installed_versions(self, name: str) -> List[str]:
-        root = self._packet_root(name)
-        if not root.exists():
-            return []
+        cached = self._versions_cache.get(name)
+        if cached is not None:
+            return cached
         versions: List[str] = []
-        for path in root.rglob("cpm.yml"):
-            version_dir = path.parent
-            if not _looks_like_version_dir(version_dir):
-                continue
-            meta = _read_simple_yml(path)
+        for version_dir in _walk_packet_dirs(self._packet_root(name), _holds_version):
+            meta = _read_simple_yml(os.path.join(version_dir, "cpm.yml"))
             version = (meta.get("version") or "").strip()
             if version:
                 versions.append(version)
-        return sorted(set(versions), key=version_key)
+        # Ascending, so callers take the newest as versions[-1]. The raw string
+        # breaks ties between spellings with equal keys ("1.0-RC1" / "1.0-rc1").
+        ordered = sorted(set(versions), key=lambda version: (version_key(version), version))
+        self._versions_cache[name] = ordered
+        return ordered
 
     def _extract_packet_info(self, packet_root: Path) -> Dict[str, Any]:
-        manifest = _read_json(packet_root / "manifest.json") or {}
-        yml = _read_simple_yml(packet_root / "cpm.yml")
+        # One directory listing answers every "does X exist" question below.
+        entries = _dir_entries(packet_root)
+        has_manifest = "manifest.json" in entries
+        has_cpm_yml = "cpm.yml" in entries
+        faiss_entry = entries.get("faiss")
+        has_faiss = (
+            faiss_entry is not None
+            and faiss_entry.is_dir()
+            and "index.faiss" in _dir_entries(Path(faiss_entry.path))
+        )
+
+        manifest = (_read_json(packet_root / "manifest.json") if has_manifest else None) or {}
+        yml = _read_simple_yml(packet_root / "cpm.yml") if has_cpm_yml else {}
 
         name = yml.get("name") or manifest.get("packet_id") or packet_root.name
         version = yml.get("version") or (manifest.get("cpm") or {}).get("version") or "unknown"
@@ -328,8 +394,8 @@ class PacketReader:
             "embedding_model": emb_model,
             "embedding_dim": emb_dim,
             "embedding_normalized": emb_norm,
-            "has_faiss": (packet_root / "faiss" / "index.faiss").exists(),
-            "has_docs": (packet_root / "docs.jsonl").exists(),
-            "has_manifest": (packet_root / "manifest.json").exists(),
-            "has_cpm_yml": (packet_root / "cpm.yml").exists(),
+            "has_faiss": has_faiss,
+            "has_docs": "docs.jsonl" in entries,
+            "has_manifest": has_manifest,
+            "has_cpm_yml": has_cpm_yml,
         }
@@ -3,17 +3,29 @@
 from __future__ import annotations
 
 import json
+import mmap
 import os
+import time
 from pathlib import Path
 from typing import Any, Dict, List, Optional
 
 import faiss
+import numpy as np
+import requests
 from cpm_builtin.embeddings import EmbeddingClient
+from cpm_core.packet.faiss_db import load_faiss_index, tune_index_for_manifest
+from cpm_core.packet.lockfile import RACY_MTIME_NS
+from cpm_core.jsonio import loads as json_loads
 
 from .reader import PacketReader
 
 DEFAULT_EMBED_URL = "http://127.0.0.1:8876"
 DEFAULT_EMBED_MODE = "http"
+_TRUTHY = {"1", "true", "yes", "on"}
+# Sidecar next to docs.jsonl: [size, mtime_ns, offset_0, offset_1, ...] as int64.
+DOCS_INDEX_NAME = "docs.idx.npy"
+_SCAN_BLOCK_BYTES = 16 << 20
+_ASCII_WHITESPACE = np.frombuffer(b" \t\n\r\x0b\x0c", dtype=np.uint8)
 
 
 class EmbedServerError(RuntimeError):
@@ -25,6 +37,36 @@ class EmbedServerError(RuntimeError):
         self.embed_mode = embed_mode
 
 
+def _nonblank_line_offsets(path: Path) -> np.ndarray:
+    """Start offsets of the lines of ``path`` that hold more than whitespace.
+
+    Newlines are located with numpy over a read-only mmap, one block at a time
+    so the temporary masks stay bounded. Only lines that start with whitespace
+    (rare in JSONL) are inspected byte by byte.
+    """
+
+    with path.open("rb") as handle:
+        size = os.fstat(handle.fileno()).st_size
+        if size == 0:
+            return np.empty(0, dtype=np.int64)
+        with mmap.mmap(handle.fileno(), 0, access=mmap.ACCESS_READ) as mapped:
+            data = np.frombuffer(mapped, dtype=np.uint8)
+            newlines = [
+                np.flatnonzero(data[base : base + _SCAN_BLOCK_BYTES] == ord("\n")) + base
+                for base in range(0, size, _SCAN_BLOCK_BYTES)
+            ]
+            ends = np.concatenate((*newlines, np.array([size], dtype=np.int64)))
+            starts = np.concatenate((np.array([0], dtype=np.int64), ends[:-1] + 1))
+            keep = starts < ends
+            starts, ends = starts[keep], ends[keep]
+            maybe_blank = np.flatnonzero(np.isin(data[starts], _ASCII_WHITESPACE))
+            if maybe_blank.size:
+                blank = [i for i in maybe_blank.tolist() if not mapped[starts[i] : ends[i]].strip()]
+                starts = np.delete(starts, blank)
+            del data  # release the buffer export before the mmap closes
+    return starts.astype(np.int64, copy=False)
+
+
 class PacketRetriever:
     """Retrieve nearest neighbors from a built packet."""
 
@@ -35,6 +77,7 @@ class PacketRetriever:
         *,
         embed_url: Optional[str] = None,
         embed_mode: Optional[str] = None,
+        mmap_index: Optional[bool] = None,
     ) -> None:
         self.cpm_dir = cpm_dir
         self.packet = packet
@@ -63,73 +106,134 @@ class PacketRetriever:
             or os.environ.get("RAG_EMBED_MODE")
             or DEFAULT_EMBED_MODE
         )
-        self.docs = self._load_docs()
+        if mmap_index is None:
+            mmap_index = os.environ.get("RAG_FAISS_MMAP", "").strip().lower() in _TRUTHY
+        self.mmap_index = bool(mmap_index)
+        self.docs_path = self.packet_dir / "docs.jsonl"
+        self._doc_offsets = self._load_doc_offsets()
         self.index = self._load_index()
 
-    def _load_docs(self) -> List[Dict[str, Any]]:
-        docs_path = self.packet_dir / "docs.jsonl"
-        if not docs_path.exists():
-            raise FileNotFoundError(f"missing docs.jsonl at {docs_path}")
-        entries: List[Dict[str, Any]] = []
-        with docs_path.open("r", encoding="utf-8") as stream:
-            for line in stream:
-                payload = line.strip()
-                if not payload:
+    def _load_doc_offsets(self) -> np.ndarray:
+        """Byte offset of every non-blank docs.jsonl line, in document order.
+
+        Only the documents FAISS returns are ever parsed, so the corpus is not
+        kept in memory. The offsets are cached in a sidecar keyed by the size and
+        mtime of docs.jsonl; a stale or unreadable sidecar is rebuilt. A docs.jsonl
+        modified within the last two seconds is always rescanned and never cached.
+        """
+
+        try:
+            stat = self.docs_path.stat()
+        except FileNotFoundError:
+            raise FileNotFoundError(f"missing docs.jsonl at {self.docs_path}") from None
+        stamp = (stat.st_size, stat.st_mtime_ns)
+        sidecar = self.docs_path.with_name(DOCS_INDEX_NAME)
+        # Same rule as the lockfile hash caches: a same-size rewrite within one
+        # mtime tick keeps the stamp, so neither trust nor write it for fresh files.
+        racy = stat.st_mtime_ns >= time.time_ns() - RACY_MTIME_NS
+        if not racy:
+            try:
+                cached = np.load(sidecar, allow_pickle=False)
+                if cached.ndim == 1 and cached.size >= 2 and (int(cached[0]), int(cached[1])) == stamp:
+                    return cached[2:]
+            except (OSError, ValueError):
+                pass
+
+        table = np.concatenate((np.array(stamp, dtype=np.int64), _nonblank_line_offsets(self.docs_path)))
+        if racy:
+            return table[2:]
+        tmp = sidecar.with_name(f"{sidecar.name}.tmp")
+        try:
+            with tmp.open("wb") as handle:
+                np.save(handle, table, allow_pickle=False)
+            os.replace(tmp, sidecar)
+        except OSError:
+            # Read-only installs still work; they just rescan on the next load.
+            tmp.unlink(missing_ok=True)
+        return table[2:]
+
+    def _read_docs(self, ids: List[int]) -> Dict[int, Dict[str, Any]]:
+        docs: Dict[int, Dict[str, Any]] = {}
+        with self.docs_path.open("rb") as stream:
+            for idx in ids:
+                if idx in docs:
                     continue
-                entry = json.loads(payload)
-                entries.append(entry)
-        return entries
+                stream.seek(int(self._doc_offsets[idx]))
+                docs[idx] = json_loads(stream.readline())
+        return docs
 
     def _load_index(self) -> faiss.Index:
         index_path = self.packet_dir / "faiss" / "index.faiss"
         if not index_path.exists():
             raise FileNotFoundError(f"missing faiss index at {index_path}")
-        return faiss.read_index(str(index_path))
+        # mmap lets processes share the index pages and skips the upfront read;
+        # IVF inverted lists are then paged in only for the probed clusters.
+        index = load_faiss_index(index_path, mmap=self.mmap_index)
+        tune_index_for_manifest(index, (self.manifest.get("similarity") or {}).get("index_type"))
+        return index
 
     def _new_embedder(self) -> EmbeddingClient:
-        embedder = EmbeddingClient(self.embed_url, mode=self.embed_mode)
-        if not embedder.health():
-            raise EmbedServerError(self.embed_url, self.embed_mode)
-        return embedder
+        return EmbeddingClient(self.embed_url, mode=self.embed_mode)
 
     def retrieve(self, query: str, k: int) -> Dict[str, Any]:
+        return self.retrieve_batch([query], k)[0]
+
+    def retrieve_batch(self, queries: List[str], k: int) -> List[Dict[str, Any]]:
+        """Answer several queries with one embed request and one FAISS search."""
+
+        if not queries:
+            return []
         embedder = self._new_embedder()
-        vector = embedder.embed_texts(
-            [query],
-            model_name=self.model_name,
-            max_seq_length=self.max_seq_length,
-            normalize=True,
-            dtype="float32",
-            show_progress=False,
-        )
-        scores, ids = self.index.search(vector, int(k))
-        scores, ids = scores[0], ids[0]
-
-        hits: List[Dict[str, Any]] = []
-        for idx, score in zip(ids, scores):
-            if int(idx) < 0:
-                continue
-            doc = self.docs[int(idx)]
-            hits.append(
+        # No separate health probe: an unreachable server surfaces as the
+        # transport error behind the embed call's retry failure.
+        try:
+            vectors = embedder.embed_texts(
+                list(queries),
+                model_name=self.model_name,
+                max_seq_length=self.max_seq_length,
+                normalize=True,
+                dtype="float32",
+                show_progress=False,
+            )
+        except RuntimeError as exc:
+            if isinstance(exc.__cause__, (requests.ConnectionError, requests.Timeout)):
+                raise EmbedServerError(self.embed_url, self.embed_mode) from exc
+            raise
+        scores, ids = self.index.search(vectors, int(k))
+
+        found = [
+            [(int(idx), score) for idx, score in zip(row_ids, row_scores) if int(idx) >= 0]
+            for row_ids, row_scores in zip(ids, scores)
+        ]
+        docs = self._read_docs([idx for row in found for idx, _ in row])
+        embedding = {
+            "model": self.model_name,
+            "max_seq_length": self.max_seq_length,
+            "embed_url": self.embed_url,
+            "mode": self.embed_mode,
+        }
+        results: List[Dict[str, Any]] = []
+        for query, row in zip(queries, found):
+            hits: List[Dict[str, Any]] = []
+            for idx, score in row:
+                doc = docs[idx]
+                hits.append(
+                    {
+                        "score": float(score),
+                        "id": doc.get("id"),
+                        "text": doc.get("text"),
+                        "metadata": doc.get("metadata") or {},
+                    }
+                )
+            results.append(
                 {
-                    "score": float(score),
-                    "id": doc.get("id"),
-                    "text": doc.get("text"),
-                    "metadata": doc.get("metadata") or {},
+                    "ok": True,
+                    "packet": self.packet_dir.name,
+                    "packet_path": str(self.packet_dir).replace("\\", "/"),
+                    "query": query,
+                    "k": int(k),
+                    "embedding": dict(embedding),
+                    "results": hits,
                 }
             )
-
-        return {
-            "ok": True,
-            "packet": self.packet_dir.name,
-            "packet_path": str(self.packet_dir).replace("\\", "/"),
-            "query": query,
-            "k": int(k),
-            "embedding": {
-                "model": self.model_name,
-                "max_seq_length": self.max_seq_length,
-                "embed_url": self.embed_url,
-                "mode": self.embed_mode,
-            },
-            "results": hits,
-        }
+        return results
@@ -3,8 +3,10 @@
 from __future__ import annotations
 
 import os
+import threading
+from collections import OrderedDict
 from pathlib import Path
-from typing import Any, Dict, Optional
+from typing import Any, Dict, List, Optional, Tuple
 
 from mcp.server.fastmcp import FastMCP
 
@@ -13,11 +15,60 @@ from .retriever import EmbedServerError, PacketRetriever
 
 mcp = FastMCP(name="context-packet-manager")
 
+_RETRIEVER_CACHE_SIZE = 32
+# (cpm_dir, packet, embed_url, embed_mode) -> (packet stamp, retriever), LRU order.
+_retrievers: "OrderedDict[Tuple[str, str, str, str], Tuple[Tuple[Any, ...], PacketRetriever]]" = OrderedDict()
+_retrievers_lock = threading.Lock()
+
 
 def _resolve_cpm_dir(override: Optional[str]) -> Path:
     return Path(override or os.environ.get("RAG_CPM_DIR", ".cpm"))
 
 
+def _packet_stamp(packet_dir: Path) -> Tuple[Any, ...]:
+    stamp: List[Any] = [str(packet_dir)]
+    for relative in ("manifest.json", "docs.jsonl", "faiss/index.faiss"):
+        try:
+            stat = (packet_dir / relative).stat()
+        except OSError:
+            stamp.append(None)
+            continue
+        stamp.append((stat.st_mtime_ns, stat.st_size))
+    return tuple(stamp)
+
+
+def _get_retriever(
+    root: Path,
+    packet: str,
+    embed_url: Optional[str],
+    embed_mode: Optional[str],
+) -> PacketRetriever:
+    """Return a loaded retriever, reusing the last one while its packet is unchanged.
+
+    The packet is re-resolved on every call, so a newly installed or pinned
+    version, or a rebuilt manifest/docs/index, loads a fresh retriever.
+    """
+
+    packet_dir = PacketReader(root).resolve_packet_dir(packet)
+    if packet_dir is None:
+        raise FileNotFoundError(packet)
+    key = (str(root.resolve()), packet, embed_url or "", embed_mode or "")
+    stamp = _packet_stamp(packet_dir)
+    with _retrievers_lock:
+        cached = _retrievers.get(key)
+        if cached is not None and cached[0] == stamp:
+            _retrievers.move_to_end(key)
+            return cached[1]
+
+    retriever = PacketRetriever(root, packet, embed_url=embed_url, embed_mode=embed_mode)
+    with _retrievers_lock:
+        _retrievers[key] = (stamp, retriever)
+        _retrievers.move_to_end(key)
+        while len(_retrievers) > _RETRIEVER_CACHE_SIZE:
+            _retrievers.popitem(last=False)
+    return retriever
+
+
 @mcp.tool()
 def lookup(
     cpm_dir: str | None = None,
@@ -37,15 +88,21 @@ def lookup(
 @mcp.tool()
 def query(
     packet: str,
-    query: str,
+    query: str = "",
     k: int = 5,
     cpm_dir: str | None = None,
     embed_url: Optional[str] = None,
     embed_mode: Optional[str] = None,
+    queries: Optional[List[str]] = None,
 ) -> Dict[str, Any]:
+    # ``queries`` batches several questions into one embed call and one search;
+    # ``query``, when also given, is answered first.
+    batch = ([query] if query else []) + [item for item in (queries or []) if item]
+    if not batch:
+        return {"ok": False, "error": "empty_query", "packet": packet}
     root = _resolve_cpm_dir(cpm_dir)
     try:
-        retriever = PacketRetriever(root, packet, embed_url=embed_url, embed_mode=embed_mode)
+        retriever = _get_retriever(root, packet, embed_url, embed_mode)
     except FileNotFoundError:
         return {
             "ok": False,
@@ -53,6 +110,18 @@ def query(
             "packet": packet,
             "tried": str(root / packet).replace("\\", "/"),
         }
+    except Exception as exc:
+        return {
+            "ok": False,
+            "error": "retrieval_failed",
+            "detail": str(exc),
+        }
+
+    try:
+        if queries is None:
+            return retriever.retrieve(query, k)
+        results = retriever.retrieve_batch(batch, k)
+        return {"ok": True, "packet": packet, "k": int(k), "count": len(results), "results": results}
     except EmbedServerError as exc:
         return {
             "ok": False,
@@ -61,14 +130,6 @@ def query(
             "embed_mode": exc.embed_mode,
             "hint": "configure an embedding provider with `cpm embed add ... --set-default` or set RAG_EMBED_URL/RAG_EMBED_MODE",
         }
-    except Exception as exc:
-        return {
-            "ok": False,
-            "error": "retrieval_failed",
-            "detail": str(exc),
-        }
-
-    return retriever.retrieve(query, k)
 
 
 def run_server(
@@ -76,6 +137,7 @@ def run_server(
     cpm_dir: str | None = None,
     embed_url: str | None = None,
     embed_mode: str | None = None,
+    mmap_index: bool = False,
 ) -> None:
     if cpm_dir:
         os.environ["RAG_CPM_DIR"] = cpm_dir
@@ -83,4 +145,6 @@ def run_server(
         os.environ["RAG_EMBED_URL"] = embed_url
     if embed_mode:
         os.environ["RAG_EMBED_MODE"] = embed_mode
+    if mmap_index:
+        os.environ["RAG_FAISS_MMAP"] = "1"
     mcp.run()
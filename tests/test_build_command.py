@@ -401,6 +401,66 @@ def test_build_command_accepts_version_alias(tmp_path: Path, monkeypatch) -> Non
     assert manifest.cpm["version"] == "2.0.0"
 
 
+def test_build_command_index_recipe_builds_tuned_ivf_packet(tmp_path: Path, monkeypatch) -> None:
+    import faiss
+
+    from cpm_core.packet.faiss_db import DEFAULT_NPROBE, tune_index_for_manifest
+
+    project = tmp_path / "docs"
+    project.mkdir()
+    (project / "notes.txt").write_text("\n".join(f"line {idx}" for idx in range(96)), encoding="utf-8")
+
+    monkeypatch.chdir(tmp_path)
+    monkeypatch.setattr("cpm_builtin.embeddings.client.EmbeddingClient.health", lambda self: True)
+
+    def fake_embed_texts(
+        self,
+        texts,
+        *,
+        model_name: str,
+        max_seq_length: int,
+        normalize: bool,
+        dtype: str,
+        show_progress: bool,
+    ):
+        vectors = np.random.default_rng(len(texts)).standard_normal((len(texts), 8)).astype(np.float32)
+        return vectors / np.linalg.norm(vectors, axis=1, keepdims=True)
+
+    monkeypatch.setattr(
+        "cpm_builtin.embeddings.client.EmbeddingClient.embed_texts",
+        fake_embed_texts,
+    )
+
+    result = cli_main(
+        [
+            "build",
+            "run",
+            "--source",
+            "docs",
+            "--name",
+            "docs",
+            "--version",
+            "1.0.0",
+            "--lines-per-chunk",
+            "1",
+            "--overlap-lines",
+            "0",
+            "--index-recipe",
+            "IVF2,Flat",
+        ],
+        start_dir=tmp_path,
+    )
+    assert result == 0
+    packet_dir = tmp_path / "dist" / "docs" / "1.0.0"
+    manifest = load_manifest(packet_dir / "manifest.json")
+    assert manifest.similarity["index_type"] == "faiss:IVF2,Flat"
+
+    index = load_faiss_index(packet_dir / "faiss" / "index.faiss")
+    assert tune_index_for_manifest(index, manifest.similarity["index_type"])
+    assert faiss.extract_index_ivf(index).nprobe == DEFAULT_NPROBE
+    assert not tune_index_for_manifest(index, "faiss.IndexFlatIP")
+
+
 def test_build_command_uses_default_provider_from_embeddings_config(tmp_path: Path, monkeypatch) -> None:
     project = tmp_path / "docs"
     project.mkdir()
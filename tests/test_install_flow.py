@@ -6,6 +6,7 @@ from pathlib import Path
 
 from cpm_cli.main import main as cli_main
 from cpm_builtin.embeddings import EmbeddingProviderConfig, EmbeddingsConfigService
+from cpm_core.oci import install_lock_path, read_install_lock, write_install_lock
 
 
 def _write_workspace_config(workspace_root: Path) -> None:
@@ -203,3 +204,21 @@ def test_install_no_embed_skips_model_resolution(monkeypatch, tmp_path: Path) ->
     lock = json.loads((workspace_root / "state" / "install" / "demo.lock.json").read_text(encoding="utf-8"))
     assert lock["no_embed"] is True
     assert lock["selected_model"] is None
+
+
+def test_install_lock_with_floats_matches_stdlib_json(tmp_path: Path) -> None:
+    payload = {"packet": "demo", "selected_model": "m", "scores": [1e-05, 1e16, 0.5]}
+    path = write_install_lock(tmp_path, "demo", payload)
+    assert path.read_bytes() == json.dumps(payload, ensure_ascii=False, indent=2).encode("utf-8")
+
+
+def test_read_install_lock_returns_none_for_missing_or_unreadable_locks(tmp_path: Path) -> None:
+    assert read_install_lock(tmp_path, "demo") is None
+    write_install_lock(tmp_path, "demo", {"packet": "demo"})
+    assert read_install_lock(tmp_path, "demo") == {"packet": "demo"}
+
+    path = install_lock_path(tmp_path, "demo")
+    path.write_text("{not json", encoding="utf-8")
+    assert read_install_lock(tmp_path, "demo") is None
+    path.write_text("[1, 2]", encoding="utf-8")
+    assert read_install_lock(tmp_path, "demo") is None
@@ -0,0 +1,27 @@
+"""Tests for the shared JSON backend helpers."""
+
+from __future__ import annotations
+
+import json
+import math
+
+from cpm_core.jsonio import dumps_line, dumps_pretty, has_float, loads
+
+
+def test_has_float_finds_nested_values_and_keys() -> None:
+    assert not has_float({"a": [1, "x", {"b": None}], "c": (True,)})
+    assert has_float({"a": [1, {"b": 0.5}]})
+    assert has_float({1.5: "key"})
+
+
+def test_dumps_match_stdlib_json_bytes() -> None:
+    payload = {"text": "caffè", "n": 3, 7: ["x"], "scores": [1e-05, 1e16], "nested": {"ok": True}}
+    assert dumps_line(payload) == (json.dumps(payload, ensure_ascii=False, separators=(",", ":")) + "\n").encode()
+    assert dumps_pretty(payload) == json.dumps(payload, ensure_ascii=False, indent=2).encode("utf-8")
+    plain = {"text": "caffè", 7: ["x"]}
+    assert dumps_pretty(plain) == json.dumps(plain, ensure_ascii=False, indent=2).encode("utf-8")
+
+
+def test_loads_accepts_what_only_stdlib_json_parses() -> None:
+    assert math.isnan(loads(b'{"v": NaN}')["v"])
+    assert loads('{"v": -Infinity}')["v"] == -math.inf
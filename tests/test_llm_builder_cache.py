@@ -0,0 +1,87 @@
+"""Unit tests for the llm builder chunk cache."""
+
+from __future__ import annotations
+
+from pathlib import Path
+import sys
+
+PLUGIN_SRC = Path("cpm_plugins/llm_builder").resolve()
+if str(PLUGIN_SRC) not in sys.path:
+    sys.path.insert(0, str(PLUGIN_SRC))
+
+from cpm_llm_builder_plugin.cache import (
+    LEGACY_HASH_ALGO,
+    CacheJournal,
+    CacheV2,
+    FileCacheEntry,
+    journal_path,
+    load_cache,
+    save_cache,
+)
+from cpm_llm_builder_plugin.schemas import Chunk
+
+
+def test_cache_hash_algo_round_trip_and_legacy_default(tmp_path: Path) -> None:
+    path = tmp_path / "cache.json"
+    cache = CacheV2()
+    cache.files["a.md"] = FileCacheEntry(source_hash="abc")
+    save_cache(path, cache)
+    assert load_cache(path).files["a.md"].hash_algo == "sha256"
+
+    path.write_text(
+        '{"version": 2, "files": {"a.md": {"source_hash": "abc", "segments": []}}}',
+        encoding="utf-8",
+    )
+    assert load_cache(path).files["a.md"].hash_algo == LEGACY_HASH_ALGO
+
+
+def test_cache_journal_replays_until_snapshot_is_saved(tmp_path: Path) -> None:
+    path = tmp_path / "chunk_cache.json"
+    with CacheJournal(journal_path(path)) as journal:
+        journal.append({"k1": Chunk(id="c1", text="one")})
+    with journal_path(path).open("ab") as handle:
+        handle.write(b'{"key": "k2", "chu')  # torn write from a crash
+
+    cache = load_cache(path)
+    assert cache.segment_enrichment["k1"].text == "one"
+    assert "k2" not in cache.segment_enrichment
+
+    save_cache(path, cache)
+    assert not journal_path(path).exists()
+    assert load_cache(path).segment_enrichment["k1"].id == "c1"
+
+
+def test_cache_files_with_float_metadata_match_stdlib_json(tmp_path: Path) -> None:
+    import json
+
+    path = tmp_path / "chunk_cache.json"
+    chunk = Chunk(id="c1", text="one", metadata={"score": 1e-05, "size": 1e16})
+    with CacheJournal(journal_path(path)) as journal:
+        journal.append({"k1": chunk})
+    line = journal_path(path).read_bytes()
+    expected_line = json.dumps({"key": "k1", "chunk": chunk.to_dict()}, ensure_ascii=False, separators=(",", ":"))
+    assert line == (expected_line + "\n").encode("utf-8")
+
+    cache = CacheV2()
+    cache.segment_enrichment["k1"] = chunk
+    save_cache(path, cache)
+    data = path.read_bytes()
+    assert data == json.dumps(json.loads(data), ensure_ascii=False, indent=2).encode("utf-8")
+    assert load_cache(path).segment_enrichment["k1"].metadata == {"score": 1e-05, "size": 1e16}
+
+
+def test_load_cache_shares_repeated_chunk_strings(tmp_path: Path) -> None:
+    path = tmp_path / "chunk_cache.json"
+    cache = CacheV2()
+    for idx in range(2):
+        cache.segment_enrichment[f"k{idx}"] = Chunk(
+            id=f"c{idx}",
+            text="body",
+            tags=("api", "http"),
+            anchors={"path": "src/very/long/module/path.py"},
+        )
+    save_cache(path, cache)
+
+    first, second = load_cache(path).segment_enrichment.values()
+    assert first.tags is second.tags
+    assert first.anchors["path"] is second.anchors["path"]
@@ -0,0 +1,41 @@
+"""Unit tests for llm builder config loading and source discovery."""
+
+from __future__ import annotations
+
+from pathlib import Path
+import sys
+
+PLUGIN_SRC = Path("cpm_plugins/llm_builder").resolve()
+if str(PLUGIN_SRC) not in sys.path:
+    sys.path.insert(0, str(PLUGIN_SRC))
+
+from cpm_llm_builder_plugin.features import SUPPORTED_EXTS, LLMBuilderPluginConfig, _iter_source_files
+
+
+def test_plugin_config_from_path_reuses_parse_until_file_changes(tmp_path: Path) -> None:
+    path = tmp_path / "config.yml"
+    path.write_text("llm:\n  endpoint: http://a\n", encoding="utf-8")
+    first = LLMBuilderPluginConfig.from_path(path)
+    assert LLMBuilderPluginConfig.from_path(path) is first
+
+    path.write_text("llm:\n  endpoint: http://bb\n", encoding="utf-8")
+    assert LLMBuilderPluginConfig.from_path(path).llm_endpoint == "http://bb"
+
+
+def test_iter_source_files_matches_sorted_rglob(tmp_path: Path) -> None:
+    for rel in ("a.py", "a/b.md", "a/z/c.java", "a-b/d.py", "B.txt", "skip.bin", "a/e.PY"):
+        target = tmp_path / rel
+        target.parent.mkdir(parents=True, exist_ok=True)
+        target.write_text("x", encoding="utf-8")
+
+    (tmp_path / "a" / "__init__.py").touch()
+
+    expected = [
+        path
+        for path in sorted(tmp_path.rglob("*"))
+        if path.is_file() and path.suffix.lower() in SUPPORTED_EXTS and path.stat().st_size
+    ]
+    walked = list(_iter_source_files(tmp_path))
+    assert [item.path for item in walked] == expected
+    assert {item.ext for item in walked} == {".py", ".md", ".java", ".txt"}
+    assert tmp_path / "a" / "__init__.py" not in expected
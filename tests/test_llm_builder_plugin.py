@@ -3,15 +3,20 @@
 from __future__ import annotations
 
 import argparse
+import json
 import shutil
+from dataclasses import dataclass
 from pathlib import Path
+from types import ModuleType
 
 import numpy as np
 import pytest
+import requests
 
 from cpm_core.events import EventBus
 from cpm_core.paths import UserDirs
 from cpm_core.plugin import PluginManager
+from cpm_core.registry import CPMRegistryEntry
 from cpm_core.workspace import Workspace
 
 
@@ -42,10 +47,11 @@ class _FakeResponse:
     def __init__(self, payload: dict, status_code: int = 200) -> None:
         self._payload = payload
         self.status_code = status_code
+        self.text = json.dumps(payload)
 
     def raise_for_status(self) -> None:
         if self.status_code >= 400:
-            raise RuntimeError(f"http error: {self.status_code}")
+            raise requests.HTTPError(f"http error: {self.status_code}", response=self)
 
     def json(self) -> dict:
         return self._payload
@@ -73,43 +79,15 @@ class _FakeEmbedder:
         return matrix
 
 
-def test_llm_builder_plugin_registers_builder(tmp_path: Path) -> None:
-    workspace = _create_workspace(tmp_path)
-    (workspace.root / "plugins").mkdir()
-    _install_plugin(workspace)
-
-    manager = _build_manager(tmp_path, workspace)
-    manager.register("core")
-    manager.load_plugins()
-
-    entry = manager.registry.resolve("llm:cpm-llm-builder")
-    assert entry.group == "llm"
-    assert entry.origin == "llm_builder"
-
-
-def test_llm_builder_incremental_skips_enrichment(tmp_path: Path, monkeypatch: pytest.MonkeyPatch) -> None:
-    workspace = _create_workspace(tmp_path)
-    (workspace.root / "plugins").mkdir()
-    _install_plugin(workspace)
-
-    manager = _build_manager(tmp_path, workspace)
-    manager.register("core")
-    manager.load_plugins()
-    entry = manager.registry.resolve("llm:cpm-llm-builder")
-
-    import importlib
-
-    feature_module = importlib.import_module("cpm_llm_builder_plugin.features")
-    llm_module = importlib.import_module("cpm_llm_builder_plugin.llm_client")
-
-    calls: list[str] = []
-
+def _fake_llm_post(calls: list[str], sources: list[str] | None = None):
     def fake_post(url: str, *, json: dict, timeout: float) -> _FakeResponse:
         del url, timeout
         if "input" in json:
             source_path = json["input"][0]["content"][1]["json"]["source"]["path"]
             segments = json["input"][0]["content"][1]["json"]["segments"]
             calls.extend(str(item["id"]) for item in segments)
+            if sources is not None:
+                sources.append(source_path)
             chunks = [
                 {
                     "id": segment["id"],
@@ -134,6 +112,8 @@ def test_llm_builder_incremental_skips_enrichment(tmp_path: Path, monkeypatch: p
         source_path = user_payload["source"]["path"]
         segments = user_payload["segments"]
         calls.extend(str(item["id"]) for item in segments)
+        if sources is not None:
+            sources.append(source_path)
         chunks = [
             {
                 "id": segment["id"],
@@ -162,43 +142,221 @@ def test_llm_builder_incremental_skips_enrichment(tmp_path: Path, monkeypatch: p
             }
         )
 
-    monkeypatch.setattr(llm_module.requests, "post", fake_post)
-    monkeypatch.setattr(feature_module, "EmbeddingClient", lambda **kwargs: _FakeEmbedder())
+    return fake_post
+
+
+@dataclass
+class _BuilderHarness:
+    """The loaded llm builder with its LLM endpoint and embedder faked out."""
+
+    entry: CPMRegistryEntry
+    features: ModuleType
+    llm: ModuleType
+    # Segment ids sent to the fake LLM endpoint, and the source path of each request.
+    calls: list[str]
+    sources: list[str]
+
+    def run(self, args: argparse.Namespace) -> int:
+        return self.entry.target().run(args)
+
+
+@pytest.fixture
+def llm_builder(tmp_path: Path, monkeypatch: pytest.MonkeyPatch) -> _BuilderHarness:
+    workspace = _create_workspace(tmp_path)
+    (workspace.root / "plugins").mkdir()
+    _install_plugin(workspace)
+
+    manager = _build_manager(tmp_path, workspace)
+    manager.register("core")
+    manager.load_plugins()
+    entry = manager.registry.resolve("llm:cpm-llm-builder")
+
+    import importlib
+
+    harness = _BuilderHarness(
+        entry=entry,
+        features=importlib.import_module("cpm_llm_builder_plugin.features"),
+        llm=importlib.import_module("cpm_llm_builder_plugin.llm_client"),
+        calls=[],
+        sources=[],
+    )
+    monkeypatch.setattr(harness.llm.requests, "post", _fake_llm_post(harness.calls, harness.sources))
+    monkeypatch.setattr(harness.features, "EmbeddingClient", lambda **kwargs: _FakeEmbedder())
+    return harness
+
+
+def _args(source: Path, destination: Path, **overrides: object) -> argparse.Namespace:
+    values: dict[str, object] = {
+        "source": str(source),
+        "destination": str(destination),
+        "packet_version": "1.0.0",
+        "config": None,
+        "model_name": "test-model",
+        "max_seq_length": 256,
+        "embed_url": "http://embed.local",
+        "embeddings_mode": "http",
+        "timeout": 5.0,
+        "archive": False,
+        "archive_format": "tar.gz",
+    }
+    values.update(overrides)
+    return argparse.Namespace(**values)
+
+
+def _write_java_pair(source_dir: Path) -> None:
+    (source_dir / "pkg").mkdir(parents=True)
+    for name in ("Alpha", "Beta"):
+        (source_dir / "pkg" / f"{name}.java").write_text(
+            f"public class {name} {{\npublic int add(int a, int b) {{ return a + b; }}\n}}\n",
+            encoding="utf-8",
+        )
+
+
+def _read_rows(destination: Path) -> list[dict]:
+    return [json.loads(line) for line in (destination / "docs.jsonl").read_text(encoding="utf-8").splitlines()]
+
+
+def test_llm_builder_plugin_registers_builder(tmp_path: Path) -> None:
+    workspace = _create_workspace(tmp_path)
+    (workspace.root / "plugins").mkdir()
+    _install_plugin(workspace)
+
+    manager = _build_manager(tmp_path, workspace)
+    manager.register("core")
+    manager.load_plugins()
 
+    entry = manager.registry.resolve("llm:cpm-llm-builder")
+    assert entry.group == "llm"
+    assert entry.origin == "llm_builder"
+
+
+def test_llm_builder_incremental_skips_enrichment(
+    tmp_path: Path, monkeypatch: pytest.MonkeyPatch, llm_builder: _BuilderHarness
+) -> None:
     source_dir = tmp_path / "src"
     source_dir.mkdir()
     (source_dir / "Sample.java").write_text(
         "public class Sample {\npublic int add(int a, int b) { return a + b; }\n}\n",
         encoding="utf-8",
     )
+    args = _args(source_dir, tmp_path / "packet", packet_version="1.2.3")
+
+    assert llm_builder.run(args) == 0
+    first_call_count = len(llm_builder.calls)
+    assert first_call_count > 0
+
+    def fail_classify(*_args: object, **_kwargs: object) -> None:
+        raise AssertionError("unchanged files must not be re-classified")
+
+    monkeypatch.setattr(llm_builder.features, "classify_file", fail_classify)
+    assert llm_builder.run(args) == 0
+    assert len(llm_builder.calls) == first_call_count
+
+
+def test_llm_builder_cross_file_batching(tmp_path: Path, llm_builder: _BuilderHarness) -> None:
+    source_dir = tmp_path / "src"
+    _write_java_pair(source_dir)
     destination = tmp_path / "packet"
 
-    command = entry.target()
-    args = argparse.Namespace(
-        source=str(source_dir),
-        destination=str(destination),
-        packet_version="1.2.3",
-        config=None,
-        llm_endpoint=None,
-        request_timeout=None,
-        llm_model=None,
-        prompt_version=None,
-        max_retries=None,
-        max_chunk_tokens=None,
-        min_chunk_tokens=None,
-        max_segments_per_request=None,
-        model_name="test-model",
-        max_seq_length=256,
-        embed_url="http://embed.local",
-        embeddings_mode="http",
-        timeout=5.0,
-        archive=False,
-        archive_format="tar.gz",
+    assert llm_builder.run(_args(source_dir, destination, cross_file_batching=True)) == 0
+    assert llm_builder.sources == ["pkg"]
+    assert {row["metadata"]["path"] for row in _read_rows(destination)} == {"pkg/Alpha.java", "pkg/Beta.java"}
+
+
+def test_llm_builder_matches_batch_results_by_id(
+    tmp_path: Path, monkeypatch: pytest.MonkeyPatch, llm_builder: _BuilderHarness
+) -> None:
+    import json as _json
+
+    inner_post = llm_builder.llm.requests.post
+    dropped: list[str] = []
+
+    def shuffled_post(url: str, *, json: dict, timeout: float) -> _FakeResponse:
+        response = inner_post(url, json=json, timeout=timeout)
+        if "messages" not in json:
+            return response
+        content = response.json()["choices"][0]["message"]["content"]
+        chunks = list(reversed(_json.loads(content)["chunks"]))
+        dropped.append(chunks.pop(0)["id"])
+        return _FakeResponse({"choices": [{"message": {"content": _json.dumps({"chunks": chunks})}}]})
+
+    monkeypatch.setattr(llm_builder.llm.requests, "post", shuffled_post)
+    source_dir = tmp_path / "src"
+    _write_java_pair(source_dir)
+    destination = tmp_path / "packet"
+
+    assert llm_builder.run(_args(source_dir, destination, min_chunk_tokens=1, cross_file_batching=True)) == 0
+    assert len(dropped) == 1
+    rows = _read_rows(destination)
+    assert {row["metadata"]["path"] for row in rows} == {"pkg/Alpha.java", "pkg/Beta.java"}
+    for row in rows:
+        assert row["id"].startswith(row["metadata"]["path"] + ":")
+        assert bool(row["metadata"].get("fallback")) == (row["id"] == dropped[0])
+
+
+def test_llm_builder_bisects_failed_batches(
+    tmp_path: Path, monkeypatch: pytest.MonkeyPatch, llm_builder: _BuilderHarness
+) -> None:
+    fake_post = llm_builder.llm.requests.post
+
+    def poisoned_post(url: str, *, json: dict, timeout: float) -> _FakeResponse:
+        if "POISON" in str(json):
+            return _FakeResponse({"choices": []})
+        return fake_post(url, json=json, timeout=timeout)
+
+    monkeypatch.setattr(llm_builder.llm.requests, "post", poisoned_post)
+    source_dir = tmp_path / "src"
+    source_dir.mkdir()
+    (source_dir / "doc.md").write_text(
+        "# A\n\nalpha text here\n\n# B\n\nPOISON text\n\n# C\n\ngamma\n",
+        encoding="utf-8",
     )
+    destination = tmp_path / "packet"
+
+    assert llm_builder.run(_args(source_dir, destination, max_retries=0, min_chunk_tokens=1)) == 0
+    fallback = {row["text"]: bool(row["metadata"].get("fallback")) for row in _read_rows(destination)}
+    assert fallback == {"# A\n\nalpha text here": False, "# B\n\nPOISON text": True, "# C\n\ngamma": False}
+
+
+def test_llm_builder_http_errors_skip_bisection(
+    tmp_path: Path, monkeypatch: pytest.MonkeyPatch, llm_builder: _BuilderHarness
+) -> None:
+    posts: list[str] = []
+
+    def unauthorized_post(url: str, *, json: dict, timeout: float) -> _FakeResponse:
+        del url, timeout
+        posts.append("messages" if "messages" in json else "input")
+        return _FakeResponse({"error": "unauthorized"}, status_code=401)
+
+    monkeypatch.setattr(llm_builder.llm.requests, "post", unauthorized_post)
+    monkeypatch.setattr(llm_builder.llm.time, "sleep", lambda seconds: None)
+    source_dir = tmp_path / "src"
+    source_dir.mkdir()
+    (source_dir / "doc.md").write_text(
+        "# A\n\nalpha\n\n# B\n\nbeta\n\n# C\n\ngamma\n\n# D\n\ndelta\n",
+        encoding="utf-8",
+    )
+    destination = tmp_path / "packet"
+
+    assert llm_builder.run(_args(source_dir, destination, min_chunk_tokens=1)) == 0
+    # One enrich call for the single batch (config.yml: max_retries=1, two request styles), no halves.
+    assert posts == ["messages", "messages", "input", "input"]
+    rows = _read_rows(destination)
+    assert len(rows) == 4
+    assert all(row["metadata"].get("fallback") for row in rows)
+
+
+def test_llm_builder_shared_cache_across_destinations(tmp_path: Path, llm_builder: _BuilderHarness) -> None:
+    source_dir = tmp_path / "src"
+    source_dir.mkdir()
+    (source_dir / "doc.md").write_text("# A\n\nalpha text here\n\n# B\n\nbeta\n", encoding="utf-8")
+    shared = str(tmp_path / "shared")
 
-    assert command.run(args) == 0
-    first_call_count = len(calls)
+    assert llm_builder.run(_args(source_dir, tmp_path / "first", shared_cache_dir=shared)) == 0
+    first_call_count = len(llm_builder.calls)
     assert first_call_count > 0
+    assert list((tmp_path / "shared").rglob("*.json"))
 
-    assert command.run(args) == 0
-    assert len(calls) == first_call_count
+    assert llm_builder.run(_args(source_dir, tmp_path / "second", shared_cache_dir=shared)) == 0
+    assert len(llm_builder.calls) == first_call_count
+    assert (tmp_path / "second" / "chunk_cache.json").exists()
@@ -0,0 +1,24 @@
+"""Unit tests for llm builder chunk post-processing."""
+
+from __future__ import annotations
+
+from pathlib import Path
+import sys
+
+PLUGIN_SRC = Path("cpm_plugins/llm_builder").resolve()
+if str(PLUGIN_SRC) not in sys.path:
+    sys.path.insert(0, str(PLUGIN_SRC))
+
+from cpm_llm_builder_plugin.postprocess import apply_chunk_constraints
+from cpm_llm_builder_plugin.schemas import Chunk, ChunkConstraints
+
+
+def test_apply_chunk_constraints_splits_long_chunks_on_line_boundaries() -> None:
+    lines = [f"line {idx:03d} " + "x" * 30 for idx in range(100)]
+    chunk = Chunk(id="c", text="\n".join(lines))
+    parts = apply_chunk_constraints([chunk], ChunkConstraints(max_chunk_tokens=100, min_chunk_tokens=1))
+
+    assert len(parts) > 1
+    assert all(len(part.text) // 4 <= 100 for part in parts)
+    assert "\n".join(part.text for part in parts).splitlines() == lines
+    assert [part.id for part in parts] == [f"c:part:{idx}" for idx in range(len(parts))]
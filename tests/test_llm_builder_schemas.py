@@ -10,7 +10,13 @@ if str(PLUGIN_SRC) not in sys.path:
     sys.path.insert(0, str(PLUGIN_SRC))
 
 from cpm_llm_builder_plugin.classifiers import classify_file
-from cpm_llm_builder_plugin.schemas import normalize_chunk_list
+from cpm_llm_builder_plugin.schemas import (
+    ChunkConstraints,
+    Segment,
+    SegmentKeyContext,
+    normalize_chunk_list,
+    stable_hash,
+)
 
 
 def test_normalize_chunk_list_legacy_and_openai_like() -> None:
@@ -56,3 +62,23 @@ def test_chunk_from_dict_tolerates_non_mapping_fields() -> None:
     assert "items" in chunks[0].anchors or "path" in chunks[0].anchors
     assert "raw" in chunks[0].relations or chunks[0].relations == {}
     assert chunks[0].metadata.get("k") == "v"
+
+
+def test_segment_key_context_matches_full_payload_hash() -> None:
+    import json
+
+    segment = Segment(id="a.py:fn:1", kind="function", text="def f():\n    return 'é'\n", start_line=1, end_line=2)
+    constraints = ChunkConstraints(max_chunk_tokens=500)
+    expected = stable_hash(
+        json.dumps(
+            {
+                "segment": segment.to_dict(),
+                "model": "m",
+                "prompt_version": "p",
+                "constraints": constraints.to_dict(),
+            },
+            ensure_ascii=False,
+            sort_keys=True,
+        )
+    )
+    assert SegmentKeyContext(model="m", prompt_version="p", constraints=constraints).key(segment) == expected
@@ -0,0 +1,177 @@
+"""Unit tests for the MCP plugin packet reader."""
+
+from __future__ import annotations
+
+from pathlib import Path
+import sys
+
+import pytest
+
+PLUGIN_SRC = Path("cpm_plugins/mcp").resolve()
+if str(PLUGIN_SRC) not in sys.path:
+    sys.path.insert(0, str(PLUGIN_SRC))
+
+from cpm_mcp_plugin.reader import PacketReader, split_version_parts, version_key
+
+
+def _write_version(root: Path, name: str, version: str) -> Path:
+    version_dir = root / name / version
+    version_dir.mkdir(parents=True)
+    (version_dir / "cpm.yml").write_text(f"name: {name}\nversion: {version}\n", encoding="utf-8")
+    (version_dir / "manifest.json").write_text("{}", encoding="utf-8")
+    return version_dir
+
+
+def test_installed_versions_skips_history_and_version_internals(tmp_path: Path) -> None:
+    root = tmp_path / "packages"
+    first = _write_version(root, "demo", "1.0.0")
+    _write_version(root, "demo", "1.10.0")
+    _write_version(root, "demo", "1.2.0")
+    # Leftovers inside a version dir or under .history are not installed versions.
+    nested = first / "docs" / "stale"
+    nested.mkdir(parents=True)
+    (nested / "cpm.yml").write_text("version: 9.9.9\n", encoding="utf-8")
+    (nested / "manifest.json").write_text("{}", encoding="utf-8")
+    _write_version(root / "demo", ".history", "0.1.0")
+    # A cpm.yml without manifest or index is only a pin file.
+    stray = root / "demo" / "notes"
+    stray.mkdir()
+    (stray / "cpm.yml").write_text("version: 5.0.0\n", encoding="utf-8")
+
+    reader = PacketReader(root)
+
+    assert reader._installed_versions("demo") == ["1.0.0", "1.2.0", "1.10.0"]
+    assert reader._installed_versions("missing") == []
+
+
+def test_iter_packet_dirs_stops_at_packet_roots(tmp_path: Path) -> None:
+    root = tmp_path / "packages"
+    first = _write_version(root, "demo", "1.0.0")
+    second = _write_version(root, "demo", "2.0.0")
+    (first / "faiss").mkdir()
+    (first / "faiss" / "index.faiss").write_bytes(b"")
+    _write_version(first, "docs", "inner")
+    _write_version(root / "demo", ".history", "0.1.0")
+
+    reader = PacketReader(root)
+
+    assert reader._iter_packet_dirs() == [first, second]
+
+
+def test_extract_packet_info_reports_present_files(tmp_path: Path) -> None:
+    root = tmp_path / "packages"
+    version_dir = _write_version(root, "demo", "1.0.0")
+    (version_dir / "faiss").mkdir()
+    (version_dir / "faiss" / "index.faiss").write_bytes(b"")
+    bare = root / "bare"
+    bare.mkdir()
+
+    reader = PacketReader(root)
+    info = reader._extract_packet_info(version_dir)
+    empty = reader._extract_packet_info(bare)
+
+    assert (info["name"], info["version"]) == ("demo", "1.0.0")
+    assert info["has_faiss"] and info["has_manifest"] and info["has_cpm_yml"]
+    assert not info["has_docs"]
+    assert (empty["name"], empty["version"]) == ("bare", "unknown")
+    assert not (empty["has_faiss"] or empty["has_docs"] or empty["has_manifest"] or empty["has_cpm_yml"])
+
+
+def test_split_version_parts_sanitizes_segments() -> None:
+    assert split_version_parts("1.2.0-rc1+build@x") == ["1", "2", "0-rc1+build@x"]
+    assert split_version_parts(" 2.a b/c ") == ["2", "a-b-c"]
+
+
+def test_version_key_orders_numeric_and_stage_segments() -> None:
+    versions = ["1.10.0", "1.2.0", "1.2.0-rc2", "1.2.0-rc10", "1.2.0-beta1", "1.2.0-SNAPSHOT"]
+    ordered = sorted(versions, key=version_key)
+    assert ordered == ["1.2.0-SNAPSHOT", "1.2.0-beta1", "1.2.0-rc2", "1.2.0-rc10", "1.2.0", "1.10.0"]
+
+
+def test_reader_caches_are_per_instance_and_clearable(tmp_path: Path) -> None:
+    root = tmp_path / "packages"
+    _write_version(root, "demo", "1.0.0")
+    reader = PacketReader(root)
+    assert reader._installed_versions("demo") == ["1.0.0"]
+
+    _write_version(root, "demo", "2.0.0")
+    assert reader._installed_versions("demo") == ["1.0.0"]
+    assert PacketReader(root)._installed_versions("demo") == ["1.0.0", "2.0.0"]
+
+    reader.clear_cache()
+    assert reader._installed_versions("demo") == ["1.0.0", "2.0.0"]
+
+
+def test_qualifier_stage_and_num_single_pass_keeps_key_shape() -> None:
+    from cpm_mcp_plugin.reader import _qualifier_stage_and_num
+
+    assert _qualifier_stage_and_num([]) == (1000, 0, ())
+    assert _qualifier_stage_and_num(["rc1"]) == (40, 1, ((0, 1),))
+    assert _qualifier_stage_and_num(["rc", "beta", "2"]) == (20, 2, ((0, 2),))
+    assert _qualifier_stage_and_num(["x1", "rc", "y", "3"]) == (40, 3, ((1, "x"), (0, 1), (1, "y")))
+    assert _qualifier_stage_and_num(["build7"]) == (50, 0, ((1, "build"), (0, 7)))
+
+
+def test_resolve_packet_dir_prefers_existing_pin(tmp_path: Path) -> None:
+    root = tmp_path / "packages"
+    _write_version(root, "demo", "1.0.0")
+    newest = _write_version(root, "demo", "2.0.0")
+    reader = PacketReader(root)
+    assert reader.resolve_packet_dir("demo") == newest
+
+    (root / "demo" / "cpm.yml").write_text("version: 1.0.0\n", encoding="utf-8")
+    assert PacketReader(root).resolve_packet_dir("demo") == root / "demo" / "1.0.0"
+    (root / "demo" / "cpm.yml").write_text("version: 9.9.9\n", encoding="utf-8")
+    assert PacketReader(root).resolve_packet_dir("demo") == newest
+    assert reader.resolve_packet_dir("missing") is None
+
+
+def test_list_packets_keeps_order_with_parallel_reads(tmp_path: Path) -> None:
+    root = tmp_path / "packages"
+    names = [f"pkg{index:02d}" for index in range(12)]
+    for name in names:
+        _write_version(root, name, "1.0.0")
+
+    packets = PacketReader(root).list_packets()
+
+    assert [packet["name"] for packet in packets] == names
+
+
+def test_iter_packet_dirs_takes_flat_packets_as_is(tmp_path: Path) -> None:
+    root = tmp_path / "packages"
+    flat = root / "flat"
+    (flat / "faiss").mkdir(parents=True)
+    (flat / "faiss" / "index.faiss").write_bytes(b"")
+    _write_version(flat, "nested", "1.0.0")
+    (root / "README.md").parent.mkdir(parents=True, exist_ok=True)
+    (root / "README.md").write_text("not a packet", encoding="utf-8")
+
+    assert PacketReader(root)._iter_packet_dirs() == [flat]
+
+
+def test_read_simple_yml_parses_flat_keys_and_latin1(tmp_path: Path) -> None:
+    from cpm_mcp_plugin.reader import _read_simple_yml
+
+    path = tmp_path / "cpm.yml"
+    path.write_bytes(
+        b"# comment\r\nname: demo\r\n\r\n  version : '1.0.0'  \r\nnot a pair\r\ndescription: caf\xe9: ok\r\n"
+    )
+    assert _read_simple_yml(path) == {"name": "demo", "version": "1.0.0", "description": "café: ok"}
+    assert _read_simple_yml(tmp_path / "missing.yml") == {}
+
+
+def test_missing_workspace_lists_nothing(tmp_path: Path) -> None:
+    reader = PacketReader(tmp_path / "absent")
+    assert reader.list_packets() == []
+    assert reader.list_packets(include_all_versions=True) == []
+
+
+def test_iter_packet_dirs_dedups_linked_names(tmp_path: Path) -> None:
+    root = tmp_path / "packages"
+    real = _write_version(root, "demo", "1.0.0")
+    try:
+        (root / "alias").symlink_to(root / "demo", target_is_directory=True)
+    except OSError:
+        pytest.skip("symlinks not supported here")
+
+    assert PacketReader(root)._iter_packet_dirs() == [real.parent.parent / "alias" / "1.0.0"]
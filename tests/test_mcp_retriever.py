@@ -0,0 +1,159 @@
+"""Unit tests for the MCP plugin packet retriever."""
+
+from __future__ import annotations
+
+import json
+import os
+from pathlib import Path
+import socket
+import sys
+
+import faiss
+import numpy as np
+import pytest
+
+PLUGIN_SRC = Path("cpm_plugins/mcp").resolve()
+if str(PLUGIN_SRC) not in sys.path:
+    sys.path.insert(0, str(PLUGIN_SRC))
+
+from cpm_mcp_plugin.retriever import DOCS_INDEX_NAME, EmbedServerError, PacketRetriever
+
+
+class _FakeEmbedder:
+    def __init__(self, vector: np.ndarray) -> None:
+        self.vector = vector
+
+    def embed_texts(self, texts, **kwargs) -> np.ndarray:  # noqa: ANN001, ANN003
+        return self.vector
+
+
+def _write_packet(root: Path) -> Path:
+    packet_dir = root / "demo" / "1.0.0"
+    (packet_dir / "faiss").mkdir(parents=True)
+    (packet_dir / "cpm.yml").write_text("name: demo\nversion: 1.0.0\n", encoding="utf-8")
+    (packet_dir / "manifest.json").write_text(json.dumps({"embedding": {"model": "fake"}}), encoding="utf-8")
+    docs = [{"id": f"doc-{i}", "text": f"text {i}", "metadata": {"n": i}} for i in range(3)]
+    lines = [json.dumps(doc) for doc in docs]
+    # A blank line does not take a document slot.
+    (packet_dir / "docs.jsonl").write_text(lines[0] + "\n\n" + "\n".join(lines[1:]) + "\n", encoding="utf-8")
+    # Built packets are older than the racy-mtime window, so the offsets sidecar is kept.
+    os.utime(packet_dir / "docs.jsonl", ns=(1_000_000_000, 1_000_000_000))
+    index = faiss.IndexFlatIP(2)
+    index.add(np.array([[1, 0], [0, 1], [0.7, 0.7]], dtype="float32"))
+    faiss.write_index(index, str(packet_dir / "faiss" / "index.faiss"))
+    return packet_dir
+
+
+def test_retrieve_reads_only_hit_documents_through_offsets(tmp_path: Path, monkeypatch) -> None:
+    packet_dir = _write_packet(tmp_path)
+    retriever = PacketRetriever(tmp_path, "demo")
+    assert (packet_dir / DOCS_INDEX_NAME).exists()
+    monkeypatch.setattr(
+        retriever, "_new_embedder", lambda: _FakeEmbedder(np.array([[0.0, 1.0]], dtype="float32"))
+    )
+
+    result = retriever.retrieve("query", 2)
+
+    assert [hit["id"] for hit in result["results"]] == ["doc-1", "doc-2"]
+    assert result["results"][0]["metadata"] == {"n": 1}
+
+
+def test_doc_offsets_sidecar_is_reused_and_refreshed(tmp_path: Path) -> None:
+    packet_dir = _write_packet(tmp_path)
+    first = PacketRetriever(tmp_path, "demo")
+    sidecar = packet_dir / DOCS_INDEX_NAME
+    built = sidecar.stat().st_mtime_ns
+
+    second = PacketRetriever(tmp_path, "demo")
+    assert sidecar.stat().st_mtime_ns == built
+    assert second._doc_offsets.tolist() == first._doc_offsets.tolist()
+
+    with (packet_dir / "docs.jsonl").open("a", encoding="utf-8") as stream:
+        stream.write(json.dumps({"id": "doc-3", "text": "text 3"}) + "\n")
+    third = PacketRetriever(tmp_path, "demo")
+    assert len(third._doc_offsets) == 4
+    assert third._read_docs([3])[3]["id"] == "doc-3"
+    # docs.jsonl was just written: rescanned, but the sidecar is left alone.
+    assert sidecar.stat().st_mtime_ns == built
+
+    os.utime(packet_dir / "docs.jsonl", ns=(2_000_000_000, 2_000_000_000))
+    fourth = PacketRetriever(tmp_path, "demo")
+    assert len(fourth._doc_offsets) == 4
+    assert np.load(sidecar)[2:].tolist() == fourth._doc_offsets.tolist()
+
+
+def test_retrieve_maps_unreachable_embed_server(tmp_path: Path) -> None:
+    _write_packet(tmp_path)
+    with socket.socket() as probe:
+        probe.bind(("127.0.0.1", 0))
+        port = probe.getsockname()[1]
+    retriever = PacketRetriever(tmp_path, "demo", embed_url=f"http://127.0.0.1:{port}")
+
+    with pytest.raises(EmbedServerError):
+        retriever.retrieve("query", 1)
+
+
+def test_retrieve_batch_answers_each_query_from_one_search(tmp_path: Path, monkeypatch) -> None:
+    _write_packet(tmp_path)
+    retriever = PacketRetriever(tmp_path, "demo")
+    embedded: list[list[str]] = []
+
+    class _RecordingEmbedder(_FakeEmbedder):
+        def embed_texts(self, texts, **kwargs) -> np.ndarray:  # noqa: ANN001, ANN003
+            embedded.append(list(texts))
+            return self.vector
+
+    vectors = np.array([[1.0, 0.0], [0.0, 1.0]], dtype="float32")
+    monkeypatch.setattr(retriever, "_new_embedder", lambda: _RecordingEmbedder(vectors))
+
+    results = retriever.retrieve_batch(["first", "second"], 1)
+
+    assert embedded == [["first", "second"]]
+    assert [(result["query"], result["results"][0]["id"]) for result in results] == [
+        ("first", "doc-0"),
+        ("second", "doc-1"),
+    ]
+    assert retriever.retrieve_batch([], 1) == []
+
+
+def test_ivf_packets_are_searched_with_default_nprobe(tmp_path: Path) -> None:
+    from cpm_core.packet.faiss_db import DEFAULT_NPROBE, build_faiss_index
+
+    packet_dir = _write_packet(tmp_path)
+    manifest = {"embedding": {"model": "fake"}, "similarity": {"index_type": "faiss:IVF2,Flat"}}
+    (packet_dir / "manifest.json").write_text(json.dumps(manifest), encoding="utf-8")
+    vectors = np.random.default_rng(0).standard_normal((96, 2)).astype("float32")
+    faiss.write_index(build_faiss_index(vectors, "IVF2,Flat"), str(packet_dir / "faiss" / "index.faiss"))
+
+    retriever = PacketRetriever(tmp_path, "demo")
+
+    assert faiss.extract_index_ivf(retriever.index).nprobe == DEFAULT_NPROBE
+
+
+def test_mmap_index_is_opt_in(tmp_path: Path, monkeypatch) -> None:
+    _write_packet(tmp_path)
+    assert PacketRetriever(tmp_path, "demo").mmap_index is False
+
+    monkeypatch.setenv("RAG_FAISS_MMAP", "1")
+    retriever = PacketRetriever(tmp_path, "demo")
+    assert retriever.mmap_index is True
+    monkeypatch.setattr(
+        retriever, "_new_embedder", lambda: _FakeEmbedder(np.array([[1.0, 0.0]], dtype="float32"))
+    )
+    assert retriever.retrieve("query", 1)["results"][0]["id"] == "doc-0"
+
+
+def test_server_reuses_retriever_until_packet_changes(tmp_path: Path) -> None:
+    from cpm_mcp_plugin import server
+
+    packet_dir = _write_packet(tmp_path)
+    first = server._get_retriever(tmp_path, "demo", None, None)
+    assert server._get_retriever(tmp_path, "demo", None, None) is first
+    assert server._get_retriever(tmp_path, "demo", "http://other", None) is not first
+
+    with (packet_dir / "docs.jsonl").open("a", encoding="utf-8") as stream:
+        stream.write(json.dumps({"id": "doc-3", "text": "text 3"}) + "\n")
+    assert server._get_retriever(tmp_path, "demo", None, None) is not first
+
+    with pytest.raises(FileNotFoundError):
+        server._get_retriever(tmp_path, "missing", None, None)
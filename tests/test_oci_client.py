@@ -7,7 +7,7 @@ import pytest
 
 from cpm_core.oci import OciClient, OciClientConfig, build_artifact_spec
 from cpm_core.oci.errors import OciCommandError, OciSecurityError
-from cpm_core.oci.security import redact_command_for_log
+from cpm_core.oci.security import assert_allowlisted, redact_command_for_log
 
 
 def _completed(stdout: str = "", stderr: str = "", returncode: int = 0) -> subprocess.CompletedProcess[str]:
@@ -72,12 +72,46 @@ def test_pull_enforces_size_limit(monkeypatch: pytest.MonkeyPatch, tmp_path: Pat
         client.pull("registry.local/team/pkg:1.0.0", out)
 
 
+def test_pull_many_preserves_input_order(monkeypatch: pytest.MonkeyPatch, tmp_path: Path) -> None:
+    def _fake_run(command, **kwargs):
+        del kwargs
+        output_dir = Path(command[command.index("-o") + 1])
+        (output_dir / "payload.bin").write_bytes(b"x")
+        tag = command[2].rsplit(":", 1)[1]
+        return _completed(stdout=f"sha256:{tag * 64}")
+
+    monkeypatch.setattr(subprocess, "run", _fake_run)
+    client = OciClient(OciClientConfig(allowlist_domains=("registry.local",)))
+    targets = [(f"registry.local/team/pkg:{tag}", tmp_path / tag) for tag in ("a", "b", "c")]
+    results = client.pull_many(targets, max_workers=3)
+
+    assert [result.ref for result in results] == [ref for ref, _ in targets]
+    assert [result.digest for result in results] == [f"sha256:{tag * 64}" for tag in ("a", "b", "c")]
+
+
+def test_pull_many_checks_allowlist_before_pulling(monkeypatch: pytest.MonkeyPatch, tmp_path: Path) -> None:
+    calls: list[list[str]] = []
+    monkeypatch.setattr(subprocess, "run", lambda command, **kwargs: calls.append(command) or _completed())
+    client = OciClient(OciClientConfig(allowlist_domains=("registry.local",)))
+    with pytest.raises(OciSecurityError):
+        client.pull_many([("registry.local/a:1", tmp_path / "a"), ("blocked.local/b:1", tmp_path / "b")])
+    assert calls == []
+
+
 def test_allowlist_is_enforced() -> None:
     client = OciClient(OciClientConfig(allowlist_domains=("allowed.local",)))
     with pytest.raises(OciSecurityError):
         client.resolve("blocked.local/team/repo:1.0.0")
 
 
+def test_allowlist_matches_subdomains_only_on_label_boundary() -> None:
+    assert_allowlisted("mirror.Registry.Local/team/repo:1.0.0", (" registry.local ",))
+    with pytest.raises(OciSecurityError):
+        assert_allowlisted("evilregistry.local/team/repo:1.0.0", ("registry.local",))
+    with pytest.raises(OciSecurityError):
+        assert_allowlisted("registry.local/team/repo:1.0.0", ("  ",))
+
+
 def test_missing_oras_returns_explicit_error(monkeypatch: pytest.MonkeyPatch) -> None:
     def _fake_run(*args, **kwargs):
         del args, kwargs
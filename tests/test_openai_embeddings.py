@@ -8,9 +8,11 @@ from socketserver import ThreadingMixIn
 from typing import Any
 
 import pytest
+import requests
 
 from cpm_builtin.embeddings.openai import (
     OpenAIEmbeddingsHttpClient,
+    get_session,
     normalize_embeddings,
     parse_openai_response,
     serialize_openai_request,
@@ -236,3 +238,18 @@ def test_openai_client_embed_texts_accepts_string_input() -> None:
         }
     finally:
         _stop_server(server)
+
+
+def test_openai_http_clients_share_one_session_per_thread_by_default() -> None:
+    first = OpenAIEmbeddingsHttpClient("http://127.0.0.1:1/v1/embeddings")
+    second = OpenAIEmbeddingsHttpClient("http://127.0.0.1:2/v1/embeddings")
+    assert first.session is second.session is get_session()
+
+    seen: list[requests.Session] = []
+    worker = threading.Thread(target=lambda: seen.append(first.session))
+    worker.start()
+    worker.join()
+    assert seen and seen[0] is not first.session
+
+    custom = requests.Session()
+    assert OpenAIEmbeddingsHttpClient("http://127.0.0.1:1", session=custom).session is custom
@@ -10,11 +10,14 @@ from cpm_core.packet import (
     EmbeddingSpec,
     PacketManifest,
     FaissFlatIP,
+    artifact_hashes,
+    build_faiss_index,
     load_faiss_index,
     load_manifest,
     compute_checksums,
     read_docs_jsonl,
     read_vectors_f16,
+    set_nprobe,
     write_docs_jsonl,
     write_manifest,
     write_vectors_f16,
@@ -72,12 +75,48 @@ def test_vectors_roundtrip(tmp_path: Path) -> None:
     np.testing.assert_allclose(loaded, vectors, rtol=1e-3, atol=1e-3)
 
 
+def test_vectors_read_without_upcast_keeps_fp16(tmp_path: Path) -> None:
+    vectors = np.arange(8, dtype=np.float32).reshape(2, 4)
+    vec_path = tmp_path / "vectors.f16.bin"
+    write_vectors_f16(vectors, vec_path)
+    loaded = read_vectors_f16(vec_path, dim=4, upcast=False)
+    assert loaded.dtype == np.float16
+    assert loaded.shape == (2, 4)
+    np.testing.assert_allclose(loaded.astype(np.float32), vectors)
+
+
 def test_manifest_roundtrip(tmp_path: Path) -> None:
     manifest = _make_manifest()
     manifest_path = tmp_path / "manifest.json"
     write_manifest(manifest, manifest_path)
     reloaded = load_manifest(manifest_path)
     assert reloaded == manifest
+    # Same bytes whichever JSON backend wrote them: the lockfile hashes this file.
+    expected = json.dumps(manifest.to_dict(), ensure_ascii=False, indent=2).encode("utf-8")
+    assert manifest_path.read_bytes() == expected
+
+
+def test_docs_jsonl_float_metadata_matches_stdlib_json(tmp_path: Path) -> None:
+    chunk = DocChunk(id="a", text="alpha", metadata={"score": 1e-05, "size": 1e16, "ratio": 0.5})
+    docs_path = tmp_path / "docs.jsonl"
+    write_docs_jsonl([chunk], docs_path)
+    entry = {
+        "id": "a",
+        "text": "alpha",
+        "hash": hashlib.sha256(b"alpha").hexdigest(),
+        "metadata": chunk.metadata,
+    }
+    expected = json.dumps(entry, ensure_ascii=False, separators=(",", ":")) + "\n"
+    assert docs_path.read_bytes() == expected.encode("utf-8")
+
+
+def test_manifest_with_floats_matches_stdlib_json(tmp_path: Path) -> None:
+    manifest = _make_manifest()
+    manifest.similarity = {**manifest.similarity, "min_score": 1e-05, "scale": 1e16}
+    manifest_path = tmp_path / "manifest.json"
+    write_manifest(manifest, manifest_path)
+    expected = json.dumps(manifest.to_dict(), ensure_ascii=False, indent=2).encode("utf-8")
+    assert manifest_path.read_bytes() == expected
 
 
 def test_compute_checksums(tmp_path: Path) -> None:
@@ -102,3 +141,170 @@ def test_faiss_index_roundtrip(tmp_path: Path) -> None:
     loaded = load_faiss_index(index_path)
     scores, ids = loaded.search(vectors[:1], 1)
     assert ids[0][0] == 0
+
+
+def test_faiss_search_batch_matches_single_search() -> None:
+    pytest.importorskip("faiss")
+    vectors = np.eye(4, dtype=np.float32)
+    db = FaissFlatIP(dim=4)
+    db.add(vectors)
+    scores, ids = db.search_batch(vectors[[2, 0]], 1)
+    assert ids.shape == (2, 1)
+    assert ids[:, 0].tolist() == [2, 0]
+    single_scores, single_ids = db.search(vectors[2], 1)
+    assert single_ids.tolist() == [2]
+    np.testing.assert_allclose(single_scores, scores[0])
+
+
+def test_build_faiss_index_ivf_recipe_with_nprobe() -> None:
+    pytest.importorskip("faiss")
+    rng = np.random.default_rng(7)
+    vectors = rng.standard_normal((256, 8)).astype(np.float32)
+    vectors /= np.linalg.norm(vectors, axis=1, keepdims=True)
+    index = build_faiss_index(vectors, "IVF4,Flat", train_size=128)
+    assert index.ntotal == 256
+    assert set_nprobe(index, 4)
+    _, ids = index.search(vectors[:3], 1)
+    assert ids[:, 0].tolist() == [0, 1, 2]
+    assert not set_nprobe(build_faiss_index(vectors[:4]), 4)
+
+
+def test_faiss_flat_search_accepts_nprobe() -> None:
+    pytest.importorskip("faiss")
+    vectors = np.eye(4, dtype=np.float32)
+    db = FaissFlatIP(dim=4)
+    db.add(vectors)
+    _, ids = db.search_batch(vectors[[1, 2]], 1, nprobe=8)
+    assert ids[:, 0].tolist() == [1, 2]
+    _, single = db.search(vectors[3], 1, nprobe=8)
+    assert single.tolist() == [3]
+
+
+def test_build_faiss_index_falls_back_to_flat_for_tiny_corpus() -> None:
+    pytest.importorskip("faiss")
+    vectors = np.eye(4, dtype=np.float32)
+    index = build_faiss_index(vectors, "IVF16,Flat")
+    assert index.ntotal == 4
+    assert not set_nprobe(index, 4)
+    _, ids = index.search(vectors[[3, 1]], 1)
+    assert ids[:, 0].tolist() == [3, 1]
+
+
+def test_build_faiss_index_accepts_fp16_vectors(tmp_path: Path) -> None:
+    pytest.importorskip("faiss")
+    rng = np.random.default_rng(3)
+    vectors = rng.standard_normal((96, 8)).astype(np.float32)
+    vectors /= np.linalg.norm(vectors, axis=1, keepdims=True)
+    path = tmp_path / "vectors.f16.bin"
+    write_vectors_f16(vectors, path)
+    index = build_faiss_index(read_vectors_f16(path, 8, upcast=False), "IVF2,Flat")
+    assert index.ntotal == 96
+    set_nprobe(index, 2)
+    _, ids = index.search(vectors[:2], 1)
+    assert ids[:, 0].tolist() == [0, 1]
+
+
+def test_artifact_hashes_track_file_changes(tmp_path: Path) -> None:
+    docs_path = tmp_path / "docs.jsonl"
+    docs_path.write_text("first", encoding="utf-8")
+    first = artifact_hashes(tmp_path)["chunks_manifest_hash"]
+    assert artifact_hashes(tmp_path)["chunks_manifest_hash"] == first
+    docs_path.write_text("second version", encoding="utf-8")
+    second = artifact_hashes(tmp_path)["chunks_manifest_hash"]
+    assert second == hashlib.sha256(b"second version").hexdigest()
+    assert second != first
+
+
+def test_faiss_add_converts_fp16_in_blocks(monkeypatch: pytest.MonkeyPatch) -> None:
+    pytest.importorskip("faiss")
+    from cpm_core.packet import faiss_db
+
+    monkeypatch.setattr(faiss_db, "ADD_BLOCK_ROWS", 3)
+    vectors = np.eye(4, dtype=np.float32).repeat(2, axis=0)
+    db = FaissFlatIP(dim=4)
+    db.add(vectors.astype(np.float16))
+    assert db.index.ntotal == 8
+    _, ids = db.search(vectors[6], 2)
+    assert sorted(ids.tolist()) == [6, 7]
+
+
+def test_directory_tree_hash_orders_paths_by_component(tmp_path: Path) -> None:
+    from cpm_core.packet.lockfile import _directory_tree_hash
+
+    for rel in ("a/b", "a-c", "a.txt", "a b/c", "B/x", "z/y/x"):
+        target = tmp_path / rel
+        target.parent.mkdir(parents=True, exist_ok=True)
+        target.write_text(rel, encoding="utf-8")
+    (tmp_path / "empty").mkdir()
+
+    expected_lines = [
+        f"{item.relative_to(tmp_path).as_posix()}:{hashlib.sha256(item.read_bytes()).hexdigest()}"
+        for item in sorted(tmp_path.rglob("*"))
+        if item.is_file()
+    ]
+    expected = hashlib.sha256("\n".join(expected_lines).encode("utf-8")).hexdigest()
+    assert _directory_tree_hash(tmp_path) == expected
+
+
+def test_directory_tree_hash_reuses_cached_digests(tmp_path: Path, monkeypatch: pytest.MonkeyPatch) -> None:
+    import os
+
+    from cpm_core.packet import lockfile
+
+    source = tmp_path / "src"
+    source.mkdir()
+    for name in ("a.txt", "b.txt"):
+        target = source / name
+        target.write_text(name, encoding="utf-8")
+        os.utime(target, ns=(1_000_000_000, 1_000_000_000))
+    cache_dir = tmp_path / "cache"
+
+    uncached = lockfile._directory_tree_hash(source)
+    assert lockfile._directory_tree_hash(source, cache_dir=cache_dir) == uncached
+
+    hashed: list[list[Path]] = []
+    original = lockfile._sha256_files
+
+    def _tracking(paths):
+        hashed.append(list(paths))
+        return original(paths)
+
+    monkeypatch.setattr(lockfile, "_sha256_files", _tracking)
+    assert lockfile._directory_tree_hash(source, cache_dir=cache_dir) == uncached
+    assert hashed == [[]]
+
+    (source / "b.txt").write_text("changed", encoding="utf-8")
+    updated = lockfile._directory_tree_hash(source, cache_dir=cache_dir)
+    assert [Path(path) for path in hashed[-1]] == [source / "b.txt"]
+    assert updated == lockfile._directory_tree_hash(source) != uncached
+
+
+def test_sha256_file_rereads_recently_modified_files(tmp_path: Path) -> None:
+    import os
+    import time
+
+    from cpm_core.packet import lockfile
+
+    target = tmp_path / "a.txt"
+    stamp = time.time_ns()
+    target.write_text("aaaa", encoding="utf-8")
+    os.utime(target, ns=(stamp, stamp))
+    assert lockfile._sha256_file(target) == hashlib.sha256(b"aaaa").hexdigest()
+
+    # Same size, inode and mtime: only the racy-mtime guard notices the rewrite.
+    target.write_text("bbbb", encoding="utf-8")
+    os.utime(target, ns=(stamp, stamp))
+    assert lockfile._sha256_file(target) == hashlib.sha256(b"bbbb").hexdigest()
+
+
+def test_manifest_to_dict_copy_flag() -> None:
+    manifest = PacketManifest(
+        schema_version="1.0",
+        packet_id="demo",
+        embedding=EmbeddingSpec(provider="p", model="m", dim=4, dtype="float16", normalized=True),
+        checksums={"docs.jsonl": {"algo": "sha256", "value": "x"}},
+    )
+    assert manifest.to_dict(copy=False)["checksums"] is manifest.checksums
+    copied = manifest.to_dict()
+    assert copied == manifest.to_dict(copy=False)
+    assert copied["checksums"] is not manifest.checksums
@@ -107,3 +107,79 @@ def test_failing_plugin_does_not_block_startup(tmp_path: Path) -> None:
     assert "unable to initialize" in record.error
 
     assert manager.registry.display_names() == ()
+
+
+def test_plugin_with_declared_features_loads_on_first_resolve(tmp_path: Path) -> None:
+    workspace = _create_workspace(tmp_path)
+    plugins_dir = workspace.root / "plugins"
+    plugins_dir.mkdir()
+    _copy_fixture("sample_plugin", plugins_dir / "sample_plugin")
+    manifest_path = plugins_dir / "sample_plugin" / "plugin.toml"
+    manifest_path.write_text(
+        manifest_path.read_text(encoding="utf-8")
+        + '\n[features]\nnames = ["sample-command", "sample-builder"]\n',
+        encoding="utf-8",
+    )
+
+    manager = _build_manager(tmp_path, workspace)
+    manager.load_plugins()
+
+    record = next(rec for rec in manager.plugin_records() if rec.id == "sample_plugin")
+    assert record.state == PluginState.PENDING
+    assert manager.registry.display_names() == ("sample-builder", "sample-command")
+
+    assert manager.registry.resolve("sample-command").origin == "sample_plugin"
+    assert record.state == PluginState.READY
+    assert len(record.features) == 2
+    assert record.warning is None
+
+
+def test_plugin_index_skips_manifest_parsing_on_warm_start(
+    tmp_path: Path, monkeypatch: pytest.MonkeyPatch
+) -> None:
+    from cpm_core.plugin.manifest import PluginManifest
+
+    workspace = _create_workspace(tmp_path)
+    plugins_dir = workspace.root / "plugins"
+    plugins_dir.mkdir()
+    _copy_fixture("sample_plugin", plugins_dir / "sample_plugin")
+
+    PluginManifest.clear_cache()
+    cold = _build_manager(tmp_path, workspace)._discover_candidates()
+    assert (workspace.root / "cache" / "plugins.index.json").is_file()
+
+    PluginManifest.clear_cache()
+
+    def _fail(cls, path):
+        raise AssertionError(f"unexpected parse of {path}")
+
+    monkeypatch.setattr(PluginManifest, "_parse", classmethod(_fail))
+    warm = _build_manager(tmp_path, workspace)._discover_candidates()
+    assert [candidate.manifest for candidate in warm] == [candidate.manifest for candidate in cold]
+
+
+def test_declared_features_mismatch_is_reported_after_load(
+    tmp_path: Path, caplog: pytest.LogCaptureFixture
+) -> None:
+    workspace = _create_workspace(tmp_path)
+    plugins_dir = workspace.root / "plugins"
+    plugins_dir.mkdir()
+    _copy_fixture("sample_plugin", plugins_dir / "sample_plugin")
+    manifest_path = plugins_dir / "sample_plugin" / "plugin.toml"
+    manifest_path.write_text(
+        manifest_path.read_text(encoding="utf-8")
+        + '\n[features]\nnames = ["sample-command", "sample-renamed"]\n',
+        encoding="utf-8",
+    )
+
+    manager = _build_manager(tmp_path, workspace)
+    manager.load_plugins()
+    with caplog.at_level("WARNING", logger="cpm_core.plugin.manager"):
+        manager.registry.resolve("sample-command")
+
+    record = next(rec for rec in manager.plugin_records() if rec.id == "sample_plugin")
+    assert record.state == PluginState.READY
+    assert record.warning is not None
+    assert "missing: sample:sample-renamed" in record.warning
+    assert "undeclared: sample:sample-builder" in record.warning
+    assert any("declared features mismatch" in message for message in caplog.messages)
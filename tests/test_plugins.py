@@ -22,3 +22,44 @@ def test_plugin_manager_registers_once(tmp_path: Path) -> None:
     manager.register("alpha")
     manager.register("alpha")
     assert manager.list_plugins() == ("alpha",)
+
+
+def test_plugin_manifest_load_is_cached_until_file_changes(tmp_path: Path) -> None:
+    import os
+
+    from cpm_core.plugin.manifest import PluginManifest
+
+    manifest_path = tmp_path / "plugin.toml"
+    template = (
+        '[plugin]\nid = "demo"\nname = "Demo"\nversion = "{version}"\n'
+        'group = "g"\nentrypoint = "demo:Plugin"\nrequires_cpm = ">=0"\n'
+    )
+    manifest_path.write_text(template.format(version="1.0.0"), encoding="utf-8")
+    PluginManifest.clear_cache()
+
+    first = PluginManifest.load(manifest_path)
+    assert PluginManifest.load(manifest_path) is first
+
+    manifest_path.write_text(template.format(version="1.0.1"), encoding="utf-8")
+    os.utime(manifest_path, ns=(1, 1))
+    assert PluginManifest.load(manifest_path).version == "1.0.1"
+
+
+def test_plugin_manager_accessors_refresh_after_register(tmp_path: Path) -> None:
+    workspace_dir = tmp_path / ".cpm"
+    workspace_dir.mkdir()
+    config_path = workspace_dir / "config.toml"
+    config_path.write_text("")
+
+    manager = PluginManager(
+        workspace=Workspace(root=workspace_dir, config_path=config_path),
+        events=EventBus(),
+        user_dirs=UserDirs(data_dir_override=tmp_path / "user_data"),
+    )
+    manager.register("alpha")
+    first = manager.plugin_records()
+    assert manager.plugin_records() is first
+
+    manager.register("beta")
+    assert manager.list_plugins() == ("alpha", "beta")
+    assert [record.id for record in manager.plugin_records()] == ["alpha", "beta"]
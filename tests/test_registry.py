@@ -8,6 +8,7 @@ from cpm_core.registry import (
     AmbiguousFeatureError,
     CPMRegistryEntry,
     FeatureCollisionError,
+    FeatureNotFoundError,
     FeatureRegistry,
 )
 
@@ -84,3 +85,19 @@ def test_display_names_shows_qualified_when_needed() -> None:
         conflict_core.qualified_name,
         conflict_plugin.qualified_name,
     )
+
+
+def test_unregister_removes_entry_and_refreshes_display_names() -> None:
+    registry = FeatureRegistry()
+    conflict_core = _entry("sync", "core")
+    conflict_plugin = _entry("sync", "plugin")
+    registry.register(conflict_core)
+    registry.register(conflict_plugin)
+    assert registry.display_names() == ("core:sync", "plugin:sync")
+
+    registry.unregister(conflict_plugin.qualified_name)
+
+    assert registry.display_names() == ("sync",)
+    assert registry.resolve("sync") is conflict_core
+    with pytest.raises(FeatureNotFoundError):
+        registry.unregister(conflict_plugin.qualified_name)
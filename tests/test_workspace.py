@@ -8,6 +8,7 @@ from cpm_core.paths import UserDirs
 from cpm_core.workspace import (
     CONFIG_FILE_NAME,
     EMBEDDINGS_FILE_NAME,
+    LAYOUT_VERSION,
     WorkspaceLayout,
     WorkspaceResolver,
 )
@@ -101,3 +102,58 @@ def test_config_resolution_precedence(tmp_path: Path, monkeypatch: pytest.Monkey
 
     (user_config_dir / CONFIG_FILE_NAME).unlink()
     assert resolver.resolve_setting("test_key", start_dir=project) == "default"
+
+
+def test_find_workspace_caches_lookups_until_invalidated(tmp_path: Path) -> None:
+    project = tmp_path / "project"
+    project.mkdir()
+    resolver = WorkspaceResolver(env={})
+    assert resolver.find_workspace(project) is None
+
+    (project / ".cpm").mkdir()
+    assert resolver.find_workspace(project) is None
+    resolver.invalidate()
+    assert resolver.find_workspace(project) == project / ".cpm"
+
+
+def test_ensure_workspace_skips_layout_pass_once_initialized(tmp_path: Path) -> None:
+    layout = WorkspaceLayout.from_root(tmp_path / ".cpm", CONFIG_FILE_NAME, EMBEDDINGS_FILE_NAME)
+    assert not layout.is_initialized()
+    layout.ensure()
+    assert layout.is_initialized()
+
+    layout.logs_dir.rmdir()
+    layout.ensure()
+    assert not layout.logs_dir.exists()
+
+    layout.initialized_marker.unlink()
+    layout.ensure()
+    assert layout.logs_dir.is_dir()
+
+
+def test_ensure_workspace_reruns_layout_pass_for_outdated_marker(tmp_path: Path) -> None:
+    layout = WorkspaceLayout.from_root(tmp_path / ".cpm", CONFIG_FILE_NAME, EMBEDDINGS_FILE_NAME)
+    layout.ensure()
+    assert layout.initialized_marker.read_text(encoding="utf-8").strip() == str(LAYOUT_VERSION)
+
+    layout.logs_dir.rmdir()
+    layout.initialized_marker.write_text("", encoding="utf-8")
+    assert not layout.is_initialized()
+    layout.ensure()
+    assert layout.logs_dir.is_dir()
+    assert layout.is_initialized()
+
+
+def test_ensure_workspace_force_repairs_initialized_layout(tmp_path: Path) -> None:
+    resolver = WorkspaceResolver()
+    root = resolver.ensure_workspace(tmp_path)
+    layout = WorkspaceLayout.from_root(root, CONFIG_FILE_NAME, EMBEDDINGS_FILE_NAME)
+    layout.packages_dir.rmdir()
+    layout.config_file.unlink()
+
+    resolver.ensure_workspace(tmp_path)
+    assert not layout.packages_dir.exists()
+
+    resolver.ensure_workspace(tmp_path, force=True)
+    assert layout.packages_dir.is_dir()
+    assert layout.config_file.is_file()